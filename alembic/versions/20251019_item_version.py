@@ -0,0 +1,25 @@
+"""
+item version counter for ETags and conditional GETs
+
+Revision ID: 20251019_item_version
+Revises: 20250922_realtime
+Create Date: 2025-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '20251019_item_version'
+down_revision = '20250922_realtime'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('items') as batch_op:
+        batch_op.add_column(sa.Column('version', sa.Integer(), nullable=False, server_default='0'))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('items') as batch_op:
+        batch_op.drop_column('version')
@@ -0,0 +1,46 @@
+"""
+item_summaries read model, backfilled from bids, participants and images
+
+Revision ID: 20251020_item_summaries
+Revises: 20251019_item_version
+Create Date: 2025-10-20
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '20251020_item_summaries'
+down_revision = '20251019_item_version'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'item_summaries',
+        sa.Column('item_id', sa.Integer(), sa.ForeignKey('items.id'), primary_key=True),
+        sa.Column('status', sa.String(), nullable=False, server_default='scheduled'),
+        sa.Column('high_bid', sa.Float(), nullable=True),
+        sa.Column('leader_user_id', sa.Integer(), sa.ForeignKey('users.id'), nullable=True),
+        sa.Column('bid_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('player_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('image_url', sa.String(), nullable=True),
+        sa.Column('image_thumb_url', sa.String(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), server_default=sa.func.now(), nullable=True),
+    )
+    op.execute("""
+        INSERT INTO item_summaries (item_id, status, high_bid, leader_user_id, bid_count, player_count, image_url, image_thumb_url)
+        SELECT i.id,
+               COALESCE(i.status, 'scheduled'),
+               (SELECT MAX(b.amount) FROM bids b WHERE b.item_id = i.id),
+               (SELECT b.user_id FROM bids b WHERE b.item_id = i.id ORDER BY b.amount DESC, b.id LIMIT 1),
+               (SELECT COUNT(*) FROM bids b WHERE b.item_id = i.id),
+               (SELECT COUNT(*) FROM auction_participants p WHERE p.item_id = i.id),
+               img.image_url,
+               img.image_thumb_url
+        FROM items i LEFT JOIN images img ON img.id = i.image_id
+    """)
+
+
+def downgrade() -> None:
+    op.drop_table('item_summaries')
@@ -0,0 +1,45 @@
+"""
+user_exposures ledger, backfilled from live bids
+
+Revision ID: 20251021_user_exposures
+Revises: 20251020_item_summaries
+Create Date: 2025-10-21
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '20251021_user_exposures'
+down_revision = '20251020_item_summaries'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'user_exposures',
+        sa.Column('user_id', sa.Integer(), sa.ForeignKey('users.id'), primary_key=True),
+        sa.Column('committed', sa.Float(), nullable=False, server_default='0'),
+        sa.Column('headroom', sa.Float(), nullable=False, server_default='0'),
+        sa.Column('updated_at', sa.DateTime(), server_default=sa.func.now(), nullable=True),
+    )
+    # Leaders commit their amount plus any auto-raise headroom; outbid auto-raisers whose cap
+    # still beats the high bid could be raised into the lead, so their whole cap counts
+    op.execute("""
+        INSERT INTO user_exposures (user_id, committed, headroom)
+        SELECT u.id,
+               COALESCE((SELECT SUM(s.high_bid) FROM item_summaries s
+                         WHERE s.leader_user_id = u.id AND s.status != 'closed'), 0),
+               COALESCE((SELECT SUM(CASE WHEN s.leader_user_id = b.user_id
+                                         THEN (CASE WHEN b.max_budget > b.amount THEN b.max_budget - b.amount ELSE 0 END)
+                                         ELSE b.max_budget END)
+                         FROM bids b JOIN item_summaries s ON s.item_id = b.item_id
+                         WHERE b.user_id = u.id AND s.status != 'closed'
+                           AND (s.leader_user_id = b.user_id
+                                OR (b.max_budget IS NOT NULL AND b.bid_increment > 0 AND b.max_budget > s.high_bid))), 0)
+        FROM users u
+    """)
+
+
+def downgrade() -> None:
+    op.drop_table('user_exposures')
@@ -0,0 +1,48 @@
+from datetime import datetime
+from typing import Literal
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.admin.export import FORMATS, stream_export
+from app.middleware.admission import admission
+from app.middleware import profiling
+from app.auctions.images import image_cache
+from app.core import log
+from app.auth.dependencies import require_role
+from app.core.db import get_db, get_read_sessionmaker
+
+router = APIRouter(prefix='/admin', tags=['admin'])
+
+@router.get('/export/{table}')
+async def export_table(
+    table: Literal["bids", "owned_items", "items"],
+    format: Literal["csv", "ndjson"] = "ndjson",
+    since: datetime | None = None,
+    until: datetime | None = None,
+    sessions=Depends(get_read_sessionmaker),
+    db: AsyncSession = Depends(get_db),
+    user=Depends(require_role("admin")),
+):
+    """Stream a table as CSV or NDJSON, filtered to ``[since, until)`` on its time column
+    (``created_at``; ``acquired_at`` for ``owned_items``)."""
+    # Auth is done; don't keep the primary session open for the length of the download
+    await db.close()
+    return StreamingResponse(
+        stream_export(sessions, table, format, since, until),
+        media_type=FORMATS[format],
+        headers={"Content-Disposition": f'attachment; filename="{table}.{format}"'},
+    )
+
+@router.get('/metrics')
+async def metrics(user=Depends(require_role("admin"))):
+    """Admission queue depths, in-flight requests and shed counts, log pipeline drops and image cache
+    hit rate, for this worker."""
+    return {"admission": admission.snapshot(), "logging": dict(log.stats), "image_cache": image_cache.snapshot()}
+
+@router.get('/profiles/{request_id}')
+async def get_profile(request_id: str, user=Depends(require_role("admin"))):
+    """Profile of one request, by its ``X-Request-ID``: on-CPU vs await time, hot app stacks and SQL breakdown."""
+    document = await profiling.load(request_id)
+    if document is None:
+        raise HTTPException(status_code=404, detail="No profile for this request")
+    return document
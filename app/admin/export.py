@@ -0,0 +1,91 @@
+"""Streaming CSV/NDJSON export of bids, settlements and item metadata.
+
+Rows are read in keyset pages (``id > last``) of ``EXPORT_BATCH_ROWS``, each page
+in its own short session streamed through a server-side cursor with
+``yield_per``. Nothing holds more than one partition in memory and no
+transaction lives longer than one page, whatever the table size. Selected
+columns are plain rows, not ORM objects, so the identity map stays empty.
+"""
+import csv
+import io
+from datetime import datetime, timezone
+from typing import AsyncIterator
+import orjson
+from sqlalchemy import select
+from app.models import Bid, Item, OwnedItem, ItemSummary
+
+# Rows per read transaction, and per fetch from the server-side cursor
+EXPORT_BATCH_ROWS = 50_000
+YIELD_PER = 1000
+FORMATS = {"csv": "text/csv", "ndjson": "application/x-ndjson"}
+
+
+def _bids():
+    return select(Bid.id, Bid.item_id, Bid.user_id, Bid.amount, Bid.max_budget, Bid.bid_increment, Bid.created_at), Bid.id, Bid.created_at
+
+def _settlements():
+    # The price paid is the item's final high bid, kept in item_summaries
+    stmt = (
+        select(OwnedItem.id, OwnedItem.item_id, OwnedItem.user_id, ItemSummary.high_bid.label("amount"),
+               OwnedItem.acquired_at, OwnedItem.unsplash_id)
+        .outerjoin(ItemSummary, ItemSummary.item_id == OwnedItem.item_id)
+    )
+    return stmt, OwnedItem.id, OwnedItem.acquired_at
+
+def _items():
+    stmt = select(Item.id, Item.title, Item.description, Item.status, Item.base_price, Item.min_start_price,
+                  Item.start_at, Item.end_at, Item.created_at, Item.image_id)
+    return stmt, Item.id, Item.created_at
+
+TABLES = {"bids": _bids, "owned_items": _settlements, "items": _items}
+
+
+def to_naive_utc(dt: datetime | None) -> datetime | None:
+    if dt is not None and dt.tzinfo is not None:
+        return dt.astimezone(timezone.utc).replace(tzinfo=None)
+    return dt
+
+def columns(table: str) -> list[str]:
+    stmt, _, _ = TABLES[table]()
+    return [c.key for c in stmt.selected_columns]
+
+async def iter_rows(sessions, table: str, since: datetime | None = None, until: datetime | None = None) -> AsyncIterator[list]:
+    """Partitions of rows for ``table`` with its time column in ``[since, until)``, in id order."""
+    stmt, id_col, time_col = TABLES[table]()
+    if since is not None:
+        stmt = stmt.where(time_col >= to_naive_utc(since))
+    if until is not None:
+        stmt = stmt.where(time_col < to_naive_utc(until))
+    batch_rows = EXPORT_BATCH_ROWS
+    last_id = 0
+    while True:
+        page = stmt.where(id_col > last_id).order_by(id_col).limit(batch_rows).execution_options(yield_per=YIELD_PER)
+        read = 0
+        async with sessions() as db:
+            result = await db.stream(page)
+            async for partition in result.partitions():
+                read += len(partition)
+                last_id = partition[-1][0]
+                yield partition
+        if read < batch_rows:
+            return
+
+def _cell(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+def encode_csv(rows) -> bytes:
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    writer.writerows([_cell(v) for v in row] for row in rows)
+    return buf.getvalue().encode()
+
+def encode_ndjson(names: list[str], rows) -> bytes:
+    return b"".join(orjson.dumps(dict(zip(names, row))) + b"\n" for row in rows)
+
+async def stream_export(sessions, table: str, fmt: str, since: datetime | None = None, until: datetime | None = None) -> AsyncIterator[bytes]:
+    """Encoded chunks of the export, one per cursor partition (CSV starts with a header row)."""
+    names = columns(table)
+    if fmt == "csv":
+        yield encode_csv([names])
+    async for partition in iter_rows(sessions, table, since, until):
+        yield encode_csv(partition) if fmt == "csv" else encode_ndjson(names, partition)
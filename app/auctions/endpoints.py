@@ -1,17 +1,35 @@
-from fastapi import APIRouter, Depends, HTTPException
-from pydantic import BaseModel
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response
+from pydantic import BaseModel, model_validator
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.core.db import get_db
-from app.auth.dependencies import get_current_user
-from app.auctions.tx_bid import place_bid
-from sqlalchemy import select
-from app.models import Item, Bid, OwnedItem, Image, AuctionParticipant, User
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from app.core.db import get_db, get_read_db, get_sessionmaker
+from app.auth.dependencies import get_current_user, get_token_payload, load_user, require_role
+from app.auctions.tx_bid import place_bid, bid_gate
+from app.auctions import presence, summaries, exposures, idempotency, ladder
+from sqlalchemy import select, insert
+from sqlalchemy.dialects import postgresql, sqlite
+from app.models import Item, Bid, OwnedItem, Image, AuctionParticipant, User, ItemSummary
 from app.core.config import settings
-import httpx
+from app.core.responses import FastJSONResponse
+from app.core.http import get_http_client
+from app.auctions.notifier import item_notifier, wait_for
+from app.auctions.feed import lobby_feed
+from app.auctions.images import CachedImage, image_cache
+from app.auctions.payloads import item_payloads, lobby_payloads, extend_object, join_array
+from app.auctions.versions import (
+    bump_item_version, publish_item_changes, get_lobby_version, mark_lobby_fresh, lobby_not_modified,
+    item_etag, lobby_etag, etag_matches, not_modified, cache_headers,
+)
+from app.middleware.rate_limit import weighted_window_allow
+from typing import Any
+import asyncio
+import orjson
+import structlog
 from datetime import datetime, timedelta, timezone
 import random
 
-router = APIRouter(prefix='/items', tags=['auctions'])
+router = APIRouter(prefix='/items', tags=['auctions'], default_response_class=FastJSONResponse)
+logger = structlog.get_logger()
 
 class BidIn(BaseModel):
     amount: float
@@ -19,14 +37,76 @@ class BidIn(BaseModel):
     bid_increment: float | None = None
 
 @router.post('/{item_id}/bid')
-async def bid(item_id: int, body: BidIn, db: AsyncSession = Depends(get_db), user=Depends(get_current_user)):
-    # Ensure user joined the room before bidding
-    res_join = await db.execute(select(AuctionParticipant).where(AuctionParticipant.item_id == item_id, AuctionParticipant.user_id == user.id))
-    if not res_join.scalars().first():
-        raise HTTPException(status_code=403, detail="Join the auction before bidding")
-    result = await place_bid(db, item_id, user.id, body.amount, body.max_budget, body.bid_increment)
-    await db.commit()
-    return result
+async def bid(item_id: int, body: BidIn, response: Response, db: AsyncSession = Depends(get_db),
+              token: dict = Depends(get_token_payload), idempotency_key: str | None = Header(None)):
+    async def handler():
+        # The user is loaded inside so a replayed retry never reaches the database
+        user = await load_user(db, token.get("sub"))
+        # Ensure user joined the room before bidding
+        if not await presence.is_joined(db, item_id, user.id):
+            raise HTTPException(status_code=403, detail="Join the auction before bidding")
+        with bid_gate.admit(item_id):
+            result = await place_bid(db, item_id, user.id, body.amount, body.max_budget, body.bid_increment)
+            await db.commit()
+        await ladder.record(result)
+        await publish_item_changes(item_id)
+        return result
+    fp = idempotency.fingerprint("bid", item_id, body.model_dump())
+    return await idempotency.run(response, token.get("sub") or "", idempotency_key, fp, handler)
+
+class BatchBidIn(BidIn):
+    item_id: int
+
+class BatchBidOut(BaseModel):
+    item_id: int
+    ok: bool
+    status_code: int
+    winner_user_id: int | None = None
+    amount: float | None = None
+    detail: Any = None
+
+@router.post('/bids', response_model=list[BatchBidOut])
+async def bid_many(body: list[BatchBidIn], sessions=Depends(get_sessionmaker), db: AsyncSession = Depends(get_db), user=Depends(get_current_user)):
+    """Place bids on several items at once; each item runs its own place_bid transaction."""
+    if not body:
+        raise HTTPException(status_code=400, detail="No bids submitted")
+    if len(body) > settings.batch_bid_max_items:
+        raise HTTPException(status_code=400, detail=f"At most {settings.batch_bid_max_items} bids per batch")
+    # Weighted by batch size: a batch of N spends N from the user's bid budget
+    if not await weighted_window_allow(f"rl:user:{user.id}:bids", settings.batch_bid_limit, settings.batch_bid_window_seconds, len(body)):
+        raise HTTPException(status_code=429, detail="Write rate limit exceeded")
+    user_id = user.id
+    # Auth is done; give the connection back before fanning out
+    await db.close()
+
+    seen = set()
+    semaphore = asyncio.Semaphore(settings.batch_bid_concurrency)
+
+    async def run(entry: BatchBidIn) -> dict:
+        if entry.item_id in seen:
+            return {"item_id": entry.item_id, "ok": False, "status_code": 409, "detail": "Duplicate item in batch"}
+        seen.add(entry.item_id)
+        async with semaphore:
+            try:
+                async with sessions() as s:
+                    if not await presence.is_joined(s, entry.item_id, user_id):
+                        raise HTTPException(status_code=403, detail="Join the auction before bidding")
+                    with bid_gate.admit(entry.item_id):
+                        result = await place_bid(s, entry.item_id, user_id, entry.amount, entry.max_budget, entry.bid_increment)
+                        await s.commit()
+            except HTTPException as exc:
+                return {"item_id": entry.item_id, "ok": False, "status_code": exc.status_code, "detail": exc.detail}
+            except IntegrityError:
+                return {"item_id": entry.item_id, "ok": False, "status_code": 409, "detail": "User already placed a bid for this item"}
+            except SQLAlchemyError as exc:
+                logger.warning("Batch bid failed", item_id=entry.item_id, user_id=user_id, error=str(exc))
+                return {"item_id": entry.item_id, "ok": False, "status_code": 500, "detail": "Bid could not be placed"}
+        await ladder.record(result)
+        await publish_item_changes(entry.item_id)
+        return {"item_id": entry.item_id, "ok": True, "status_code": 200,
+                "winner_user_id": result["winner_user_id"], "amount": result["amount"]}
+
+    return await asyncio.gather(*(run(entry) for entry in body))
 
 class CreateItemIn(BaseModel):
     title: str
@@ -45,26 +125,25 @@ async def fetch_unsplash_image(query: str | None) -> dict | None:
     else:
         params = {"client_id": access_key, "count": 1}
         endpoint = "https://api.unsplash.com/photos/random"
-    async with httpx.AsyncClient(timeout=10.0) as client:
-        r = await client.get(endpoint, headers=headers, params=params)
-        if r.status_code != 200:
+    r = await get_http_client().get(endpoint, headers=headers, params=params)
+    if r.status_code != 200:
+        return None
+    data = r.json()
+    if isinstance(data, list):
+        if not data:
             return None
-        data = r.json()
-        if isinstance(data, list):
-            if not data:
-                return None
-            photo = data[0]
-        else:
-            if not data.get("results"):
-                return None
-            photo = data["results"][0]
-        return {
-            "unsplash_id": photo.get("id"),
-            "image_url": (photo.get("urls") or {}).get("regular") or (photo.get("urls") or {}).get("full"),
-            "image_thumb_url": (photo.get("urls") or {}).get("thumb"),
-            "image_attribution": (photo.get("user") or {}).get("name"),
-            "image_attribution_link": (photo.get("links") or {}).get("html")
-        }
+        photo = data[0]
+    else:
+        if not data.get("results"):
+            return None
+        photo = data["results"][0]
+    return {
+        "unsplash_id": photo.get("id"),
+        "image_url": (photo.get("urls") or {}).get("regular") or (photo.get("urls") or {}).get("full"),
+        "image_thumb_url": (photo.get("urls") or {}).get("thumb"),
+        "image_attribution": (photo.get("user") or {}).get("name"),
+        "image_attribution_link": (photo.get("links") or {}).get("html")
+    }
 
 def rand_min_start_price() -> float:
     return float(random.randint(100, 250))
@@ -82,14 +161,19 @@ def schedule_times(now: datetime) -> tuple[datetime, datetime]:
     end_at = start_at + timedelta(seconds=30)
     return start_at, end_at
 
-async def upsert_image(db: AsyncSession, query: str | None) -> int | None:
+async def upsert_image(db: AsyncSession, query: str | None) -> CachedImage | Image | None:
+    """Image for ``query``, reusing the stored row for the same photo. A newly added row is only
+    flushed; the caller caches it once committed."""
     img = await fetch_unsplash_image(query)
     if not img:
         return None
+    cached = image_cache.get_by_unsplash_id(img.get("unsplash_id")) if img.get("unsplash_id") else None
+    if cached:
+        return cached
     existing = await db.execute(select(Image).where(Image.unsplash_id == img.get("unsplash_id")))
     existing_img = existing.scalars().first()
     if existing_img:
-        return existing_img.id
+        return image_cache.put(existing_img)
     new_img = Image(
         unsplash_id=img.get("unsplash_id"),
         image_url=img.get("image_url"),
@@ -99,12 +183,12 @@ async def upsert_image(db: AsyncSession, query: str | None) -> int | None:
     )
     db.add(new_img)
     await db.flush()
-    return new_img.id
+    return new_img
 
 @router.post('')
 async def create_item(body: CreateItemIn, db: AsyncSession = Depends(get_db)):
     now = datetime.now(timezone.utc)
-    image_id = await upsert_image(db, body.query)
+    image = await upsert_image(db, body.query)
     start_at, end_at = schedule_times(now)
     item = Item(
         title=body.title,
@@ -114,18 +198,174 @@ async def create_item(body: CreateItemIn, db: AsyncSession = Depends(get_db)):
         end_at=end_at,
         min_start_price=rand_min_start_price(),
         status="scheduled",
-        image_id=image_id,
+        image_id=image.id if image else None,
     )
     db.add(item)
     await db.flush()
+    summaries.create(db, item, image.image_url if image else None, image.image_thumb_url if image else None)
     await db.commit()
+    if image:
+        image_cache.put(image)
+    await publish_item_changes(item.id)
     return {"id": item.id}
 
-def serialize_current_bid(bids: list[Bid]) -> dict | None:
-    if not bids:
-        return None
-    highest = max(bids, key=lambda b: b.amount)
-    return {"amount": highest.amount, "user_id": highest.user_id}
+class BulkItemIn(CreateItemIn):
+    start_at: datetime
+    end_at: datetime
+
+    @model_validator(mode="after")
+    def check_window(self):
+        if self.end_at <= self.start_at:
+            raise ValueError("end_at must be after start_at")
+        return self
+
+class BulkItemsOut(BaseModel):
+    ids: list[int]
+
+def insert_new_images(db: AsyncSession):
+    """Multi-row ``images`` insert that skips photos another transaction inserted first."""
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        return postgresql.insert(Image).on_conflict_do_nothing(index_elements=[Image.unsplash_id])
+    if dialect == "sqlite":
+        return sqlite.insert(Image).on_conflict_do_nothing(index_elements=[Image.unsplash_id])
+    return insert(Image)
+
+async def resolve_images(db: AsyncSession, queries: list[str | None]) -> list[CachedImage | Image | None]:
+    """Image per query, looked up concurrently (bounded) and deduplicated by query and by ``unsplash_id``.
+
+    Existing images are reused; new ones are inserted in one multi-row insert. ``None`` queries each
+    get their own random photo, as in ``create_item``. A photo a concurrent request inserted in the
+    meantime is skipped by the insert and picked up by the select that follows it.
+    """
+    semaphore = asyncio.Semaphore(settings.bulk_image_concurrency)
+
+    async def fetch(query: str | None) -> dict | None:
+        async with semaphore:
+            try:
+                return await fetch_unsplash_image(query)
+            except Exception as exc:
+                logger.warning("Image lookup failed", query=query, error=str(exc))
+                return None
+
+    distinct = list(dict.fromkeys(q for q in queries if q is not None))
+    found = dict(zip(distinct, await asyncio.gather(*(fetch(q) for q in distinct))))
+    random_photos = iter(await asyncio.gather(*(fetch(None) for q in queries if q is None)))
+    photos = [found[q] if q is not None else next(random_photos) for q in queries]
+
+    wanted = {p["unsplash_id"]: p for p in photos if p and p.get("unsplash_id")}
+    by_unsplash_id: dict[str, CachedImage | Image] = {}
+    for uid in wanted:
+        cached = image_cache.get_by_unsplash_id(uid)
+        if cached:
+            by_unsplash_id[uid] = cached
+    unknown = [uid for uid in wanted if uid not in by_unsplash_id]
+    if unknown:
+        res = await db.execute(select(Image).where(Image.unsplash_id.in_(unknown)))
+        by_unsplash_id.update({img.unsplash_id: image_cache.put(img) for img in res.scalars().all()})
+        new = [p for uid, p in wanted.items() if uid not in by_unsplash_id]
+        if new:
+            await db.execute(insert_new_images(db), new)
+            res = await db.execute(select(Image).where(Image.unsplash_id.in_([p["unsplash_id"] for p in new])))
+            by_unsplash_id.update({img.unsplash_id: img for img in res.scalars().all()})
+    return [by_unsplash_id.get(p["unsplash_id"]) if p and p.get("unsplash_id") else None for p in photos]
+
+@router.post('/bulk', response_model=BulkItemsOut)
+async def create_items_bulk(body: list[BulkItemIn], db: AsyncSession = Depends(get_db), user=Depends(require_role("editor"))):
+    """Create many scheduled items with explicit start/end times in one transaction."""
+    if not body:
+        raise HTTPException(status_code=400, detail="No items submitted")
+    if len(body) > settings.bulk_item_max:
+        raise HTTPException(status_code=400, detail=f"At most {settings.bulk_item_max} items per request")
+    images = await resolve_images(db, [entry.query for entry in body])
+    res = await db.execute(insert(Item).returning(Item.id, sort_by_parameter_order=True), [
+        {
+            "title": entry.title,
+            "description": entry.description or "",
+            "base_price": entry.base_price,
+            "start_at": to_naive_utc(entry.start_at),
+            "end_at": to_naive_utc(entry.end_at),
+            "min_start_price": rand_min_start_price(),
+            "status": "scheduled",
+            "image_id": image.id if image else None,
+        }
+        for entry, image in zip(body, images)
+    ])
+    ids = list(res.scalars().all())
+    await summaries.create_many(db, [
+        {"item_id": item_id, "image_url": image.image_url if image else None, "image_thumb_url": image.image_thumb_url if image else None}
+        for item_id, image in zip(ids, images)
+    ])
+    await db.commit()
+    for image in images:
+        if image is not None:
+            image_cache.put(image)
+    await publish_item_changes(*ids)
+    return {"ids": ids}
+
+class ImageOut(BaseModel):
+    id: int | None = None
+    unsplash_id: str | None = None
+    image_url: str | None = None
+    image_thumb_url: str | None = None
+    image_attribution: str | None = None
+    image_attribution_link: str | None = None
+
+class CurrentBidOut(BaseModel):
+    amount: float
+    user_id: int
+
+class ItemOut(BaseModel):
+    id: int
+    title: str | None
+    description: str | None
+    base_price: float | None
+    status: str
+    start_at: str | None
+    end_at: str | None
+    min_start_price: float | None
+    image: ImageOut
+    current_bid: CurrentBidOut | None
+    seconds_to_start: int | None
+    seconds_to_end: int | None
+    players: int
+    joined: bool
+
+class LobbyImageOut(BaseModel):
+    image_url: str | None = None
+    image_thumb_url: str | None = None
+
+class LobbyItemOut(BaseModel):
+    id: int
+    title: str | None
+    status: str
+    start_at: str | None
+    end_at: str | None
+    seconds_to_start: int | None
+    seconds_to_end: int | None
+    min_start_price: float | None
+    base_price: float | None
+    current_bid: CurrentBidOut | None
+    players: int
+    image: LobbyImageOut
+
+class LobbyRowOut(BaseModel):
+    id: int
+    title: str | None
+    status: str
+    start_at: str | None
+    end_at: str | None
+    min_start_price: float | None
+    base_price: float | None
+    current_bid: CurrentBidOut | None
+    players: int
+    image: LobbyImageOut
+
+class LobbyChangesOut(BaseModel):
+    cursor: int | None
+    snapshot: bool
+    rows: list[LobbyRowOut]
+    removed: list[int]
 
 def _aware(dt: datetime | None) -> datetime | None:
     """Ensure datetime is timezone-aware (UTC) for safe arithmetic.
@@ -162,8 +402,11 @@ async def ensure_transition_and_spawn_next(db: AsyncSession, item: Item, now: da
     status, _, _ = compute_status_and_timers(item, now)
     if status != prior:
         item.status = status
+        item.version = Item.version + 1
         mutated = True
         await db.flush()
+        await db.refresh(item, ["version"])
+        await summaries.set_status(db, item.id, status)
         # When entering in_progress, create the next scheduled item immediately
         if status == "in_progress":
             start_at, end_at = schedule_times(now)
@@ -178,11 +421,16 @@ async def ensure_transition_and_spawn_next(db: AsyncSession, item: Item, now: da
                 image_id=item.image_id,
             )
             db.add(next_item)
+            await db.flush()
+            parent = await db.get(ItemSummary, item.id)
+            summaries.create(db, next_item, parent.image_url if parent else None, parent.image_thumb_url if parent else None)
+            db.info.setdefault("spawned_item_ids", []).append(next_item.id)
             mutated = True
         # When becoming closed, finalize winner and award
         if status == "closed":
             res_b = await db.execute(select(Bid).where(Bid.item_id == item.id))
             bids = list(res_b.scalars().all())
+            await exposures.release(db, bids)
             if bids:
                 winner = max(bids, key=lambda b: b.amount)
                 # Deduct balance from winner only
@@ -192,10 +440,7 @@ async def ensure_transition_and_spawn_next(db: AsyncSession, item: Item, now: da
                     u.balance = float(u.balance or 0.0) - float(winner.amount)
                     mutated = True
                 # Snapshot image data
-                image = None
-                if item.image_id:
-                    res_img = await db.execute(select(Image).where(Image.id == item.image_id))
-                    image = res_img.scalars().first()
+                image = await image_cache.load(db, item.image_id)
                 owned = OwnedItem(
                     user_id=winner.user_id,
                     item_id=item.id,
@@ -210,32 +455,12 @@ async def ensure_transition_and_spawn_next(db: AsyncSession, item: Item, now: da
         await db.flush()
     return mutated
 
-@router.get('/{item_id}')
-async def get_item(item_id: int, db: AsyncSession = Depends(get_db), user=Depends(get_current_user)):
-    res = await db.execute(select(Item).where(Item.id == item_id))
-    item = res.scalars().first()
-    if not item:
-        raise HTTPException(status_code=404, detail="Item not found")
-    now = datetime.now(timezone.utc)
-    changed = await ensure_transition_and_spawn_next(db, item, now)
-    if changed:
-        await db.commit()
-    res_b = await db.execute(select(Bid).where(Bid.item_id == item_id))
-    bids = list(res_b.scalars().all())
-    # Load image if any
-    image = None
-    if item.image_id:
-        res_img = await db.execute(select(Image).where(Image.id == item.image_id))
-        image = res_img.scalars().first()
-
-    status, secs_start, secs_end = compute_status_and_timers(item, now)
-    # Presence count from participants table (no spectate during in_progress)
-    res_p = await db.execute(select(AuctionParticipant).where(AuctionParticipant.item_id == item_id))
-    participants = list(res_p.scalars().all())
-    joined = any(p.user_id == user.id for p in participants)
-    if status == "in_progress" and not joined:
-        raise HTTPException(status_code=403, detail="Auction in progress. Access denied.")
+def take_spawned(db: AsyncSession) -> list[int]:
+    """Ids of items spawned by transitions in this session, to be announced alongside the transitioned item."""
+    return db.info.pop("spawned_item_ids", [])
 
+def item_payload(item: Item, image: CachedImage | Image | None, status: str, current_bid: dict | None, players: int) -> dict:
+    """Version-stable part of the ``ItemOut`` payload (everything except timers and ``joined``)."""
     # Placeholder image if none
     image_payload = (
         {
@@ -246,11 +471,14 @@ async def get_item(item_id: int, db: AsyncSession = Depends(get_db), user=Depend
             "image_attribution": image.image_attribution,
             "image_attribution_link": image.image_attribution_link,
         } if image else {
+            "id": None,
+            "unsplash_id": None,
             "image_url": f"https://picsum.photos/seed/item-{item.id}/600/400",
-            "image_thumb_url": f"https://picsum.photos/seed/item-{item.id}/200/150"
+            "image_thumb_url": f"https://picsum.photos/seed/item-{item.id}/200/150",
+            "image_attribution": None,
+            "image_attribution_link": None,
         }
     )
-
     return {
         "id": item.id,
         "title": item.title,
@@ -261,12 +489,206 @@ async def get_item(item_id: int, db: AsyncSession = Depends(get_db), user=Depend
         "end_at": item.end_at.isoformat() if item.end_at else None,
         "min_start_price": item.min_start_price,
         "image": image_payload,
-        "current_bid": serialize_current_bid(bids),
+        "current_bid": current_bid,
+        "players": players,
+    }
+
+async def load_item(db: AsyncSession, item_id: int) -> Item:
+    res = await db.execute(select(Item).where(Item.id == item_id))
+    item = res.scalars().first()
+    if not item:
+        raise HTTPException(status_code=404, detail="Item not found")
+    return item
+
+async def load_item_view(db: AsyncSession, item_id: int) -> tuple[Item, ItemSummary | None, CachedImage | None]:
+    """Item and its summary in one indexed read; the image comes from the image cache."""
+    res = await db.execute(
+        select(Item, ItemSummary)
+        .outerjoin(ItemSummary, ItemSummary.item_id == Item.id)
+        .where(Item.id == item_id)
+    )
+    row = res.first()
+    if not row:
+        raise HTTPException(status_code=404, detail="Item not found")
+    return row[0], row[1], await image_cache.load(db, row[0].image_id)
+
+def countdown(item: Item, now: datetime) -> int | None:
+    """The whole-second countdown (to start, else to end) an item body carries at ``now``."""
+    _, secs_start, secs_end = compute_status_and_timers(item, now)
+    return secs_start if secs_start is not None else secs_end
+
+def transition_due(item: Item, now: datetime) -> bool:
+    """True when serving this item now would write a clock-driven status transition."""
+    return compute_status_and_timers(item, now)[0] != item.status
+
+def lobby_hidden(item: Item, status: str, now: datetime) -> bool:
+    """Closed items leave the lobby two minutes after they end."""
+    if status != "closed":
+        return False
+    ref_ts = _aware(item.end_at) or _aware(item.created_at) or now
+    return (now - ref_ts).total_seconds() > 120
+
+async def sweep_lobby(db: AsyncSession, now: datetime) -> list[tuple[Item, ItemSummary | None, str]]:
+    """Apply due transitions across the lobby (seeding an item if none is open) and return its visible rows.
+
+    Also resets ``lobby_feed.due_at`` to the next start or end among open items, so delta polls
+    only pay for a full pass when the clock has actually moved some item.
+    """
+    loaded = await load_lobby(db)
+    changed_ids = []
+    for it, _ in loaded:
+        if await ensure_transition_and_spawn_next(db, it, now):
+            changed_ids.append(it.id)
+    if not any(it.status != "closed" for it, _ in loaded):
+        changed_ids.append((await seed_lobby_item(db, now)).id)
+    if changed_ids:
+        await db.commit()
+        await publish_item_changes(*changed_ids, *take_spawned(db))
+        loaded = await load_lobby(db)
+    lobby_feed.due_at = None
+    rows = []
+    for it, summary in loaded:
+        st = compute_status_and_timers(it, now)[0]
+        if st != "closed":
+            lobby_feed.note_due(next_time_change(it, st, now))
+        if not lobby_hidden(it, st, now):
+            rows.append((it, summary, st))
+    return rows
+
+def render_lobby_changes(cursor: int | None, snapshot: bool, rows: list[tuple[Item, ItemSummary | None, str]], removed: list[int]) -> bytes:
+    bodies = [lobby_payloads.get(it.id, (it.version, st)) or build_lobby_body(it, st, summary) for it, summary, st in rows]
+    return orjson.dumps({"cursor": cursor, "snapshot": snapshot, "rows": orjson.Fragment(join_array(bodies)), "removed": removed})
+
+@router.get('/changes', response_model=LobbyChangesOut)
+async def lobby_changes(cursor: int | None = None, db: AsyncSession = Depends(get_db), user=Depends(get_current_user)):
+    """Lobby rows added or updated since ``cursor``, and ids that left the lobby.
+
+    Without a cursor, or with one this worker can no longer answer, the reply is a full
+    ``snapshot`` of the lobby (not limited to ten rows). Rows carry no countdowns: clients
+    derive them, and the status flips at ``start_at``/``end_at``, from the timestamps.
+    Poll again with the returned ``cursor``; it is ``null`` while Redis is unavailable.
+    """
+    now = datetime.now(timezone.utc)
+    changed = lobby_feed.since(cursor) if cursor is not None else None
+    if changed is not None and lobby_feed.is_due(now):
+        await sweep_lobby(db, now)
+        changed = lobby_feed.since(cursor)
+    if changed is None:
+        # Read the version before the rows so the cursor never claims newer content than we serve
+        version = await get_lobby_version()
+        return FastJSONResponse(render_lobby_changes(version, True, await sweep_lobby(db, now), []))
+    next_cursor = max(cursor, lobby_feed.head)
+    rows = []
+    for it, summary in await load_lobby(db, item_ids=sorted(changed)):
+        st = compute_status_and_timers(it, now)[0]
+        if st != "closed":
+            lobby_feed.note_due(next_time_change(it, st, now))
+        if not lobby_hidden(it, st, now):
+            rows.append((it, summary, st))
+            changed.discard(it.id)
+    return FastJSONResponse(render_lobby_changes(next_cursor, False, rows, sorted(changed)))
+
+# Declared before /{item_id}, which would otherwise match 'active' and fail to parse it
+@router.get('/active')
+async def get_active(db: AsyncSession = Depends(get_read_db)):
+    now = datetime.now(timezone.utc)
+    res = await db.execute(select(Item))
+    items = list(res.scalars().all())
+    # Prefer in_progress, else nearest scheduled
+    in_prog = []
+    scheduled = []
+    for it in items:
+        st, _, _ = compute_status_and_timers(it, now)
+        if st == "in_progress":
+            in_prog.append(it)
+        elif st == "scheduled":
+            scheduled.append(it)
+    if in_prog:
+        it = in_prog[0]
+        return {"id": it.id}
+    if scheduled:
+        it = sorted(scheduled, key=lambda x: x.start_at or now)[0]
+        return {"id": it.id}
+    return None
+
+@router.get('/{item_id}', response_model=ItemOut)
+async def get_item(item_id: int, request: Request, db: AsyncSession = Depends(get_db), read_db: AsyncSession = Depends(get_read_db), user=Depends(get_current_user)):
+    view = await load_item_view(read_db, item_id)
+    now = datetime.now(timezone.utc)
+    if transition_due(view[0], now):
+        # The transition is a write: redo the read on the primary
+        if read_db is not db:
+            view = await load_item_view(db, item_id)
+        return await render_item(db, view, user, now)
+    # Conditional GET: answer from the version and countdown unless a time-based transition is due
+    etag = item_etag(view[0], countdown(view[0], now))
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return not_modified(etag, vary="Authorization")
+    return await render_item(read_db, view, user, now)
+
+class LadderEntryOut(BaseModel):
+    rank: int
+    user_id: int
+    amount: float
+
+class LadderOut(BaseModel):
+    item_id: int
+    bids: list[LadderEntryOut]
+
+@router.get('/{item_id}/ladder', response_model=LadderOut)
+async def get_ladder(item_id: int, n: int = Query(10, ge=1), db: AsyncSession = Depends(get_read_db), token: dict = Depends(get_token_payload)):
+    """Top ``n`` bids, highest first, from the item's Redis ladder (rebuilt from ``bids`` when missing)."""
+    rows = await ladder.top(db, item_id, min(n, settings.ladder_max_entries))
+    if rows is None:
+        raise HTTPException(status_code=404, detail="Item not found")
+    return {"item_id": item_id, "bids": [{"rank": rank, "user_id": user_id, "amount": amount} for rank, (user_id, amount) in enumerate(rows, 1)]}
+
+@router.get('/{item_id}/wait', response_model=ItemOut)
+async def wait_item(item_id: int, since: int, timeout: float = Query(25.0, gt=0, le=60), db: AsyncSession = Depends(get_db), user=Depends(get_current_user)):
+    """Long-poll: return the item once its version differs from ``since``, or 304 after ``timeout``."""
+    with item_notifier.watch(item_id) as event:
+        view = await load_item_view(db, item_id)
+        item = view[0]
+        now = datetime.now(timezone.utc)
+        status = compute_status_and_timers(item, now)[0]
+        if item.version == since and status == item.status:
+            # Wake up for the next clock-driven transition even if nobody else polls
+            wait_s = timeout
+            change_at = next_time_change(item, status, now)
+            if change_at is not None:
+                wait_s = min(timeout, max(0.0, (change_at - now).total_seconds()))
+            # Release the connection while parked
+            await db.close()
+            if not await wait_for(event, wait_s) and wait_s == timeout:
+                return not_modified(item_etag(item, countdown(item, datetime.now(timezone.utc))), vary="Authorization")
+            view = await load_item_view(db, item_id)
+            now = datetime.now(timezone.utc)
+    return await render_item(db, view, user, now)
+
+async def render_item(db: AsyncSession, view: tuple[Item, ItemSummary | None, CachedImage | None], user: User, now: datetime) -> FastJSONResponse:
+    item, summary, image = view
+    item_id = item.id
+    changed = await ensure_transition_and_spawn_next(db, item, now)
+    if changed:
+        await db.commit()
+        await publish_item_changes(item_id, *take_spawned(db))
+    status, secs_start, secs_end = compute_status_and_timers(item, now)
+    # Membership from the registry (no spectate during in_progress); players come from the summary
+    joined = await presence.is_joined(db, item_id, user.id, verify=status == "in_progress")
+    if status == "in_progress" and not joined:
+        raise HTTPException(status_code=403, detail="Auction in progress. Access denied.")
+
+    body = item_payloads.get(item_id, (item.version, status))
+    if body is None:
+        if summary is None:
+            summary = (await summaries.compute(db, [item_id])).get(item_id)
+        players = summary.player_count if summary else 0
+        body = item_payloads.put(item_id, (item.version, status), item_payload(item, image, status, summaries.current_bid(summary), players))
+    return FastJSONResponse(extend_object(body, {
         "seconds_to_start": secs_start,
         "seconds_to_end": secs_end,
-        "players": len(participants),
         "joined": joined,
-    }
+    }), headers=cache_headers(item_etag(item, secs_start if secs_start is not None else secs_end), vary="Authorization"))
 
 @router.post('/{item_id}/close')
 async def close_auction(item_id: int, db: AsyncSession = Depends(get_db)):
@@ -275,16 +697,27 @@ async def close_auction(item_id: int, db: AsyncSession = Depends(get_db)):
     if not item:
         raise HTTPException(status_code=404, detail="Item not found")
     now = datetime.now(timezone.utc)
+    prior = item.status
     await ensure_transition_and_spawn_next(db, item, now)
     if item.status != "in_progress" and item.status != "closed":
         # Only allow close when in_progress or already closed
         return {"status": item.status}
+    if item.status == "closed":
+        # Already settled, either earlier or by the transition just applied
+        if prior != "closed":
+            await db.commit()
+            await publish_item_changes(item_id)
+        return {"status": "closed"}
     res_b = await db.execute(select(Bid).where(Bid.item_id == item_id))
     bids = list(res_b.scalars().all())
+    await exposures.release(db, bids)
     if not bids:
         item.status = "closed"
+        await bump_item_version(db, item.id)
+        await summaries.set_status(db, item.id, "closed")
         await db.flush()
         await db.commit()
+        await publish_item_changes(item_id)
         return {"status": "closed", "winner": None}
     winner = max(bids, key=lambda b: b.amount)
     # Deduct balance from winner only
@@ -292,11 +725,8 @@ async def close_auction(item_id: int, db: AsyncSession = Depends(get_db)):
     u = res_u.scalars().first()
     if u:
         u.balance = float(u.balance or 0.0) - float(winner.amount)
-    # Snapshot image data from Image table
-    image = None
-    if item.image_id:
-        res_img = await db.execute(select(Image).where(Image.id == item.image_id))
-        image = res_img.scalars().first()
+    # Snapshot image data
+    image = await image_cache.load(db, item.image_id)
     owned = OwnedItem(
         user_id=winner.user_id,
         item_id=item.id,
@@ -308,116 +738,187 @@ async def close_auction(item_id: int, db: AsyncSession = Depends(get_db)):
     )
     db.add(owned)
     item.status = "closed"
+    await bump_item_version(db, item.id)
+    await summaries.set_status(db, item.id, "closed")
     await db.flush()
     await db.commit()
+    await publish_item_changes(item_id)
     return {"status": "closed", "winner_user_id": winner.user_id, "amount": winner.amount, "owned_item_id": owned.id}
 
 
 # Listing and state endpoints
 
-@router.get('')
-async def list_items(status: str | None = None, db: AsyncSession = Depends(get_db), user=Depends(get_current_user)):
-    res = await db.execute(select(Item))
-    items = list(res.scalars().all())
+def lobby_row(item: Item, status: str, current_bid: dict | None, players: int, image_url: str | None, image_thumb_url: str | None) -> dict:
+    """Version-stable part of a ``LobbyItemOut`` row (everything except timers)."""
+    return {
+        "id": item.id,
+        "title": item.title,
+        "status": status,
+        "start_at": item.start_at.isoformat() if item.start_at else None,
+        "end_at": item.end_at.isoformat() if item.end_at else None,
+        "min_start_price": item.min_start_price,
+        "base_price": item.base_price,
+        "current_bid": current_bid,
+        "players": players,
+        "image": {"image_url": image_url, "image_thumb_url": image_thumb_url},
+    }
+
+def render_lobby_row(item: Item, status: str, current_bid: dict | None, players: int, image_url: str | None, image_thumb_url: str | None, secs_start: int | None, secs_end: int | None) -> bytes:
+    body = lobby_payloads.get_or_render(
+        item.id,
+        (item.version, status),
+        lambda: lobby_row(item, status, current_bid, players, image_url, image_thumb_url),
+    )
+    return extend_object(body, {"seconds_to_start": secs_start, "seconds_to_end": secs_end})
+
+def build_lobby_body(item: Item, status: str, summary: ItemSummary | None) -> bytes:
+    """Serialize and cache one lobby row from the item and its summary."""
+    image_url = summary.image_url if summary else None
+    image_thumb_url = summary.image_thumb_url if summary else None
+    # Placeholder fallback if missing
+    if not image_thumb_url and not image_url:
+        image_thumb_url = f"https://picsum.photos/seed/{item.id}/200/150"
+    players = summary.player_count if summary else 0
+    return lobby_payloads.put(item.id, (item.version, status), lobby_row(item, status, summaries.current_bid(summary), players, image_url, image_thumb_url))
+
+async def load_lobby(db: AsyncSession, open_only: bool = False, item_ids: list[int] | None = None) -> list[tuple[Item, ItemSummary | None]]:
+    """Items with their summaries in one read; items missing a summary get one computed (not stored)."""
+    stmt = select(Item, ItemSummary).outerjoin(ItemSummary, ItemSummary.item_id == Item.id)
+    if open_only:
+        stmt = stmt.where(Item.status != "closed")
+    if item_ids is not None:
+        stmt = stmt.where(Item.id.in_(item_ids))
+    res = await db.execute(stmt)
+    rows = [(it, summary) for it, summary in res.all()]
+    missing = await summaries.compute(db, [it.id for it, summary in rows if summary is None])
+    return [(it, summary or missing.get(it.id)) for it, summary in rows]
+
+async def prime_lobby_cache(db: AsyncSession) -> int:
+    """Render the cached lobby rows for every open item ahead of the first poll. Returns rows primed."""
+    rows = await load_lobby(db, open_only=True)
     now = datetime.now(timezone.utc)
-    rows = []
+    for it, summary in rows:
+        st, _, _ = compute_status_and_timers(it, now)
+        if lobby_payloads.get(it.id, (it.version, st)) is None:
+            build_lobby_body(it, st, summary)
+    return len(rows)
+
+async def seed_lobby_item(db: AsyncSession, now: datetime) -> Item:
+    """Create a scheduled item so the lobby never runs dry. Caller commits."""
+    start_at, end_at = schedule_times(now)
+    seed = Item(
+        title=f"Mystery {now.strftime('%H%M%S')}",
+        description="Auto-seeded",
+        base_price=10.0,
+        start_at=start_at,
+        end_at=end_at,
+        min_start_price=rand_min_start_price(),
+        status="scheduled",
+        image_id=None,
+    )
+    db.add(seed)
+    await db.flush()
+    summaries.create(db, seed)
+    return seed
+
+def next_time_change(item: Item, status: str, now: datetime) -> datetime | None:
+    """When the item's lobby row next changes by the clock alone (transition or 2-minute hide)."""
+    if status == "scheduled":
+        return _aware(item.start_at)
+    if status == "in_progress":
+        return _aware(item.end_at)
+    ref_ts = _aware(item.end_at) or _aware(item.created_at) or now
+    return ref_ts + timedelta(seconds=120)
+
+def lobby_sort_row(it: Item, summary: ItemSummary | None, st: str, secs_s: int | None, secs_e: int | None) -> tuple[int, float, str, bytes]:
+    """(priority, sort key, status, serialized row with timers) for one visible lobby item."""
+    body = lobby_payloads.get(it.id, (it.version, st))
+    if body is None:
+        body = build_lobby_body(it, st, summary)
+    # Sort priority
+    priority = 0 if st == "in_progress" else 1 if st == "scheduled" else 2
+    sort_key = secs_e if st == "in_progress" else secs_s if st == "scheduled" else 1e9
+    return (priority, sort_key if sort_key is not None else 1e9, st,
+            extend_object(body, {"seconds_to_start": secs_s, "seconds_to_end": secs_e}))
+
+@router.get('', response_model=list[LobbyItemOut])
+async def list_items(request: Request, status: str | None = None, db: AsyncSession = Depends(get_db), read_db: AsyncSession = Depends(get_read_db), user=Depends(get_current_user)):
+    now = datetime.now(timezone.utc)
+    tick = int(now.timestamp())
+    etag = await lobby_not_modified(request.headers.get("if-none-match"), status, tick)
+    if etag:
+        return not_modified(etag)
+    # Read the version before the rows so the ETag never claims newer content than we serve
+    version = await get_lobby_version()
+    loaded = await load_lobby(read_db)
+    from_replica = False
+    if read_db is not db:
+        # Transitions and seeding write, so only a lobby that needs neither is served from the replica
+        open_rows = any(it.status in ("scheduled", "in_progress") and (not status or it.status == status) for it, _ in loaded)
+        if not open_rows or any(transition_due(it, now) for it, _ in loaded):
+            loaded = await load_lobby(db)
+        else:
+            db = read_db
+            from_replica = True
+    candidates = []
     any_changed = False
-    for it in items:
+    changed_ids = []
+    valid_until = None
+    for it, summary in loaded:
         changed = await ensure_transition_and_spawn_next(db, it, now)
-        any_changed = any_changed or changed
+        if changed:
+            any_changed = True
+            changed_ids.append(it.id)
         st, secs_s, secs_e = compute_status_and_timers(it, now)
-        # Skip closed items after 2 minutes (don't show in lobby)
-        if st == "closed":
-            ref_ts = _aware(it.end_at) or _aware(it.created_at) or now
-            age = (now - ref_ts).total_seconds()
-            if age > 120:
-                # Skip old closed items instead of deleting (avoids FK constraints)
-                continue
+        # Skip closed items after 2 minutes instead of deleting (avoids FK constraints)
+        if lobby_hidden(it, st, now):
+            continue
+        change_at = next_time_change(it, st, now)
+        if change_at and (valid_until is None or change_at < valid_until):
+            valid_until = change_at
         if status and st != status:
             continue
-        res_b = await db.execute(select(Bid).where(Bid.item_id == it.id))
-        bids = list(res_b.scalars().all())
-        current = serialize_current_bid(bids)
-        res_p = await db.execute(select(AuctionParticipant).where(AuctionParticipant.item_id == it.id))
-        players = len(list(res_p.scalars().all()))
-        # Load image if present
-        image_url = None
-        image_thumb_url = None
-        if it.image_id:
-            res_img = await db.execute(select(Image).where(Image.id == it.image_id))
-            img = res_img.scalars().first()
-            if img:
-                image_url = img.image_url
-                image_thumb_url = img.image_thumb_url
-        # Placeholder fallback if missing
-        if not image_thumb_url and not image_url:
-            image_thumb_url = f"https://picsum.photos/seed/{it.id}/200/150"
-        # Sort priority
-        priority = 0 if st == "in_progress" else 1 if st == "scheduled" else 2
-        sort_key = secs_e if st == "in_progress" else secs_s if st == "scheduled" else 1e9
-        rows.append((priority, sort_key if sort_key is not None else 1e9, {
-            "id": it.id,
-            "title": it.title,
-            "status": st,
-            "start_at": it.start_at.isoformat() if it.start_at else None,
-            "end_at": it.end_at.isoformat() if it.end_at else None,
-            "seconds_to_start": secs_s,
-            "seconds_to_end": secs_e,
-            "min_start_price": it.min_start_price,
-            "base_price": it.base_price,
-            "current_bid": current,
-            "players": players,
-            "image": {"image_url": image_url, "image_thumb_url": image_thumb_url},
-        }))
+        candidates.append((it, summary, st, secs_s, secs_e))
+    rows = [lobby_sort_row(*candidate) for candidate in candidates]
     # If there are no scheduled or in_progress items, seed one
-    if not any(r[2]["status"] in ("scheduled", "in_progress") for r in rows):
-        # Seed a new scheduled item
-        title = f"Mystery {now.strftime('%H%M%S')}"
-        start_at, end_at = schedule_times(now)
-        seed = Item(
-            title=title,
-            description="Auto-seeded",
-            base_price=10.0,
-            start_at=start_at,
-            end_at=end_at,
-            min_start_price=rand_min_start_price(),
-            status="scheduled",
-            image_id=None,
-        )
-        db.add(seed)
-        await db.flush()
+    if not any(r[2] in ("scheduled", "in_progress") for r in rows):
+        seed = await seed_lobby_item(db, now)
+        any_changed = True
+        changed_ids.append(seed.id)
         # append seeded to rows with placeholder image
-        rows.append((1, 10, {
-            "id": seed.id,
-            "title": seed.title,
-            "status": "scheduled",
-            "start_at": seed.start_at.isoformat(),
-            "end_at": seed.end_at.isoformat(),
-            "seconds_to_start": max(0, int((_aware(seed.start_at) - now).total_seconds())),
-            "seconds_to_end": None,
-            "min_start_price": seed.min_start_price,
-            "base_price": seed.base_price,
-            "current_bid": None,
-            "players": 0,
-            "image": {"image_thumb_url": f"https://picsum.photos/seed/{seed.id}/200/150"}
-        }))
+        secs_s = max(0, int((_aware(seed.start_at) - now).total_seconds()))
+        rows.append((1, 10, "scheduled", render_lobby_row(
+            seed, "scheduled", None, 0, None, f"https://picsum.photos/seed/{seed.id}/200/150", secs_s, None)))
         await db.commit()
 
     # Sort and limit to 10
     # Commit any changes from transitions/seeding
+    etag = None
     if any_changed:
         await db.commit()
+        await publish_item_changes(*changed_ids, *take_spawned(db))
+    elif version is not None and not from_replica:
+        # Only tag a lobby this request did not change itself; the next poll picks up the new version.
+        # Replica rows may predate the primary's version, and a tag would pin them for every client.
+        etag = lobby_etag(version, status, tick)
+        await mark_lobby_fresh(version, valid_until, now)
 
     rows.sort(key=lambda r: (r[0], r[1]))
-    out = [r[2] for r in rows[:10]]
-    return out
+    return FastJSONResponse(join_array([r[3] for r in rows[:10]]), headers=cache_headers(etag))
 
 
 class JoinLeaveOut(BaseModel):
     joined: bool
 
 @router.post('/{item_id}/join', response_model=JoinLeaveOut)
-async def join_item(item_id: int, db: AsyncSession = Depends(get_db), user=Depends(get_current_user)):
+async def join_item(item_id: int, response: Response, db: AsyncSession = Depends(get_db),
+                    token: dict = Depends(get_token_payload), idempotency_key: str | None = Header(None)):
+    async def handler():
+        return await join(db, item_id, await load_user(db, token.get("sub")))
+    fp = idempotency.fingerprint("join", item_id)
+    return await idempotency.run(response, token.get("sub") or "", idempotency_key, fp, handler)
+
+async def join(db: AsyncSession, item_id: int, user: User) -> dict:
     res = await db.execute(select(Item).where(Item.id == item_id))
     item = res.scalars().first()
     if not item:
@@ -429,8 +930,12 @@ async def join_item(item_id: int, db: AsyncSession = Depends(get_db), user=Depen
     existing = await db.execute(select(AuctionParticipant).where(AuctionParticipant.item_id == item_id, AuctionParticipant.user_id == user.id))
     if not existing.scalars().first():
         db.add(AuctionParticipant(item_id=item_id, user_id=user.id))
+        await bump_item_version(db, item_id)
+        await summaries.add_players(db, item_id, 1)
         await db.flush()
         await db.commit()
+        await presence.add(item_id, user.id)
+        await publish_item_changes(item_id)
     return {"joined": True}
 
 @router.post('/{item_id}/leave', response_model=JoinLeaveOut)
@@ -440,30 +945,9 @@ async def leave_item(item_id: int, db: AsyncSession = Depends(get_db), user=Depe
     p = res.scalars().first()
     if p:
         await db.delete(p)
+        await bump_item_version(db, item_id)
+        await summaries.add_players(db, item_id, -1)
         await db.commit()
+        await presence.remove(item_id, user.id)
+        await publish_item_changes(item_id)
     return {"joined": False}
-
-
-@router.get('/active')
-async def get_active(db: AsyncSession = Depends(get_db)):
-    now = datetime.now(timezone.utc)
-    res = await db.execute(select(Item))
-    items = list(res.scalars().all())
-    # Prefer in_progress, else nearest scheduled
-    in_prog = []
-    scheduled = []
-    for it in items:
-        st, _, _ = compute_status_and_timers(it, now)
-        if st == "in_progress":
-            in_prog.append(it)
-        elif st == "scheduled":
-            scheduled.append(it)
-    if in_prog:
-        it = in_prog[0]
-        return {"id": it.id}
-    if scheduled:
-        it = sorted(scheduled, key=lambda x: x.start_at or now)[0]
-        return {"id": it.id}
-    return None
-
-
@@ -0,0 +1,144 @@
+"""Per-user exposure ledger over live auctions.
+
+For each live item a user contributes ``(committed, headroom)``: the leader
+commits the high bid and keeps ``cap - amount`` of auto-raise headroom; an
+outbid auto-raiser whose cap still beats the high bid could be raised into the
+lead, so its whole cap counts as headroom. ``place_bid`` applies the change in
+contributions for the one item it touched, settlement releases the item, and a
+new winning bid is admitted only if ``committed + headroom + cap <= balance``
+(one row read, no scan of the user's bids).
+"""
+from fastapi import HTTPException
+from sqlalchemy import select, update, delete, insert, func, case, and_, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models import UserExposure, User, Bid, ItemSummary
+
+# Exposure changes smaller than this are float noise
+EPSILON = 1e-9
+
+
+def _cap(bid: Bid) -> float:
+    return float(bid.max_budget) if bid.max_budget is not None else float(bid.amount)
+
+def contributions(bids: list[Bid]) -> dict[int, tuple[float, float]]:
+    """(committed, headroom) per user for one live item, from all of its bids."""
+    if not bids:
+        return {}
+    leader = max(bids, key=lambda b: b.amount)
+    out = {}
+    for b in bids:
+        if b is leader:
+            out[b.user_id] = (float(b.amount), max(0.0, _cap(b) - float(b.amount)))
+        elif b.max_budget is not None and b.bid_increment is not None and b.bid_increment > 0 and _cap(b) > leader.amount:
+            out[b.user_id] = (0.0, _cap(b))
+    return out
+
+async def check_available(db: AsyncSession, user_id: int, cap: float) -> None:
+    """Lock the user's ledger row and reject a bid whose cap does not fit the remaining balance."""
+    stmt = (
+        select(UserExposure, User.balance)
+        .join(User, User.id == UserExposure.user_id)
+        .where(UserExposure.user_id == user_id)
+        .with_for_update(of=UserExposure)
+    )
+    row = (await db.execute(stmt)).first()
+    if row is None:
+        # Users from before the ledger existed get theirs built on first bid
+        await rebuild(db, [user_id])
+        row = (await db.execute(stmt)).first()
+        if row is None:
+            raise HTTPException(status_code=404, detail="User not found")
+    ledger, balance = row
+    if ledger.committed + ledger.headroom + cap > float(balance or 0.0) + EPSILON:
+        raise HTTPException(status_code=400, detail="Bid exceeds your available balance across live auctions")
+
+async def apply(db: AsyncSession, before: dict[int, tuple[float, float]], after: dict[int, tuple[float, float]]) -> None:
+    """Move each affected user's ledger by the change in their contribution to one item."""
+    for user_id in before.keys() | after.keys():
+        old_c, old_h = before.get(user_id, (0.0, 0.0))
+        new_c, new_h = after.get(user_id, (0.0, 0.0))
+        d_committed, d_headroom = new_c - old_c, new_h - old_h
+        if abs(d_committed) < EPSILON and abs(d_headroom) < EPSILON:
+            continue
+        res = await db.execute(
+            update(UserExposure)
+            .where(UserExposure.user_id == user_id)
+            .values(committed=UserExposure.committed + d_committed, headroom=UserExposure.headroom + d_headroom)
+        )
+        if res.rowcount == 0:
+            # No ledger yet: build it from the (already flushed) current state instead
+            await rebuild(db, [user_id])
+
+async def apply_reserving(db: AsyncSession, user_id: int, before: dict[int, tuple[float, float]], after: dict[int, tuple[float, float]]) -> None:
+    """Optimistic-mode ``check_available`` plus ``apply``, without a locking read.
+
+    The bidder's change is a conditional UPDATE that only matches while the ledger,
+    moved by it, still fits the balance: a compare-and-swap on the ledger row. Call
+    after the bid rows and summary are flushed; a rejection leaves the transaction
+    for the caller to roll back.
+    """
+    old_c, old_h = before.get(user_id, (0.0, 0.0))
+    new_c, new_h = after.get(user_id, (0.0, 0.0))
+    d_committed, d_headroom = new_c - old_c, new_h - old_h
+    balance = select(func.coalesce(User.balance, 0.0)).where(User.id == user_id).scalar_subquery()
+    res = await db.execute(
+        update(UserExposure)
+        .where(UserExposure.user_id == user_id,
+               UserExposure.committed + UserExposure.headroom + d_committed + d_headroom <= balance + EPSILON)
+        .values(committed=UserExposure.committed + d_committed, headroom=UserExposure.headroom + d_headroom)
+    )
+    if res.rowcount == 0:
+        row = (await db.execute(select(UserExposure.user_id).where(UserExposure.user_id == user_id))).first()
+        if row is not None:
+            raise HTTPException(status_code=400, detail="Bid exceeds your available balance across live auctions")
+        # No ledger yet: build it from the flushed state, which already includes this bid
+        await rebuild(db, [user_id])
+        res = await db.execute(
+            select(UserExposure.committed + UserExposure.headroom, balance).where(UserExposure.user_id == user_id)
+        )
+        row = res.first()
+        if row is None:
+            raise HTTPException(status_code=404, detail="User not found")
+        if row[0] > float(row[1] or 0.0) + EPSILON:
+            raise HTTPException(status_code=400, detail="Bid exceeds your available balance across live auctions")
+    await apply(db, {uid: c for uid, c in before.items() if uid != user_id}, {uid: c for uid, c in after.items() if uid != user_id})
+
+async def release(db: AsyncSession, bids: list[Bid]) -> None:
+    """Settlement: the item is no longer live, so drop every bidder's contribution to it."""
+    await apply(db, contributions(bids), {})
+
+def create(db: AsyncSession, user: User) -> UserExposure:
+    ledger = UserExposure(user_id=user.id, committed=0.0, headroom=0.0)
+    db.add(ledger)
+    return ledger
+
+async def rebuild(db: AsyncSession, user_ids: list[int] | None = None) -> int:
+    """Recompute ledgers from live bids and item summaries. Returns rows written."""
+    live = ItemSummary.status != "closed"
+    committed = (
+        select(func.coalesce(func.sum(ItemSummary.high_bid), 0.0))
+        .where(ItemSummary.leader_user_id == User.id, live)
+        .scalar_subquery()
+    )
+    leads = ItemSummary.leader_user_id == Bid.user_id
+    headroom = (
+        select(func.coalesce(func.sum(case(
+            (leads, case((Bid.max_budget > Bid.amount, Bid.max_budget - Bid.amount), else_=0.0)),
+            else_=Bid.max_budget,
+        )), 0.0))
+        .select_from(Bid)
+        .join(ItemSummary, ItemSummary.item_id == Bid.item_id)
+        .where(Bid.user_id == User.id, live, or_(
+            leads,
+            and_(Bid.max_budget.is_not(None), Bid.bid_increment > 0, Bid.max_budget > ItemSummary.high_bid),
+        ))
+        .scalar_subquery()
+    )
+    source = select(User.id, committed, headroom)
+    stmt = delete(UserExposure).execution_options(synchronize_session=False)
+    if user_ids is not None:
+        source = source.where(User.id.in_(user_ids))
+        stmt = stmt.where(UserExposure.user_id.in_(user_ids))
+    await db.execute(stmt)
+    res = await db.execute(insert(UserExposure).from_select(["user_id", "committed", "headroom"], source))
+    return res.rowcount
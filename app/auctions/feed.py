@@ -0,0 +1,91 @@
+"""Lobby change feed behind ``GET /items/changes``.
+
+Every committed lobby change already bumps the Redis counter ``lobby:version``;
+:func:`~app.auctions.versions.publish_item_changes` also announces
+``"<version> <id,id,...>"`` on ``lobby:changes``. Each worker keeps the recent
+announcements in :class:`LobbyFeed`, keyed by version, so a client holding
+cursor ``n`` (a lobby version) gets the ids touched in ``(n, head]`` without
+any query beyond those rows. Versions are global, so a cursor is valid on any
+worker. The buffer only answers over a contiguous run of versions: a cursor
+older than the buffer, a gap that never fills, or a lost subscription means
+the client gets a full snapshot instead.
+"""
+from datetime import datetime
+from app.core.pubsub import listener
+
+LOBBY_CHANNEL = "lobby:changes"
+# Versions kept per worker
+FEED_CAPACITY = 4096
+# A missing version is given up on once this many later versions have arrived
+MAX_PENDING = 256
+
+
+class LobbyFeed:
+    """Ring buffer of ``version -> item ids``.
+
+    ``base`` is the newest version *not* covered (everything at or below it
+    was dropped or predates the buffer); ``head`` is the newest version such
+    that every version in ``(base, head]`` is present.
+    """
+
+    def __init__(self, capacity: int = FEED_CAPACITY):
+        self.capacity = capacity
+        self.live = False
+        self.base = 0
+        self.head = 0
+        self._entries: dict[int, tuple[int, ...]] = {}
+        # Earliest clock-driven lobby change (start or end of an open item) seen by this worker
+        self.due_at: datetime | None = None
+
+    def reset(self, version: int | None) -> None:
+        """Start over at ``version``; the buffer is trusted again only when ``version`` is known."""
+        self._entries.clear()
+        self.base = self.head = version or 0
+        self.live = version is not None
+
+    def mark_lost(self) -> None:
+        self.live = False
+
+    def record(self, version: int, item_ids) -> None:
+        if version <= self.head or version in self._entries:
+            return
+        self._entries[version] = tuple(item_ids)
+        self._advance()
+        if len(self._entries) - (self.head - self.base) > MAX_PENDING:
+            # The missing version is not coming; older cursors fall back to a snapshot
+            skip_to = min(v for v in self._entries if v > self.head) - 1
+            self._entries = {v: ids for v, ids in self._entries.items() if v > skip_to}
+            self.base = self.head = skip_to
+            self._advance()
+        while self.head - self.base > self.capacity:
+            self._entries.pop(self.base + 1, None)
+            self.base += 1
+
+    def _advance(self) -> None:
+        while self.head + 1 in self._entries:
+            self.head += 1
+
+    def since(self, cursor: int) -> set[int] | None:
+        """Item ids changed after ``cursor``, or None when only a snapshot can answer."""
+        if not self.live or cursor < self.base:
+            return None
+        changed: set[int] = set()
+        for version in range(cursor + 1, self.head + 1):
+            changed.update(self._entries[version])
+        return changed
+
+    def on_message(self, data: str) -> None:
+        version, _, ids = data.partition(" ")
+        self.record(int(version), (int(i) for i in ids.split(",") if i))
+
+    def note_due(self, at: datetime | None) -> None:
+        if at is not None and (self.due_at is None or at < self.due_at):
+            self.due_at = at
+
+    def is_due(self, now: datetime) -> bool:
+        return self.due_at is None or now >= self.due_at
+
+
+lobby_feed = LobbyFeed()
+listener.subscribe(LOBBY_CHANNEL, lobby_feed.on_message)
+listener.on_disconnect(lobby_feed.mark_lost)
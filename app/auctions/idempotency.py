@@ -0,0 +1,123 @@
+"""``Idempotency-Key`` handling for bid and join.
+
+The first outcome of a keyed request is stored in Redis under
+``idem:{user}:{key}`` for ``idempotency_ttl_seconds``; a retry with the same
+key replays it (``Idempotent-Replayed: true``) without touching Postgres.
+While the first attempt runs, the key holds a pending marker: duplicates in
+the same worker wait on its in-process future, duplicates on other workers
+poll the marker briefly and otherwise get a retryable 409. A key reused for a
+different request is rejected with 422.
+
+Only final outcomes are stored: 2xx and 4xx answers, except 429 and anything
+carrying ``Retry-After`` (lock busy, overloaded), which the client should
+simply retry. Without Redis only the in-process coalescing remains.
+"""
+import asyncio
+import hashlib
+from typing import Any, Awaitable, Callable
+import orjson
+from fastapi import HTTPException, Response
+from app.core.config import settings
+from app.auctions.tx_bid import retry_later
+import app.core.redis as redis_module
+
+MAX_KEY_LENGTH = 255
+PENDING = b"pending"
+# Poll interval while another worker runs the first attempt
+POLL_SECONDS = 0.05
+# Lifetime of the pending marker, in case the first attempt dies without clearing it
+PENDING_TTL_SECONDS = 30
+# Outcome handed to coalesced waiters when the first attempt ended without one
+RETRY = {"status": 503, "retry": True}
+
+_inflight: dict[str, asyncio.Future] = {}
+
+
+def redis_key(scope: str, key: str) -> str:
+    return f"idem:{hashlib.sha256(scope.encode()).hexdigest()[:32]}:{key}"
+
+def fingerprint(*parts: Any) -> str:
+    return hashlib.sha256(orjson.dumps(parts)).hexdigest()
+
+def storable(exc: HTTPException) -> bool:
+    return exc.status_code < 500 and exc.status_code != 429 and "Retry-After" not in (exc.headers or {})
+
+async def run(response: Response, scope: str, key: str | None, request_fp: str, handler: Callable[[], Awaitable[dict]]) -> dict:
+    """Run ``handler`` once per ``(scope, key)``; retries get the stored or in-flight outcome."""
+    if key is None:
+        return await handler()
+    if not key or len(key) > MAX_KEY_LENGTH:
+        raise HTTPException(status_code=400, detail=f"Idempotency-Key must be 1-{MAX_KEY_LENGTH} characters")
+    name = redis_key(scope, key)
+    shared = _inflight.get(name)
+    if shared is not None:
+        fp, outcome = await asyncio.shield(shared)
+        return _replay(response, request_fp, fp, outcome)
+    # Registered before the first await so same-worker duplicates coalesce here, not in Redis
+    future = asyncio.get_running_loop().create_future()
+    _inflight[name] = future
+    try:
+        stored = await _claim(name)
+        if stored is not None:
+            future.set_result((stored["fp"], stored))
+            return _replay(response, request_fp, stored["fp"], stored)
+        try:
+            result = await handler()
+        except HTTPException as exc:
+            outcome = {"status": exc.status_code, "detail": exc.detail, "headers": exc.headers}
+            future.set_result((request_fp, outcome))
+            await _finish(name, request_fp, outcome, storable(exc))
+            raise
+        except BaseException:
+            await _finish(name, request_fp, None, False)
+            raise
+        outcome = {"status": 200, "body": result}
+        future.set_result((request_fp, outcome))
+        await _finish(name, request_fp, outcome, True)
+        return result
+    finally:
+        _inflight.pop(name, None)
+        if not future.done():
+            # Waiters of an attempt that failed unexpectedly (or timed out claiming) are told to retry
+            future.set_result((request_fp, RETRY))
+
+async def _claim(name: str) -> dict | None:
+    """Take the key for this attempt, or return the outcome already stored under it.
+
+    Waits while another worker holds the pending marker; a 409 is raised if it is not done in time.
+    """
+    client = redis_module.redis_client
+    deadline = asyncio.get_running_loop().time() + settings.idempotency_wait_seconds
+    while True:
+        try:
+            if await client.set(name, PENDING, ex=PENDING_TTL_SECONDS, nx=True):
+                return None
+            raw = await client.get(name)
+        except Exception:
+            # No Redis: nothing to replay across workers; run the request
+            return None
+        if raw is not None and raw != PENDING and raw != PENDING.decode():
+            return orjson.loads(raw)
+        if asyncio.get_running_loop().time() >= deadline:
+            raise retry_later(409, "request_in_progress", "A request with this Idempotency-Key is still in progress")
+        await asyncio.sleep(POLL_SECONDS)
+
+async def _finish(name: str, request_fp: str, outcome: dict | None, store: bool) -> None:
+    try:
+        if store and outcome is not None:
+            await redis_module.redis_client.set(name, orjson.dumps({"fp": request_fp, **outcome}), ex=settings.idempotency_ttl_seconds)
+        else:
+            await redis_module.redis_client.delete(name)
+    except Exception:
+        return
+
+def _replay(response: Response, request_fp: str, stored_fp: str, outcome: dict) -> dict:
+    if stored_fp != request_fp:
+        raise HTTPException(status_code=422, detail="Idempotency-Key was already used for a different request")
+    if outcome.get("retry"):
+        raise retry_later(503, "retry", "The original request failed, retry it")
+    if outcome["status"] >= 400:
+        headers = {**(outcome.get("headers") or {}), "Idempotent-Replayed": "true"}
+        raise HTTPException(status_code=outcome["status"], detail=outcome["detail"], headers=headers)
+    response.headers["Idempotent-Replayed"] = "true"
+    return outcome["body"]
@@ -0,0 +1,108 @@
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Iterable
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.models import Image
+
+
+@dataclass(frozen=True, slots=True)
+class CachedImage:
+    """Detached copy of an ``images`` row; safe to share between sessions and requests."""
+    id: int
+    unsplash_id: str | None
+    image_url: str | None
+    image_thumb_url: str | None
+    image_attribution: str | None
+    image_attribution_link: str | None
+
+    @classmethod
+    def of(cls, image) -> "CachedImage":
+        return cls(image.id, image.unsplash_id, image.image_url, image.image_thumb_url,
+                   image.image_attribution, image.image_attribution_link)
+
+
+class ImageCache:
+    """Bounded LRU of ``images`` rows, keyed by id and by ``unsplash_id``.
+
+    Image rows are never updated after insert, so entries need no invalidation;
+    the bound only caps memory. Only committed rows may be added (``put`` after
+    the inserting transaction commits), otherwise a rolled-back id could be
+    handed out by ``get_by_unsplash_id``.
+    """
+
+    def __init__(self, maxsize: int = 10000):
+        self.maxsize = maxsize
+        self._by_id: OrderedDict[int, CachedImage] = OrderedDict()
+        self._by_unsplash_id: dict[str, int] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, image_id: int) -> CachedImage | None:
+        image = self._by_id.get(image_id)
+        if image is None:
+            self.misses += 1
+            return None
+        self._by_id.move_to_end(image_id)
+        self.hits += 1
+        return image
+
+    def get_by_unsplash_id(self, unsplash_id: str) -> CachedImage | None:
+        image_id = self._by_unsplash_id.get(unsplash_id)
+        if image_id is None:
+            self.misses += 1
+            return None
+        return self.get(image_id)
+
+    def put(self, image) -> CachedImage:
+        cached = image if isinstance(image, CachedImage) else CachedImage.of(image)
+        self._by_id[cached.id] = cached
+        self._by_id.move_to_end(cached.id)
+        if cached.unsplash_id:
+            self._by_unsplash_id[cached.unsplash_id] = cached.id
+        while len(self._by_id) > self.maxsize:
+            _, evicted = self._by_id.popitem(last=False)
+            if evicted.unsplash_id:
+                self._by_unsplash_id.pop(evicted.unsplash_id, None)
+        return cached
+
+    async def load(self, db: AsyncSession, image_id: int | None) -> CachedImage | None:
+        if image_id is None:
+            return None
+        return (await self.load_many(db, [image_id])).get(image_id)
+
+    async def load_many(self, db: AsyncSession, image_ids: Iterable[int | None]) -> dict[int, CachedImage]:
+        """Images by id; the ones not cached are read in a single query and cached."""
+        found: dict[int, CachedImage] = {}
+        missing = []
+        for image_id in dict.fromkeys(i for i in image_ids if i is not None):
+            image = self.get(image_id)
+            if image is None:
+                missing.append(image_id)
+            else:
+                found[image_id] = image
+        if missing:
+            res = await db.execute(select(Image).where(Image.id.in_(missing)))
+            for image in res.scalars().all():
+                found[image.id] = self.put(image)
+        return found
+
+    def snapshot(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._by_id),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+        }
+
+    def clear(self) -> None:
+        self._by_id.clear()
+        self._by_unsplash_id.clear()
+        self.hits = 0
+        self.misses = 0
+
+
+image_cache = ImageCache(settings.image_cache_size)
@@ -0,0 +1,86 @@
+"""Redis bid ladder: each item's bids ranked by amount.
+
+One sorted set per item maps bidder id to that bidder's current amount. A
+bidder has a single ``bids`` row per item whose amount only ever rises, and a
+bid (including a proxy auto-raise) changes only the winner's row, so each
+committed bid is one ``ZADD GT`` of ``(winner_user_id, amount)``. Writes are
+monotonic and commute, so late or repeated writes, and a rebuild racing a bid,
+can never lower a score. The set also holds a sentinel member scored ``-inf``
+marking it complete. A ladder without the sentinel (never built, expired, or
+after a failed write) is rebuilt from ``bids`` by the next reader. Without
+Redis, reads go straight to an indexed top-N query.
+"""
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.models import Bid, Item
+import app.core.redis as redis_module
+
+SENTINEL = "-"
+
+
+def ladder_key(item_id: int) -> str:
+    return f"ladder:{item_id}"
+
+async def record(result: dict) -> None:
+    """Apply a committed ``place_bid`` result to the item's ladder."""
+    key = ladder_key(result["item_id"])
+    try:
+        pipe = redis_module.redis_client.pipeline(transaction=False)
+        pipe.zadd(key, {str(result["winner_user_id"]): float(result["amount"])}, gt=True)
+        pipe.expire(key, settings.ladder_ttl_seconds)
+        await pipe.execute()
+    except Exception:
+        await _invalidate(result["item_id"])
+
+async def _invalidate(item_id: int) -> None:
+    # Dropping the sentinel makes the next reader rebuild this item from the table
+    try:
+        await redis_module.redis_client.zrem(ladder_key(item_id), SENTINEL)
+    except Exception:
+        return
+
+async def _item_exists(db: AsyncSession, item_id: int) -> bool:
+    return (await db.execute(select(Item.id).where(Item.id == item_id))).first() is not None
+
+async def rebuild(db: AsyncSession, item_id: int) -> list[tuple[int, float]] | None:
+    """Merge the item's bids from the table into its ladder. Returns them, highest first,
+    or None (writing nothing) when the item does not exist."""
+    res = await db.execute(select(Bid.user_id, Bid.amount).where(Bid.item_id == item_id).order_by(Bid.amount.desc(), Bid.id))
+    rows = [(user_id, float(amount)) for user_id, amount in res.all()]
+    if not rows and not await _item_exists(db, item_id):
+        return None
+    key = ladder_key(item_id)
+    try:
+        pipe = redis_module.redis_client.pipeline(transaction=False)
+        if rows:
+            pipe.zadd(key, {str(user_id): amount for user_id, amount in rows}, gt=True)
+        pipe.zadd(key, {SENTINEL: float("-inf")})
+        pipe.expire(key, settings.ladder_ttl_seconds)
+        await pipe.execute()
+    except Exception:
+        pass
+    return rows
+
+async def _query(db: AsyncSession, item_id: int, n: int) -> list[tuple[int, float]] | None:
+    res = await db.execute(select(Bid.user_id, Bid.amount).where(Bid.item_id == item_id).order_by(Bid.amount.desc(), Bid.id).limit(n))
+    rows = [(user_id, float(amount)) for user_id, amount in res.all()]
+    if not rows and not await _item_exists(db, item_id):
+        return None
+    return rows
+
+async def top(db: AsyncSession, item_id: int, n: int) -> list[tuple[int, float]] | None:
+    """The ``n`` highest ``(user_id, amount)`` pairs for the item, highest first; None for an unknown item."""
+    key = ladder_key(item_id)
+    try:
+        pipe = redis_module.redis_client.pipeline(transaction=False)
+        pipe.zscore(key, SENTINEL)
+        pipe.zrevrange(key, 0, n, withscores=True)
+        complete, entries = await pipe.execute()
+    except Exception:
+        return await _query(db, item_id, n)
+    if complete is None:
+        rows = await rebuild(db, item_id)
+        return rows[:n] if rows is not None else None
+    members = [(m.decode() if isinstance(m, bytes) else m, score) for m, score in entries]
+    return [(int(member), float(score)) for member, score in members if member != SENTINEL][:n]
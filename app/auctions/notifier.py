@@ -0,0 +1,56 @@
+import asyncio
+from contextlib import contextmanager
+from app.core.pubsub import listener
+
+ITEMS_CHANNEL = "items:changed"
+
+
+class ItemNotifier:
+    """In-process wake-ups for requests waiting on an item to change.
+
+    A waiter registers with :meth:`watch` *before* reading the item's version,
+    so a change committed between the read and the wait still wakes it.
+    Changes made on other workers arrive through the ``items:changed`` channel.
+    """
+
+    def __init__(self):
+        self._events: dict[int, asyncio.Event] = {}
+        self._waiters: dict[int, int] = {}
+
+    @contextmanager
+    def watch(self, item_id: int):
+        event = self._events.get(item_id)
+        if event is None:
+            event = self._events[item_id] = asyncio.Event()
+        self._waiters[item_id] = self._waiters.get(item_id, 0) + 1
+        try:
+            yield event
+        finally:
+            remaining = self._waiters[item_id] - 1
+            if remaining:
+                self._waiters[item_id] = remaining
+            else:
+                del self._waiters[item_id]
+                if self._events.get(item_id) is event:
+                    del self._events[item_id]
+
+    def notify(self, item_id: int) -> None:
+        event = self._events.pop(item_id, None)
+        if event is not None:
+            event.set()
+
+    def waiting(self, item_id: int) -> int:
+        return self._waiters.get(item_id, 0)
+
+
+async def wait_for(event: asyncio.Event, timeout: float) -> bool:
+    """Return True if the event fired, False on timeout."""
+    try:
+        await asyncio.wait_for(event.wait(), timeout)
+        return True
+    except asyncio.TimeoutError:
+        return False
+
+
+item_notifier = ItemNotifier()
+listener.subscribe(ITEMS_CHANNEL, lambda data: item_notifier.notify(int(data)))
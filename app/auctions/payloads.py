@@ -0,0 +1,66 @@
+from collections import OrderedDict
+from typing import Hashable
+import orjson
+
+
+class PayloadCache:
+    """Bounded LRU of pre-serialized JSON objects.
+
+    Entries are keyed by ``(item_id, state)`` where ``state`` is whatever
+    identifies the item's content at that moment. Only the parts of a payload
+    that stay identical between polls are cached; per-request fields such as
+    countdowns are spliced in with :func:`extend_object`.
+    """
+
+    def __init__(self, maxsize: int = 4096):
+        self.maxsize = maxsize
+        self._entries: OrderedDict[tuple[int, Hashable], bytes] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, item_id: int, state: Hashable) -> bytes | None:
+        key = (item_id, state)
+        data = self._entries.get(key)
+        if data is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return data
+
+    def put(self, item_id: int, state: Hashable, payload: dict) -> bytes:
+        data = orjson.dumps(payload)
+        self._entries[(item_id, state)] = data
+        self._entries.move_to_end((item_id, state))
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+        return data
+
+    def get_or_render(self, item_id: int, state: Hashable, render) -> bytes:
+        data = self.get(item_id, state)
+        if data is None:
+            data = self.put(item_id, state, render())
+        return data
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+
+def extend_object(fragment: bytes, extra: dict) -> bytes:
+    """Append the keys of ``extra`` to a serialized JSON object without re-encoding it."""
+    if not extra:
+        return fragment
+    tail = orjson.dumps(extra)
+    if fragment == b"{}":
+        return tail
+    return fragment[:-1] + b"," + tail[1:]
+
+
+def join_array(fragments: list[bytes]) -> bytes:
+    return b"[" + b",".join(fragments) + b"]"
+
+
+item_payloads = PayloadCache()
+lobby_payloads = PayloadCache()
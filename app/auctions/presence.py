@@ -0,0 +1,116 @@
+"""Redis presence registry for auction participants.
+
+Each item has a set of joined user ids, a marker saying the set was loaded
+from the table, and a generation counter bumped by every join and leave.
+``auction_participants`` stays the source of truth: the registry is written
+after the join/leave commit, rebuilt from Postgres on startup, resynchronised
+per item whenever its marker is missing, and bypassed entirely when Redis is
+unavailable. Player counts come from ``item_summaries``; the registry only
+answers membership.
+
+A resync reads the table, then writes the set. A join or leave landing in
+between bumps the generation, and the resync then drops its marker so the next
+reader loads the item again instead of trusting a set that may hold a user who
+just left. Registry writes that fail are remembered per worker and resynced on
+the next read that reaches Redis.
+"""
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models import AuctionParticipant, Item
+import app.core.redis as redis_module
+
+# Items whose registry entry this worker failed to write or invalidate
+_stale: set[int] = set()
+
+
+def members_key(item_id: int) -> str:
+    return f"presence:{item_id}"
+
+def synced_key(item_id: int) -> str:
+    return f"presence:synced:{item_id}"
+
+def generation_key(item_id: int) -> str:
+    return f"presence:gen:{item_id}"
+
+async def _write(item_id: int, op: str, user_id: int) -> None:
+    try:
+        pipe = redis_module.redis_client.pipeline()
+        getattr(pipe, op)(members_key(item_id), user_id)
+        pipe.incr(generation_key(item_id))
+        await pipe.execute()
+    except Exception:
+        await _invalidate(item_id)
+
+async def add(item_id: int, user_id: int) -> None:
+    await _write(item_id, "sadd", user_id)
+
+async def remove(item_id: int, user_id: int) -> None:
+    await _write(item_id, "srem", user_id)
+
+async def _invalidate(item_id: int) -> None:
+    # Dropping the marker forces the next reader to resync this item from the table
+    try:
+        await redis_module.redis_client.delete(synced_key(item_id))
+    except Exception:
+        _stale.add(item_id)
+
+async def sync_item(db: AsyncSession, item_id: int) -> list[int]:
+    """Reload one item's registry entry from the table and return its members."""
+    client = redis_module.redis_client
+    try:
+        generation = await client.get(generation_key(item_id))
+        available = True
+    except Exception:
+        available = False
+    res = await db.execute(select(AuctionParticipant.user_id).where(AuctionParticipant.item_id == item_id))
+    user_ids = list(res.scalars().all())
+    if not available:
+        return user_ids
+    try:
+        pipe = client.pipeline()
+        pipe.delete(members_key(item_id))
+        if user_ids:
+            pipe.sadd(members_key(item_id), *user_ids)
+        pipe.set(synced_key(item_id), 1)
+        pipe.get(generation_key(item_id))
+        *_, current = await pipe.execute()
+        if current != generation:
+            # A join or leave raced this read; leave the item for the next reader to resync
+            await client.delete(synced_key(item_id))
+        _stale.discard(item_id)
+    except Exception:
+        _stale.add(item_id)
+    return user_ids
+
+async def rebuild(db: AsyncSession) -> int:
+    """Rebuild the registry for every item that is not closed. Returns the number of items synced."""
+    res = await db.execute(select(Item.id).where(Item.status != "closed"))
+    item_ids = list(res.scalars().all())
+    for item_id in item_ids:
+        await sync_item(db, item_id)
+    return len(item_ids)
+
+async def is_joined(db: AsyncSession, item_id: int, user_id: int, verify: bool = True) -> bool:
+    """Membership check in one round trip. With ``verify`` a negative answer is confirmed
+    against the table, so a registry that missed a join can never lock a participant out."""
+    synced = None
+    if item_id not in _stale:
+        try:
+            pipe = redis_module.redis_client.pipeline()
+            pipe.get(synced_key(item_id))
+            pipe.sismember(members_key(item_id), user_id)
+            synced, member = await pipe.execute()
+        except Exception:
+            synced = None
+        else:
+            for stale_id in list(_stale):
+                await sync_item(db, stale_id)
+    if synced is None:
+        return user_id in await sync_item(db, item_id)
+    if member or not verify:
+        return bool(member)
+    res = await db.execute(select(AuctionParticipant.id).where(AuctionParticipant.item_id == item_id, AuctionParticipant.user_id == user_id))
+    if res.scalar() is None:
+        return False
+    await add(item_id, user_id)
+    return True
@@ -0,0 +1,66 @@
+"""Background settlement of auctions that ended while nobody was looking.
+
+Items transition lazily, when a request reads them. An auction that has ended
+but is not polled would otherwise stay ``in_progress``: its winner is never
+charged and its bidders' exposure (see ``exposures``) stays committed, so their
+bids elsewhere are refused. Each worker runs a ``Settler`` that closes such
+items every ``SETTLE_INTERVAL_SECONDS``.
+"""
+import asyncio
+from datetime import datetime, timezone
+import structlog
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.auctions.endpoints import ensure_transition_and_spawn_next, take_spawned, to_naive_utc
+from app.auctions.versions import publish_item_changes
+from app.models import Item
+
+logger = structlog.get_logger()
+
+
+async def settle_ended(db: AsyncSession, now: datetime) -> list[int]:
+    """Close every item whose end has passed. Returns the ids closed."""
+    # SKIP LOCKED: items another worker is settling right now are left to it
+    res = await db.execute(
+        select(Item)
+        .where(Item.status != "closed", Item.end_at <= to_naive_utc(now))
+        .with_for_update(skip_locked=True)
+    )
+    closed = [item.id for item in res.scalars().all() if await ensure_transition_and_spawn_next(db, item, now)]
+    if closed:
+        await db.commit()
+        await publish_item_changes(*closed, *take_spawned(db))
+    return closed
+
+
+class Settler:
+    def __init__(self, sessions, interval_seconds: float):
+        self.sessions = sessions
+        self.interval_seconds = interval_seconds
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        if self._task is None and self.interval_seconds > 0:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                async with self.sessions() as db:
+                    closed = await settle_ended(db, datetime.now(timezone.utc))
+                if closed:
+                    logger.info("Settled ended auctions", item_ids=closed)
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                logger.warning("Settlement pass failed", error=str(exc))
+            await asyncio.sleep(self.interval_seconds)
@@ -0,0 +1,101 @@
+"""Maintenance of the ``item_summaries`` read model.
+
+One row per item holds what the lobby and the room render: leader, high bid,
+bid and player counts, image URLs and the stored status. Every writer updates
+it inside its own transaction (``place_bid``, join/leave, transitions and
+settlement), so reads never aggregate ``bids`` or ``auction_participants``.
+:func:`rebuild` recomputes rows from the source tables when they drift.
+"""
+from sqlalchemy import select, update, delete, insert, func, true
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models import ItemSummary, Item, Bid, AuctionParticipant, Image
+
+_COLUMNS = ["item_id", "status", "high_bid", "leader_user_id", "bid_count", "player_count", "image_url", "image_thumb_url"]
+
+
+def _source(item_ids: list[int] | None = None):
+    """Summary rows computed from the source tables, in ``_COLUMNS`` order."""
+    high_bid = select(func.max(Bid.amount)).where(Bid.item_id == Item.id).scalar_subquery()
+    leader = select(Bid.user_id).where(Bid.item_id == Item.id).order_by(Bid.amount.desc(), Bid.id).limit(1).scalar_subquery()
+    bid_count = select(func.count(Bid.id)).where(Bid.item_id == Item.id).scalar_subquery()
+    player_count = select(func.count(AuctionParticipant.id)).where(AuctionParticipant.item_id == Item.id).scalar_subquery()
+    stmt = (
+        select(Item.id, func.coalesce(Item.status, "scheduled"), high_bid, leader, bid_count, player_count, Image.image_url, Image.image_thumb_url)
+        .outerjoin(Image, Image.id == Item.image_id)
+    )
+    # Always a WHERE: SQLite cannot parse INSERT ... SELECT ... ON CONFLICT without one
+    return stmt.where(Item.id.in_(item_ids) if item_ids is not None else true())
+
+async def compute(db: AsyncSession, item_ids: list[int]) -> dict[int, ItemSummary]:
+    """Summaries computed from the source tables without storing them (read-only fallback)."""
+    if not item_ids:
+        return {}
+    res = await db.execute(_source(item_ids))
+    return {row[0]: ItemSummary(**dict(zip(_COLUMNS, row))) for row in res.all()}
+
+async def rebuild(db: AsyncSession, item_ids: list[int] | None = None) -> int:
+    """Recompute stored summaries for ``item_ids`` (all items when None). Returns rows written.
+
+    An upsert on ``item_id``, so the per-item fallbacks below can run in concurrent
+    transactions without a primary-key violation.
+    """
+    dialect = db.get_bind().dialect.name
+    if dialect in ("postgresql", "sqlite"):
+        stmt = (postgresql if dialect == "postgresql" else sqlite).insert(ItemSummary).from_select(_COLUMNS, _source(item_ids))
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[ItemSummary.item_id],
+            set_={column: stmt.excluded[column] for column in _COLUMNS[1:]},
+        )
+        res = await db.execute(stmt)
+        return res.rowcount
+    stmt = delete(ItemSummary).execution_options(synchronize_session=False)
+    if item_ids is not None:
+        stmt = stmt.where(ItemSummary.item_id.in_(item_ids))
+    await db.execute(stmt)
+    res = await db.execute(insert(ItemSummary).from_select(_COLUMNS, _source(item_ids)))
+    return res.rowcount
+
+def create(db: AsyncSession, item: Item, image_url: str | None = None, image_thumb_url: str | None = None) -> ItemSummary:
+    """Summary for a new item; the item must already have its id (flushed)."""
+    summary = ItemSummary(item_id=item.id, status=item.status or "scheduled", bid_count=0, player_count=0,
+                          image_url=image_url, image_thumb_url=image_thumb_url)
+    db.add(summary)
+    return summary
+
+async def create_many(db: AsyncSession, rows: list[dict]) -> None:
+    """Summaries for new items in one multi-row insert; each row has ``item_id``, ``image_url``, ``image_thumb_url``."""
+    if rows:
+        await db.execute(insert(ItemSummary), [{"status": "scheduled", "bid_count": 0, "player_count": 0, **row} for row in rows])
+
+async def record_bid(db: AsyncSession, item_id: int, leader_user_id: int, high_bid: float, new_bid: bool) -> None:
+    """Apply a resolved bid. Call after the bid rows are flushed, inside the bid transaction."""
+    res = await db.execute(
+        update(ItemSummary)
+        .where(ItemSummary.item_id == item_id)
+        .values(high_bid=high_bid, leader_user_id=leader_user_id, bid_count=ItemSummary.bid_count + int(new_bid))
+    )
+    if res.rowcount == 0:
+        await rebuild(db, [item_id])
+
+async def add_players(db: AsyncSession, item_id: int, delta: int) -> None:
+    res = await db.execute(
+        update(ItemSummary)
+        .where(ItemSummary.item_id == item_id)
+        .values(player_count=ItemSummary.player_count + delta)
+    )
+    if res.rowcount == 0:
+        await rebuild(db, [item_id])
+
+async def set_status(db: AsyncSession, item_id: int, status: str) -> None:
+    summary = await db.get(ItemSummary, item_id)
+    if summary is None:
+        await db.flush()
+        await rebuild(db, [item_id])
+        return
+    summary.status = status
+
+def current_bid(summary: ItemSummary | None) -> dict | None:
+    if summary is None or summary.leader_user_id is None:
+        return None
+    return {"amount": summary.high_bid, "user_id": summary.leader_user_id}
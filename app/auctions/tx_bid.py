@@ -1,21 +1,83 @@
+import asyncio
+import random
+from collections import Counter
+from contextlib import contextmanager
 from datetime import datetime, timezone
 from fastapi import HTTPException, status
-from sqlalchemy import select
+from sqlalchemy import select, update, text
+from sqlalchemy.exc import DBAPIError
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
-from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from sqlalchemy.orm import Load
+from sqlalchemy.orm.attributes import set_committed_value
+from app.core.config import settings
 from app.models import Item, Bid
+from app.auctions import summaries, exposures
+
+# Base delay before retrying a lost compare-and-swap; doubles per attempt
+CAS_BACKOFF_SECONDS = 0.002
+# Process-wide optimistic-mode counters (lost swaps, bids that ran out of retries)
+cas_stats: Counter = Counter()
+# SQLSTATE raised by NOWAIT and by an expired lock_timeout
+LOCK_NOT_AVAILABLE = "55P03"
+
+
+def retry_later(status_code: int, code: str, message: str) -> HTTPException:
+    """Structured fast-fail for bids that should simply be retried shortly."""
+    retry_after = settings.bid_retry_after_seconds
+    return HTTPException(
+        status_code=status_code,
+        detail={"code": code, "message": message, "retry_after": retry_after},
+        headers={"Retry-After": str(retry_after)},
+    )
+
+class BidGate:
+    """Caps bid transactions in flight per item in this worker.
+
+    Bids on one hot item queue on the same row lock; past the cap, waiting only
+    ties up pooled connections that every other endpoint needs, so the excess is
+    turned away with a 503 instead.
+    """
+
+    def __init__(self):
+        self._inflight: dict[int, int] = {}
 
-async def fetch_item_for_update(db: AsyncSession, item_id: int) -> Item:
-    stmt = select(Item).where(Item.id == item_id).with_for_update()
+    @contextmanager
+    def admit(self, item_id: int, limit: int | None = None):
+        limit = settings.bid_max_inflight_per_item if limit is None else limit
+        inflight = self._inflight.get(item_id, 0)
+        if limit and inflight >= limit:
+            raise retry_later(503, "item_overloaded", "Too many bids in flight for this item, retry shortly")
+        self._inflight[item_id] = inflight + 1
+        try:
+            yield
+        finally:
+            remaining = self._inflight[item_id] - 1
+            if remaining:
+                self._inflight[item_id] = remaining
+            else:
+                del self._inflight[item_id]
+
+    def inflight(self, item_id: int) -> int:
+        return self._inflight.get(item_id, 0)
+
+bid_gate = BidGate()
+
+def is_lock_not_available(exc: DBAPIError) -> bool:
+    orig = exc.orig
+    return (getattr(orig, "pgcode", None) or getattr(orig, "sqlstate", None)) == LOCK_NOT_AVAILABLE
+
+async def set_lock_timeout(db: AsyncSession, timeout_ms: int) -> None:
+    """Bound every lock wait for the rest of this transaction (Postgres only)."""
+    if db.get_bind().dialect.name == "postgresql":
+        await db.execute(text(f"SET LOCAL lock_timeout = {int(timeout_ms)}"))
+
+async def fetch_item_for_update(db: AsyncSession, item_id: int, nowait: bool = False) -> Item:
+    stmt = select(Item).where(Item.id == item_id).with_for_update(nowait=nowait)
     res = await db.execute(stmt)
     return res.scalars().first()
 
-async def fetch_bids_for_update(db: AsyncSession, item_id: int) -> list[Bid]:
+async def fetch_bids_for_update(db: AsyncSession, item_id: int, nowait: bool = False) -> list[Bid]:
     """Retrieves all bids for an item with row locks"""
-    stmt = select(Bid).where(Bid.item_id == item_id).with_for_update()
+    stmt = select(Bid).where(Bid.item_id == item_id).with_for_update(nowait=nowait)
     res = await db.execute(stmt)
     return list(res.scalars().all())
 
@@ -55,24 +117,21 @@ def compute_winner(bids: list[Bid], user_id: int, amount: float, max_budget: flo
                     winner_amount = min(max_cap(best), new_amount + float(best.bid_increment))
     return winner_user_id, winner_amount, new_max_budget, new_bid_increment
 
-def apply_bid_mutation(db: AsyncSession, bids: list[Bid], item_id: int, winner_user_id: int, actor_user_id: int, winner_amount: float, max_budget: float | None, bid_increment: float | None) -> None:
-    """Applies the winning bid by creating or updating a bid in the database"""
+def apply_bid_mutation(db: AsyncSession, bids: list[Bid], item_id: int, winner_user_id: int, actor_user_id: int, winner_amount: float, max_budget: float | None, bid_increment: float | None) -> Bid | None:
+    """Applies the winning bid by creating or updating a bid in the database. Returns the new bid, if any."""
     if winner_user_id == actor_user_id:
         bid = Bid(item_id=item_id, user_id=actor_user_id, amount=winner_amount, max_budget=max_budget, bid_increment=bid_increment)
         db.add(bid)
-    else:
-        for b in bids:
-            if b.user_id == winner_user_id:
-                b.amount = max(b.amount, winner_amount)
-                break
-
-async def place_bid(db: AsyncSession, item_id: int, user_id: int, amount: float, max_budget: float | None, bid_increment: float | None) -> dict:
-    item = await fetch_item_for_update(db, item_id)
+        return bid
+    for b in bids:
+        if b.user_id == winner_user_id:
+            b.amount = max(b.amount, winner_amount)
+            break
+    return None
 
+def check_bidding_window(item: Item | None, now: datetime) -> None:
     if not item:
         raise HTTPException(status_code=404, detail="Item not found")
-    now = datetime.now(timezone.utc)
-
     # Enforce lifecycle: bids only while in_progress window is active
     start_at = item.start_at
     end_at = item.end_at
@@ -85,16 +144,93 @@ async def place_bid(db: AsyncSession, item_id: int, user_id: int, amount: float,
     if not (start_at <= now < end_at):
         raise HTTPException(status_code=400, detail="Bidding not allowed at this time")
 
-    bids = await fetch_bids_for_update(db, item_id)
-    check_bid_placed(bids, user_id)
-
+def check_min_start_price(item: Item, bids: list[Bid], amount: float) -> None:
     # First bid must meet min_start_price
     if not bids:
         if float(amount) < float(item.min_start_price or 0.0):
             raise HTTPException(status_code=400, detail="Bid below minimum start price")
 
+async def place_bid(db: AsyncSession, item_id: int, user_id: int, amount: float, max_budget: float | None, bid_increment: float | None, mode: str | None = None) -> dict:
+    """Resolve and apply one bid inside the caller's transaction; ``mode`` defaults to ``settings.bid_concurrency_mode``.
+
+    Lock waits follow ``settings.bid_lock_policy``; a lock that is not granted in time
+    becomes a 409 with ``Retry-After`` and leaves the transaction for the caller to roll back.
+    """
+    policy = settings.bid_lock_policy
+    try:
+        if policy == "timeout":
+            await set_lock_timeout(db, settings.bid_lock_timeout_ms)
+        if (mode or settings.bid_concurrency_mode) == "optimistic":
+            return await place_bid_optimistic(db, item_id, user_id, amount, max_budget, bid_increment)
+        return await place_bid_locked(db, item_id, user_id, amount, max_budget, bid_increment, nowait=policy == "nowait")
+    except DBAPIError as exc:
+        if not is_lock_not_available(exc):
+            raise
+        raise retry_later(409, "item_busy", "Item is busy with other bids, retry shortly")
+
+async def place_bid_locked(db: AsyncSession, item_id: int, user_id: int, amount: float, max_budget: float | None, bid_increment: float | None, nowait: bool = False) -> dict:
+    item = await fetch_item_for_update(db, item_id, nowait)
+    check_bidding_window(item, datetime.now(timezone.utc))
+
+    bids = await fetch_bids_for_update(db, item_id, nowait)
+    check_bid_placed(bids, user_id)
+    check_min_start_price(item, bids, amount)
+
     winner_user_id, winner_amount, new_max_budget, new_bid_increment = compute_winner(bids, user_id, amount, max_budget, bid_increment)
-    apply_bid_mutation(db, bids, item_id, winner_user_id, user_id, winner_amount, new_max_budget, new_bid_increment)
+    if winner_user_id == user_id:
+        await exposures.check_available(db, user_id, max(float(amount), new_max_budget or 0.0))
+    before = exposures.contributions(bids)
+    new_bid = apply_bid_mutation(db, bids, item_id, winner_user_id, user_id, winner_amount, new_max_budget, new_bid_increment)
+    # Row is locked FOR UPDATE, so a plain increment cannot race other writers
+    item.version = (item.version or 0) + 1
     await db.flush()
+    await summaries.record_bid(db, item_id, winner_user_id, winner_amount, new_bid is not None)
+    await exposures.apply(db, before, exposures.contributions(bids + [new_bid] if new_bid else bids))
     return {"item_id": item_id, "winner_user_id": winner_user_id, "amount": winner_amount}
 
+async def place_bid_optimistic(db: AsyncSession, item_id: int, user_id: int, amount: float, max_budget: float | None, bid_increment: float | None) -> dict:
+    """Lock-free read, then compare-and-swap on ``items.version``.
+
+    Every writer that changes an item's bids bumps its version in the same transaction,
+    so bids read after seeing version ``v`` are current iff the version is still ``v``
+    at the conditional UPDATE. Winning the CAS also takes the item's row lock, so the
+    bid mutation that follows cannot race. A lost CAS writes nothing and retries.
+    """
+    attempts = settings.bid_cas_retries + 1
+    for attempt in range(attempts):
+        res = await db.execute(select(Item).where(Item.id == item_id).execution_options(populate_existing=True))
+        item = res.scalars().first()
+        check_bidding_window(item, datetime.now(timezone.utc))
+        version = item.version or 0
+
+        res = await db.execute(select(Bid).where(Bid.item_id == item_id).execution_options(populate_existing=True))
+        bids = list(res.scalars().all())
+        check_bid_placed(bids, user_id)
+        check_min_start_price(item, bids, amount)
+        winner_user_id, winner_amount, new_max_budget, new_bid_increment = compute_winner(bids, user_id, amount, max_budget, bid_increment)
+        before = exposures.contributions(bids)
+
+        swapped = await db.execute(
+            update(Item)
+            .where(Item.id == item_id, Item.version == version)
+            .values(version=version + 1)
+            .execution_options(synchronize_session=False)
+        )
+        if swapped.rowcount == 1:
+            set_committed_value(item, "version", version + 1)
+            new_bid = apply_bid_mutation(db, bids, item_id, winner_user_id, user_id, winner_amount, new_max_budget, new_bid_increment)
+            await db.flush()
+            await summaries.record_bid(db, item_id, winner_user_id, winner_amount, new_bid is not None)
+            after = exposures.contributions(bids + [new_bid] if new_bid else bids)
+            if winner_user_id == user_id:
+                # The balance check is a compare-and-swap on the ledger, not a locking read
+                await exposures.apply_reserving(db, user_id, before, after)
+            else:
+                await exposures.apply(db, before, after)
+            return {"item_id": item_id, "winner_user_id": winner_user_id, "amount": winner_amount}
+        cas_stats["conflicts"] += 1
+        if attempt + 1 < attempts:
+            # Jittered backoff so colliding bidders do not retry in lockstep
+            await asyncio.sleep(random.uniform(0, CAS_BACKOFF_SECONDS * 2 ** attempt))
+    cas_stats["exhausted"] += 1
+    raise HTTPException(status_code=409, detail="Item changed while bidding, please retry")
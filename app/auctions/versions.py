@@ -0,0 +1,112 @@
+import re
+from datetime import datetime
+from fastapi import Response
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models import Item
+from app.core.pubsub import publish, listener
+from app.auctions.notifier import item_notifier, ITEMS_CHANNEL
+from app.auctions.feed import lobby_feed, LOBBY_CHANNEL
+import app.core.redis as redis_module
+
+LOBBY_VERSION_KEY = "lobby:version"
+_LOBBY_TAG = re.compile(r'l(\d+)\.')
+
+async def bump_item_version(db: AsyncSession, item_id: int) -> None:
+    """Atomically bump an item's version inside the caller's transaction."""
+    await db.execute(update(Item).where(Item.id == item_id).values(version=Item.version + 1))
+
+async def get_lobby_version() -> int | None:
+    try:
+        value = await redis_module.redis_client.get(LOBBY_VERSION_KEY)
+        return int(value or 0)
+    except Exception:
+        return None
+
+async def bump_lobby_version() -> int | None:
+    """Bump the lobby version. Call only after the change has been committed."""
+    try:
+        return int(await redis_module.redis_client.incr(LOBBY_VERSION_KEY))
+    except Exception:
+        return None
+
+async def publish_item_changes(*item_ids: int) -> None:
+    """Announce committed changes: bump the lobby version, feed it and wake waiters on these items."""
+    version = await bump_lobby_version()
+    if version is not None:
+        lobby_feed.record(version, item_ids)
+        await publish(LOBBY_CHANNEL, f"{version} {','.join(map(str, item_ids))}")
+    for item_id in item_ids:
+        item_notifier.notify(item_id)
+        await publish(ITEMS_CHANNEL, str(item_id))
+
+async def resync_lobby_feed() -> None:
+    # Announcements missed while unsubscribed are gone: restart the feed at the current version
+    lobby_feed.reset(await get_lobby_version())
+
+async def mark_lobby_fresh(version: int, valid_until: datetime | None, now: datetime) -> None:
+    """Record that the lobby at ``version`` will not change by time alone before ``valid_until``."""
+    if valid_until is None:
+        return
+    ttl_ms = int((valid_until - now).total_seconds() * 1000)
+    if ttl_ms <= 0:
+        return
+    try:
+        await redis_module.redis_client.set(f"lobby:fresh:{version}", "1", px=ttl_ms)
+    except Exception:
+        return
+
+async def lobby_not_modified(if_none_match: str | None, status: str | None, tick: int) -> str | None:
+    """Return the lobby ETag if the client's copy is still current, else None."""
+    if not if_none_match:
+        return None
+    m = _LOBBY_TAG.search(if_none_match)
+    if not m:
+        return None
+    version = int(m.group(1))
+    etag = lobby_etag(version, status, tick)
+    if not etag_matches(if_none_match, etag):
+        return None
+    try:
+        current, fresh = await redis_module.redis_client.mget(LOBBY_VERSION_KEY, f"lobby:fresh:{version}")
+    except Exception:
+        return None
+    if current is None or int(current) != version or fresh is None:
+        return None
+    return etag
+
+# Bodies carry whole-second countdowns, so tags include them: a revalidated copy never shows a frozen timer
+
+def item_etag(item: Item, countdown: int | None = None) -> str:
+    """``countdown`` is the ``seconds_to_start`` or ``seconds_to_end`` the body carries, if any."""
+    if countdown is None:
+        return f'W/"i{item.id}.{item.version or 0}"'
+    return f'W/"i{item.id}.{item.version or 0}.t{countdown}"'
+
+def lobby_etag(version: int, status: str | None, tick: int) -> str:
+    """``tick`` is the whole second (epoch) the lobby's countdowns were taken at."""
+    return f'W/"l{version}.{status or "all"}.t{tick}"'
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(tag.strip() == etag for tag in if_none_match.split(","))
+
+def not_modified(etag: str, vary: str | None = None) -> Response:
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if vary:
+        headers["Vary"] = vary
+    return Response(status_code=304, headers=headers)
+
+def cache_headers(etag: str | None, vary: str | None = None) -> dict:
+    headers = {"Cache-Control": "no-cache"}
+    if etag:
+        headers["ETag"] = etag
+    if vary:
+        headers["Vary"] = vary
+    return headers
+
+
+listener.on_connect(resync_lobby_feed)
@@ -0,0 +1,153 @@
+import asyncio
+from datetime import datetime, timezone
+from fastapi import APIRouter, Depends, HTTPException, WebSocket, WebSocketDisconnect
+from pydantic import ValidationError
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+import orjson
+import structlog
+from app.core.config import settings
+from app.core.db import get_sessionmaker
+from app.auth.utils import verify_token
+from app.auctions.endpoints import BidIn, load_item_view, compute_status_and_timers, ensure_transition_and_spawn_next, next_time_change, take_spawned
+from app.auctions import presence, summaries, ladder
+from app.auctions.notifier import item_notifier, wait_for
+from app.auctions.tx_bid import place_bid, bid_gate
+from app.auctions.versions import publish_item_changes
+from app.middleware.rate_limit import SlidingWindow
+from app.models import Item, User
+
+router = APIRouter(tags=['auctions'])
+logger = structlog.get_logger()
+
+# Upper bound between state checks when no change or transition is expected
+STATE_RECHECK_SECONDS = 30.0
+
+@router.websocket('/ws/items/{item_id}')
+async def auction_room(websocket: WebSocket, item_id: int, token: str | None = None, sessions=Depends(get_sessionmaker)):
+    """Auction-room channel: authenticate once, then bid by message and receive leader/price pushes.
+
+    Client messages: ``{"type": "bid", "amount": ..., "max_budget": ..., "bid_increment": ...}``.
+    Server messages: ``state`` on every change, ``bid_result`` or ``error`` per bid.
+    """
+    await websocket.accept()
+    try:
+        payload = await verify_token(token or "", "access")
+    except HTTPException as exc:
+        await websocket.close(code=4401, reason=str(exc.detail))
+        return
+    async with sessions() as db:
+        res = await db.execute(select(User).filter(User.email == payload.get("sub")))
+        user = res.scalars().first()
+        if not user:
+            await websocket.close(code=4401, reason="User not found")
+            return
+        res = await db.execute(select(Item.id).where(Item.id == item_id))
+        if res.scalar() is None:
+            await websocket.close(code=4404, reason="Item not found")
+            return
+        if not await presence.is_joined(db, item_id, user.id):
+            await websocket.close(code=4403, reason="Join the auction before bidding")
+            return
+        user_id = user.id
+
+    lock = asyncio.Lock()
+
+    async def send(message: dict) -> None:
+        async with lock:
+            await websocket.send_text(orjson.dumps(message).decode())
+
+    limiter = SlidingWindow(settings.ws_bid_limit, settings.ws_bid_window_seconds)
+    tasks = [
+        asyncio.create_task(push_state(send, sessions, item_id)),
+        asyncio.create_task(receive_bids(websocket, send, sessions, item_id, user_id, limiter)),
+    ]
+    done, pending = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+    for task in pending:
+        task.cancel()
+    await asyncio.gather(*pending, return_exceptions=True)
+    disconnected = any(isinstance(t.exception(), WebSocketDisconnect) for t in done if not t.cancelled())
+    if not disconnected:
+        try:
+            await websocket.close()
+        except RuntimeError:
+            pass
+
+async def load_state(sessions, item_id: int) -> tuple[dict, datetime | None]:
+    async with sessions() as db:
+        item, summary, _ = await load_item_view(db, item_id)
+        now = datetime.now(timezone.utc)
+        if await ensure_transition_and_spawn_next(db, item, now):
+            await db.commit()
+            await publish_item_changes(item_id, *take_spawned(db))
+        status, secs_start, secs_end = compute_status_and_timers(item, now)
+        if summary is None:
+            summary = (await summaries.compute(db, [item_id])).get(item_id)
+        state = {
+            "type": "state",
+            "item_id": item_id,
+            "version": item.version,
+            "status": status,
+            "start_at": item.start_at.isoformat() if item.start_at else None,
+            "end_at": item.end_at.isoformat() if item.end_at else None,
+            "seconds_to_start": secs_start,
+            "seconds_to_end": secs_end,
+            "current_bid": summaries.current_bid(summary),
+        }
+        return state, next_time_change(item, status, now)
+
+async def push_state(send, sessions, item_id: int) -> None:
+    last = None
+    while True:
+        with item_notifier.watch(item_id) as event:
+            state, change_at = await load_state(sessions, item_id)
+            if (state["version"], state["status"]) != last:
+                last = (state["version"], state["status"])
+                await send(state)
+            if state["status"] == "closed":
+                return
+            wait_s = STATE_RECHECK_SECONDS
+            if change_at is not None:
+                wait_s = min(wait_s, max(0.0, (change_at - datetime.now(timezone.utc)).total_seconds()))
+            await wait_for(event, wait_s)
+
+async def receive_bids(websocket: WebSocket, send, sessions, item_id: int, user_id: int, limiter: SlidingWindow) -> None:
+    while True:
+        raw = await websocket.receive_text()
+        try:
+            message = orjson.loads(raw)
+        except orjson.JSONDecodeError:
+            await send({"type": "error", "status": 400, "detail": "Invalid JSON"})
+            continue
+        if not isinstance(message, dict) or message.get("type") != "bid":
+            await send({"type": "error", "status": 400, "detail": "Unknown message type"})
+            continue
+        if not limiter.allow():
+            await send({"type": "error", "status": 429, "detail": "Write rate limit exceeded"})
+            continue
+        try:
+            body = BidIn.model_validate(message)
+        except ValidationError as exc:
+            await send({"type": "error", "status": 422, "detail": exc.errors(include_url=False, include_context=False)})
+            continue
+        try:
+            with bid_gate.admit(item_id):
+                async with sessions() as db:
+                    # Re-checked per bid: the user may have left since the socket was opened
+                    if not await presence.is_joined(db, item_id, user_id):
+                        raise HTTPException(status_code=403, detail="Join the auction before bidding")
+                    result = await place_bid(db, item_id, user_id, body.amount, body.max_budget, body.bid_increment)
+                    await db.commit()
+        except HTTPException as exc:
+            await send({"type": "error", "status": exc.status_code, "detail": exc.detail})
+            continue
+        except IntegrityError:
+            await send({"type": "error", "status": 409, "detail": "User already placed a bid for this item"})
+            continue
+        except SQLAlchemyError as exc:
+            logger.warning("Websocket bid failed", item_id=item_id, user_id=user_id, error=str(exc))
+            await send({"type": "error", "status": 500, "detail": "Bid could not be placed"})
+            continue
+        await ladder.record(result)
+        await publish_item_changes(item_id)
+        await send({"type": "bid_result", **result})
@@ -8,16 +8,21 @@ from app.auth.utils import verify_token
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
-async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_db)):
-    payload = await verify_token(token, "access")
-    email = payload.get("sub")
+async def get_token_payload(token: str = Depends(oauth2_scheme)) -> dict:
+    """Verified access-token claims; no database access."""
+    return await verify_token(token, "access")
+
+async def load_user(db: AsyncSession, email: str | None) -> User:
     user = await db.execute(select(User).filter(User.email == email))
     user = user.scalars().first()
     if not user:
         raise HTTPException(status_code=401, detail="User not found")
     return user
 
-async def require_role(role: str):
+async def get_current_user(payload: dict = Depends(get_token_payload), db: AsyncSession = Depends(get_db)):
+    return await load_user(db, payload.get("sub"))
+
+def require_role(role: str):
     async def role_checker(user=Depends(get_current_user)):
         if user.role.value != role and user.role.value != "admin":
             raise HTTPException(status_code=403, detail=f'{role.capitalize()} role required')
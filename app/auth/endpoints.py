@@ -2,11 +2,13 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
-from app.core.db import get_db
+from app.core.db import get_db, get_read_db
 from app.models import User, Role
-from app.models import OwnedItem, Item, Image
+from app.models import OwnedItem, Item
 from app.auth.utils import hash_password, verify_password, create_access_token, create_refresh_token, blacklist_token, verify_token
 from app.auth.dependencies import oauth2_scheme
+from app.auctions import exposures
+from app.auctions.images import image_cache
 from pydantic import BaseModel
 from datetime import datetime, timedelta, timezone
 
@@ -32,9 +34,14 @@ async def register(user: UserCreate, db: AsyncSession = Depends(get_db)):
         role_value = Role[user.role.upper()]
     except Exception:
         raise HTTPException(status_code=400, detail="Invalid role")
+    # Editor and admin are granted server-side only (python -m tools.set_role)
+    if role_value is not Role.VIEWER:
+        raise HTTPException(status_code=403, detail="Only viewer accounts can be self-registered")
     # Credit 500 units to new users
     db_user = User(email=user.email, pw_hash=hash_password(user.password), role=role_value, balance=500.0)
     db.add(db_user)
+    await db.flush()
+    exposures.create(db, db_user)
     await db.commit()
     await db.refresh(db_user)
     return {"email": db_user.email, "role": db_user.role.value if hasattr(db_user.role, 'value') else str(db_user.role), "balance": db_user.balance}
@@ -72,7 +79,7 @@ async def logout(token: str = Depends(oauth2_scheme)):
     return {"detail": "Logged out"}
 
 @router.get('/inventory')
-async def my_inventory(db: AsyncSession = Depends(get_db), token: str = Depends(oauth2_scheme)):
+async def my_inventory(db: AsyncSession = Depends(get_read_db), token: str = Depends(oauth2_scheme)):
     payload = await verify_token(token, "access")
     result = await db.execute(select(User).filter(User.email == payload["sub"]))
     user = result.scalars().first()
@@ -80,6 +87,13 @@ async def my_inventory(db: AsyncSession = Depends(get_db), token: str = Depends(
         raise HTTPException(status_code=401, detail='Invalid user')
     res = await db.execute(select(OwnedItem).where(OwnedItem.user_id == user.id))
     items = list(res.scalars().all())
+    # Fallback to current Item->Image for rows settled without an image snapshot, in one batch
+    bare = [oi.item_id for oi in items if not (oi.image_url or oi.image_thumb_url)]
+    image_ids: dict[int, int | None] = {}
+    if bare:
+        res_items = await db.execute(select(Item.id, Item.image_id).where(Item.id.in_(bare)))
+        image_ids = dict(res_items.all())
+    images = await image_cache.load_many(db, image_ids.values())
     out = []
     for oi in items:
         image_url = oi.image_url
@@ -88,18 +102,13 @@ async def my_inventory(db: AsyncSession = Depends(get_db), token: str = Depends(
         image_attribution_link = oi.image_attribution_link
         unsplash_id = oi.unsplash_id
         if not (image_url or image_thumb_url):
-            # Fallback to current Item->Image
-            res_item = await db.execute(select(Item).where(Item.id == oi.item_id))
-            it = res_item.scalars().first()
-            if it and it.image_id:
-                res_img = await db.execute(select(Image).where(Image.id == it.image_id))
-                img = res_img.scalars().first()
-                if img:
-                    image_url = image_url or img.image_url
-                    image_thumb_url = image_thumb_url or img.image_thumb_url
-                    image_attribution = image_attribution or img.image_attribution
-                    image_attribution_link = image_attribution_link or img.image_attribution_link
-                    unsplash_id = unsplash_id or img.unsplash_id
+            img = images.get(image_ids.get(oi.item_id))
+            if img:
+                image_url = image_url or img.image_url
+                image_thumb_url = image_thumb_url or img.image_thumb_url
+                image_attribution = image_attribution or img.image_attribution
+                image_attribution_link = image_attribution_link or img.image_attribution_link
+                unsplash_id = unsplash_id or img.unsplash_id
         out.append({
             "id": oi.id,
             "item_id": oi.item_id,
@@ -0,0 +1,95 @@
+"""Per-worker copy of the token blacklist.
+
+Revoked JTIs live in Redis as ``blacklist:{jti}`` keys with the token's
+remaining lifetime as TTL, and every revocation is published on
+``auth:revoked`` in the same MULTI. Each worker keeps the set locally: it is
+seeded with a SCAN after every (re)subscribe and extended by the channel, so
+while the subscription is up ``verify_token`` answers without a round trip.
+When it is down the local set may have missed revocations and is not
+trusted; callers fall back to Redis and fail closed if Redis is unreachable.
+"""
+import time
+from app.core.pubsub import listener
+import app.core.redis as redis_module
+
+REVOKED_CHANNEL = "auth:revoked"
+KEY_PREFIX = "blacklist:"
+# Expired entries are swept after this many insertions
+SWEEP_EVERY = 1024
+SCAN_BATCH = 1000
+
+
+def key(jti: str) -> str:
+    return f"{KEY_PREFIX}{jti}"
+
+
+class RevocationCache:
+    """Revoked JTIs with their expiry (epoch seconds); ``synced`` while the local copy is complete."""
+
+    def __init__(self):
+        self.synced = False
+        self._expires: dict[str, float] = {}
+        self._inserts = 0
+
+    def add(self, jti: str, expires_at: float) -> None:
+        self._expires[jti] = max(expires_at, self._expires.get(jti, 0.0))
+        self._inserts += 1
+        if self._inserts >= SWEEP_EVERY:
+            self.sweep()
+
+    def contains(self, jti: str, now: float | None = None) -> bool:
+        expires_at = self._expires.get(jti)
+        return expires_at is not None and expires_at > (time.time() if now is None else now)
+
+    def sweep(self, now: float | None = None) -> None:
+        now = time.time() if now is None else now
+        self._expires = {jti: exp for jti, exp in self._expires.items() if exp > now}
+        self._inserts = 0
+
+    def __len__(self) -> int:
+        return len(self._expires)
+
+    def on_message(self, data: str) -> None:
+        jti, _, expires_at = data.partition(" ")
+        self.add(jti, float(expires_at))
+
+    async def seed(self) -> int:
+        """Load every ``blacklist:*`` key from Redis and mark the copy complete. Returns entries loaded."""
+        client = redis_module.redis_client
+        now = time.time()
+        keys = [k async for k in client.scan_iter(match=f"{KEY_PREFIX}*", count=SCAN_BATCH)]
+        loaded = 0
+        for start in range(0, len(keys), SCAN_BATCH):
+            batch = keys[start:start + SCAN_BATCH]
+            pipe = client.pipeline(transaction=False)
+            for k in batch:
+                pipe.pttl(k)
+            for k, ttl_ms in zip(batch, await pipe.execute()):
+                if ttl_ms is None or ttl_ms == -2:
+                    continue
+                name = k.decode() if isinstance(k, (bytes, bytearray)) else k
+                # -1 (no TTL) never happens for keys written by revoke(); keep those for a day
+                self.add(name[len(KEY_PREFIX):], now + (ttl_ms / 1000 if ttl_ms >= 0 else 86400))
+                loaded += 1
+        self.sweep(now)
+        self.synced = True
+        return loaded
+
+    def mark_unsynced(self) -> None:
+        self.synced = False
+
+
+async def revoke(jti: str, ttl_seconds: int) -> None:
+    """Store and announce a revocation in one round trip. Raises if Redis did not take it."""
+    expires_at = time.time() + ttl_seconds
+    pipe = redis_module.redis_client.pipeline(transaction=True)
+    pipe.setex(key(jti), max(1, ttl_seconds), "1")
+    pipe.publish(REVOKED_CHANNEL, f"{jti} {expires_at:.0f}")
+    await pipe.execute()
+    cache.add(jti, expires_at)
+
+
+cache = RevocationCache()
+listener.subscribe(REVOKED_CHANNEL, cache.on_message)
+listener.on_connect(cache.seed)
+listener.on_disconnect(cache.mark_unsynced)
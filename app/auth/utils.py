@@ -2,10 +2,10 @@ from fastapi import HTTPException, status
 from jose import jwt, JWTError
 from passlib.context import CryptContext
 from datetime import datetime, timedelta, timezone
-import redis.asyncio as redis
 import uuid
 from app.core.config import settings
 import app.core.redis as redis_module
+from app.auth import revocations
 
 pwd_context = CryptContext(schemes=["argon2"], deprecated="auto")
 
@@ -27,15 +27,19 @@ async def create_refresh_token(data: dict):
 
 async def blacklist_token(jti: str, ttl_seconds: int):
     try:
-        await redis_module.redis_client.setex(f'blacklist:{jti}', ttl_seconds, '1')
+        await revocations.revoke(jti, ttl_seconds)
     except Exception:
-        return
+        # A revocation that did not reach Redis would be invisible to other workers
+        raise HTTPException(status_code=503, detail="Token revocation unavailable, try again")
 
 async def is_token_blacklisted(jti: str) -> bool:
+    if revocations.cache.synced:
+        return revocations.cache.contains(jti)
     try:
-        return await redis_module.redis_client.exists(f'blacklist:{jti}')
+        return bool(await redis_module.redis_client.exists(revocations.key(jti)))
     except Exception:
-        return False
+        # Fail closed: without Redis or a synced local copy a revoked token cannot be ruled out
+        raise HTTPException(status_code=503, detail="Token revocation status unavailable")
 
 async def verify_token(token: str, token_type: str):
     try:
@@ -1,4 +1,6 @@
 import os
+from typing import Literal
+from pydantic import model_validator
 from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
@@ -10,6 +12,73 @@ class Settings(BaseSettings):
     database_url: str
     unsplash_access_key: str | None = None
     unsplash_secret_key: str | None = None
+    # Per-connection bid limit on the auction-room websocket
+    ws_bid_limit: int = 3
+    ws_bid_window_seconds: int = 60
+    # POST /items/bids: entries per request, per-user weighted budget, parallel transactions
+    # (a batch larger than the budget could never be accepted, so max_items <= limit)
+    batch_bid_max_items: int = 30
+    batch_bid_limit: int = 30
+    batch_bid_window_seconds: int = 60
+    batch_bid_concurrency: int = 5
+    # Bid transaction: "pessimistic" (SELECT ... FOR UPDATE) or "optimistic" (version compare-and-swap)
+    bid_concurrency_mode: Literal["pessimistic", "optimistic"] = "pessimistic"
+    # Optimistic mode: retries after a lost compare-and-swap before answering 409
+    bid_cas_retries: int = 3
+    # Bid lock waits: "wait" (unbounded), "timeout" (lock_timeout below) or "nowait"; both fail fast with 409
+    bid_lock_policy: Literal["wait", "timeout", "nowait"] = "timeout"
+    bid_lock_timeout_ms: int = 2000
+    # Bid transactions in flight per item per worker before answering 503 (0 disables)
+    bid_max_inflight_per_item: int = 32
+    bid_retry_after_seconds: int = 1
+    # Idempotency-Key on bid/join: how long outcomes are replayable, and how long a duplicate
+    # waits for an attempt running on another worker before a retryable 409
+    idempotency_ttl_seconds: int = 86400
+    idempotency_wait_seconds: float = 2.0
+    # Bid ladder (Redis sorted set per item): largest GET /items/{id}/ladder page, and idle expiry
+    ladder_max_entries: int = 100
+    ladder_ttl_seconds: int = 7 * 86400
+    # Seconds between passes that close ended auctions nobody is polling, releasing their
+    # bidders' exposure and charging the winner (0 disables; items then close only when read)
+    settle_interval_seconds: float = 5.0
+    # Image rows kept in the per-worker LRU (rows are immutable, so this only bounds memory)
+    image_cache_size: int = 10000
+    # POST /items/bulk: items per request and concurrent Unsplash lookups
+    bulk_item_max: int = 500
+    bulk_image_concurrency: int = 8
+    # Admission control per worker: total concurrent requests, slots only bids/close/join/leave may use,
+    # caps for other requests and cheap polls, and how long each class may queue before a 503
+    admission_enabled: bool = True
+    admission_capacity: int = 64
+    admission_reserved: int = 16
+    admission_default_limit: int = 32
+    admission_poll_limit: int = 32
+    admission_critical_deadline_ms: int = 5000
+    admission_default_deadline_ms: int = 1000
+    admission_poll_deadline_ms: int = 100
+    admission_retry_after_seconds: int = 1
+    # Pooled DB connections opened during startup, before /ready reports ready
+    db_warm_connections: int = 5
+    # Request logging: successful GET/HEAD polls faster than log_slow_request_ms are logged at
+    # log_sample_rate; errors, writes (bids) and slow requests are always logged
+    log_sample_rate: float = 0.05
+    log_slow_request_ms: int = 500
+    # Rendered log lines buffered for the writer thread; sampled lines are dropped first when it fills
+    log_queue_size: int = 10000
+    # Per-request profiling: requests sending "X-Profile: <profile_token>" and a profile_sample_rate
+    # fraction of all requests are profiled; with neither set the profiler is not installed at all.
+    # The token is shared, not tied to an admin account: anyone holding it can profile a request
+    # (only admins can read profiles back), so keep it secret and rotate it like a credential
+    profile_token: str | None = None
+    profile_sample_rate: float = 0.0
+    profile_interval_ms: float = 1.0
+    profile_ttl_seconds: int = 3600
+
+    @model_validator(mode="after")
+    def check_batch_budget(self):
+        if self.batch_bid_max_items > self.batch_bid_limit:
+            raise ValueError("BATCH_BID_MAX_ITEMS must not exceed BATCH_BID_LIMIT")
+        return self
 
     class Config:
         env_file = ".env"
@@ -0,0 +1,11 @@
+from fastapi import APIRouter, Request
+from fastapi.responses import JSONResponse
+
+router = APIRouter(tags=['health'])
+
+@router.get('/ready')
+async def ready(request: Request):
+    """Readiness probe: 200 once the lifespan has warmed connections and caches, 503 before that and while draining."""
+    if getattr(request.app.state, "ready", False):
+        return {"status": "ready"}
+    return JSONResponse({"status": "starting"}, status_code=503)
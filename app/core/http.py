@@ -0,0 +1,16 @@
+"""Shared outbound HTTP client, so calls to third-party APIs reuse pooled connections."""
+_client = None
+
+
+def get_http_client():
+    global _client
+    if _client is None:
+        import httpx
+        _client = httpx.AsyncClient(timeout=10.0, limits=httpx.Limits(max_connections=20, max_keepalive_connections=10))
+    return _client
+
+async def close_http_client() -> None:
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
@@ -0,0 +1,165 @@
+"""Structured logging that never writes on the event loop.
+
+structlog renders each record to compact JSON (orjson) and hands the bytes to a
+bounded queue; a daemon thread drains it in batches to stdout. Records marked
+``droppable`` (sampled request lines, SQL echo) are refused once the queue is
+past its high-water mark, and nothing is ever put with a blocking call, so a
+slow stdout costs log lines rather than request latency. ``stats`` counts
+what was written and dropped.
+"""
+import logging
+import queue
+import sys
+import threading
+from collections import Counter
+from datetime import datetime, timezone
+import orjson
+import structlog
+
+# Fraction of the queue kept free for records that must not be dropped
+RESERVED_FRACTION = 0.2
+# Lines written per flush
+WRITE_BATCH = 512
+
+stats: Counter = Counter()
+
+
+class LogWriter:
+    """Bounded queue of rendered lines and the thread that writes them."""
+
+    def __init__(self, capacity: int = 10000, stream=None):
+        self.capacity = max(1, capacity)
+        self.high_water = int(self.capacity * (1 - RESERVED_FRACTION))
+        self.queue: queue.Queue = queue.Queue(self.capacity)
+        self.stream = stream
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+
+    def put(self, line: bytes, droppable: bool = False) -> bool:
+        """Enqueue one line without blocking. Returns False when it was dropped."""
+        if self._thread is None:
+            self.start()
+        if droppable and self.queue.qsize() >= self.high_water:
+            stats["dropped_sampled"] += 1
+            return False
+        try:
+            self.queue.put_nowait(line)
+        except queue.Full:
+            stats["dropped_sampled" if droppable else "dropped"] += 1
+            return False
+        return True
+
+    def start(self) -> None:
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+                self._thread.start()
+
+    def stop(self, timeout: float = 2.0) -> None:
+        """Flush what is queued and stop the thread."""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is None:
+            return
+        try:
+            self.queue.put(None, timeout=timeout)
+        except queue.Full:
+            pass
+        thread.join(timeout)
+
+    def _run(self) -> None:
+        stop = False
+        while not stop:
+            batch = [self.queue.get()]
+            while len(batch) < WRITE_BATCH:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            if None in batch:
+                stop = True
+                batch = [line for line in batch if line is not None]
+            if batch:
+                self._write(batch)
+
+    def _write(self, lines: list[bytes]) -> None:
+        stream = self.stream or sys.stdout.buffer
+        try:
+            stream.write(b"\n".join(lines) + b"\n")
+            stream.flush()
+            stats["written"] += len(lines)
+        except Exception:
+            stats["write_errors"] += 1
+
+
+writer = LogWriter()
+
+
+class QueueLogger:
+    """structlog logger whose every level method enqueues a rendered line."""
+
+    def msg(self, line: bytes, droppable: bool = False) -> None:
+        writer.put(line, droppable)
+
+    debug = info = warning = warn = error = critical = exception = fatal = log = msg
+
+
+class QueueLoggerFactory:
+    def __call__(self, *args) -> QueueLogger:
+        return QueueLogger()
+
+
+def render(logger, method_name: str, event_dict: dict) -> dict:
+    """Last processor: JSON bytes plus the drop flag, passed to ``QueueLogger.msg`` as kwargs."""
+    droppable = bool(event_dict.pop("droppable", False))
+    return {"line": orjson.dumps(event_dict, default=str), "droppable": droppable}
+
+
+class QueueHandler(logging.Handler):
+    """Routes stdlib records (SQLAlchemy echo, uvicorn) into the same queue."""
+
+    def __init__(self, level=logging.NOTSET, droppable: bool = False):
+        super().__init__(level)
+        self.droppable = droppable
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            event = {"event": record.getMessage(), "level": record.levelname.lower(), "logger": record.name,
+                     "timestamp": datetime.fromtimestamp(record.created, timezone.utc).isoformat()}
+            if record.exc_info:
+                event["exception"] = logging.Formatter().formatException(record.exc_info)
+            writer.put(orjson.dumps(event), self.droppable and record.levelno < logging.WARNING)
+        except Exception:
+            self.handleError(record)
+
+
+def configure_logging(queue_size: int = 10000, level: int = logging.INFO) -> None:
+    """Install the queue pipeline for structlog and the stdlib root and SQLAlchemy loggers."""
+    global writer
+    if writer.capacity != queue_size and writer._thread is None:
+        writer = LogWriter(queue_size)
+    structlog.configure(
+        processors=[
+            structlog.contextvars.merge_contextvars,
+            structlog.processors.add_log_level,
+            structlog.processors.TimeStamper(fmt="iso", utc=True),
+            structlog.processors.format_exc_info,
+            render,
+        ],
+        wrapper_class=structlog.make_filtering_bound_logger(level),
+        logger_factory=QueueLoggerFactory(),
+        cache_logger_on_first_use=True,
+    )
+    root = logging.getLogger()
+    root.handlers = [QueueHandler()]
+    root.setLevel(level)
+    # SQL lines only appear with the engine's echo flag (DB_ECHO), never by inheriting the root level.
+    # A handler on the engine logger also stops echo from installing its own synchronous stdout handler.
+    logging.getLogger("sqlalchemy").setLevel(logging.WARNING)
+    sql = logging.getLogger("sqlalchemy.engine.Engine")
+    sql.handlers = [QueueHandler(droppable=True)]
+    sql.propagate = False
+
+
+def shutdown_logging() -> None:
+    writer.stop()
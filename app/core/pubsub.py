@@ -0,0 +1,94 @@
+import asyncio
+from typing import Awaitable, Callable
+import structlog
+import app.core.redis as redis_module
+
+logger = structlog.get_logger()
+
+
+class PubSubListener:
+    """One Redis subscription per worker, fanning messages out to in-process handlers.
+
+    Handlers are plain callables taking the decoded message payload. Callbacks
+    registered with ``on_connect`` run after every (re)subscribe, which is where
+    local state that may have missed messages should be resynchronised.
+    """
+
+    def __init__(self, retry_seconds: float = 1.0):
+        self.retry_seconds = retry_seconds
+        self.connected = False
+        self._handlers: dict[str, Callable[[str], None]] = {}
+        self._on_connect: list[Callable[[], Awaitable[None]]] = []
+        self._on_disconnect: list[Callable[[], None]] = []
+        self._task: asyncio.Task | None = None
+
+    def subscribe(self, channel: str, handler: Callable[[str], None]) -> None:
+        self._handlers[channel] = handler
+
+    def on_connect(self, callback: Callable[[], Awaitable[None]]) -> None:
+        self._on_connect.append(callback)
+
+    def on_disconnect(self, callback: Callable[[], None]) -> None:
+        self._on_disconnect.append(callback)
+
+    def start(self) -> None:
+        if self._task is None and self._handlers:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            pubsub = None
+            try:
+                pubsub = redis_module.redis_client.pubsub()
+                await pubsub.subscribe(*self._handlers)
+                self.connected = True
+                for callback in self._on_connect:
+                    await callback()
+                async for message in pubsub.listen():
+                    if message.get("type") != "message":
+                        continue
+                    channel = _text(message["channel"])
+                    handler = self._handlers.get(channel)
+                    if handler:
+                        handler(_text(message["data"]))
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                logger.warning("Pub/sub listener disconnected", error=str(exc))
+            finally:
+                self._mark_disconnected()
+                if pubsub is not None:
+                    try:
+                        await pubsub.close()
+                    except Exception:
+                        pass
+            await asyncio.sleep(self.retry_seconds)
+
+    def _mark_disconnected(self) -> None:
+        if self.connected:
+            self.connected = False
+            for callback in self._on_disconnect:
+                callback()
+
+
+def _text(value) -> str:
+    return value.decode() if isinstance(value, (bytes, bytearray)) else str(value)
+
+
+async def publish(channel: str, data: str) -> None:
+    try:
+        await redis_module.redis_client.publish(channel, data)
+    except Exception:
+        return
+
+
+listener = PubSubListener()
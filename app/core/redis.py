@@ -1,4 +1,28 @@
-import redis.asyncio as redis
+"""Redis client, created on first use (normally by the app lifespan) rather than at import."""
 from app.core.config import settings
 
-redis_client = redis.from_url(settings.redis_url)
+
+def init_redis():
+    client = globals().get("redis_client")
+    if client is None:
+        import redis.asyncio as redis
+        client = globals()["redis_client"] = redis.from_url(settings.redis_url)
+    return client
+
+async def warm_up() -> bool:
+    """Open a pooled connection; False if Redis is unreachable (callers already degrade without it)."""
+    try:
+        await init_redis().ping()
+        return True
+    except Exception:
+        return False
+
+async def close_redis() -> None:
+    client = globals().pop("redis_client", None)
+    if client is not None and hasattr(client, "aclose"):
+        await client.aclose()
+
+def __getattr__(name: str):
+    if name == "redis_client":
+        return init_redis()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,11 @@
+from typing import Any
+from fastapi.responses import ORJSONResponse
+
+
+class FastJSONResponse(ORJSONResponse):
+    """orjson-backed response that also passes pre-serialized bytes through untouched."""
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, (bytes, bytearray)):
+            return bytes(content)
+        return super().render(content)
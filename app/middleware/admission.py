@@ -0,0 +1,160 @@
+"""Admission control: per-class concurrency limits with priority queues and deadlines.
+
+Every HTTP request is classified before any work is done:
+
+- ``critical``: bids, batch bids, settlement (close), join and leave
+- ``poll``: the cheap, frequently repeated GETs (lobby, item, bid ladder, lobby changes, active)
+- ``default``: everything else
+
+A worker admits at most ``admission_capacity`` requests at once, of which
+``admission_reserved`` slots only ``critical`` requests may take, so polls can
+never crowd out bids. Each class has its own cap as well. A request that cannot
+be admitted waits in its class's FIFO; freed slots go to ``critical`` first,
+then ``default``, then ``poll``. A request still queued after its class's
+deadline is answered 503 with ``Retry-After``. Polls have the shortest
+deadline, so they are shed first. Long-lived requests (websockets, long-polls,
+exports) and health and metrics checks bypass admission.
+"""
+import asyncio
+import re
+import time
+from collections import Counter, deque
+import orjson
+from app.core.config import settings
+
+PRIORITY = ("critical", "default", "poll")
+
+_CRITICAL = re.compile(r"^/items/(\d+/(bid|close|join|leave)|bids)$")
+_POLL = re.compile(r"^/items(/\d+|/\d+/ladder|/changes|/active)?$")
+_EXEMPT = re.compile(r"^(/health|/ready|/admin/metrics$|/items/\d+/wait$|/admin/export/)")
+
+
+def classify(method: str, path: str) -> str | None:
+    """Request class, or None for requests that bypass admission."""
+    if _EXEMPT.match(path):
+        return None
+    if method == "POST" and _CRITICAL.match(path):
+        return "critical"
+    if method in ("GET", "HEAD") and _POLL.match(path):
+        return "poll"
+    return "default"
+
+
+class AdmissionController:
+    def __init__(self, capacity: int, reserved: int, limits: dict[str, int], deadlines: dict[str, float]):
+        self.capacity = capacity
+        self.reserved = reserved
+        self.limits = limits
+        self.deadlines = deadlines
+        self.in_flight: Counter = Counter()
+        self.total = 0
+        self.queues: dict[str, deque[asyncio.Future]] = {cls: deque() for cls in PRIORITY}
+        self.stats: Counter = Counter()
+        self.max_wait: dict[str, float] = {cls: 0.0 for cls in PRIORITY}
+
+    def _has_room(self, cls: str) -> bool:
+        ceiling = self.capacity if cls == "critical" else self.capacity - self.reserved
+        return self.total < ceiling and self.in_flight[cls] < self.limits.get(cls, self.capacity)
+
+    def _take(self, cls: str) -> None:
+        self.in_flight[cls] += 1
+        self.total += 1
+        self.stats[f"admitted.{cls}"] += 1
+
+    async def acquire(self, cls: str) -> bool:
+        """Wait for a slot; False when the class's queue deadline passed first (the request is shed)."""
+        if not self.queues[cls] and self._has_room(cls):
+            self._take(cls)
+            return True
+        loop = asyncio.get_running_loop()
+        fut = loop.create_future()
+        queue = self.queues[cls]
+        queue.append(fut)
+        self.stats[f"queued.{cls}"] += 1
+        started = time.monotonic()
+        timer = loop.call_later(self.deadlines[cls], lambda: fut.done() or fut.set_result(False))
+        try:
+            granted = await fut
+        except asyncio.CancelledError:
+            # Client went away; hand back a slot granted in the meantime
+            if fut.done() and not fut.cancelled() and fut.result():
+                self.release(cls)
+            raise
+        finally:
+            timer.cancel()
+            if fut in queue:
+                queue.remove(fut)
+            self.max_wait[cls] = max(self.max_wait[cls], time.monotonic() - started)
+        if not granted:
+            self.stats[f"shed.{cls}"] += 1
+        return granted
+
+    def release(self, cls: str) -> None:
+        self.in_flight[cls] -= 1
+        self.total -= 1
+        for waiting in PRIORITY:
+            queue = self.queues[waiting]
+            while queue and self._has_room(waiting):
+                fut = queue.popleft()
+                if not fut.done():
+                    self._take(waiting)
+                    fut.set_result(True)
+
+    def snapshot(self) -> dict:
+        return {
+            "capacity": self.capacity,
+            "reserved": self.reserved,
+            "in_flight": {cls: self.in_flight[cls] for cls in PRIORITY},
+            "queue_depth": {cls: len(self.queues[cls]) for cls in PRIORITY},
+            "max_queue_wait_seconds": {cls: round(self.max_wait[cls], 4) for cls in PRIORITY},
+            "admitted": {cls: self.stats[f"admitted.{cls}"] for cls in PRIORITY},
+            "queued": {cls: self.stats[f"queued.{cls}"] for cls in PRIORITY},
+            "shed": {cls: self.stats[f"shed.{cls}"] for cls in PRIORITY},
+        }
+
+
+def controller_from_settings() -> AdmissionController:
+    return AdmissionController(
+        capacity=settings.admission_capacity,
+        reserved=settings.admission_reserved,
+        limits={"critical": settings.admission_capacity, "default": settings.admission_default_limit, "poll": settings.admission_poll_limit},
+        deadlines={"critical": settings.admission_critical_deadline_ms / 1000,
+                   "default": settings.admission_default_deadline_ms / 1000,
+                   "poll": settings.admission_poll_deadline_ms / 1000},
+    )
+
+
+admission = controller_from_settings()
+
+
+class AdmissionMiddleware:
+    """Pure ASGI so a shed request costs no request object, body read or task switch."""
+
+    def __init__(self, app, controller: AdmissionController | None = None):
+        self.app = app
+        self.controller = controller
+
+    async def __call__(self, scope, receive, send):
+        cls = classify(scope["method"], scope["path"]) if scope["type"] == "http" else None
+        controller = self.controller or admission
+        if cls is None or not settings.admission_enabled:
+            await self.app(scope, receive, send)
+            return
+        if not await controller.acquire(cls):
+            await self._shed(send)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            controller.release(cls)
+
+    async def _shed(self, send) -> None:
+        retry_after = settings.admission_retry_after_seconds
+        body = orjson.dumps({"detail": {"code": "overloaded", "message": "Server busy, retry shortly", "retry_after": retry_after}})
+        await send({
+            "type": "http.response.start",
+            "status": 503,
+            "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode()),
+                        (b"retry-after", str(retry_after).encode())],
+        })
+        await send({"type": "http.response.body", "body": body})
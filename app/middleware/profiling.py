@@ -0,0 +1,253 @@
+"""Opt-in profiling of single requests, stored under their ``X-Request-ID``.
+
+A request is profiled when it carries ``X-Profile: <PROFILE_TOKEN>`` or is
+picked at ``PROFILE_SAMPLE_RATE``. While it runs, a sampler thread looks at the
+event-loop thread's stack every ``PROFILE_INTERVAL_MS``. The time since the
+previous sample counts as on-CPU time when that stack runs through the
+middleware's own frame, i.e. the loop is executing this request's code, and
+that time is also charged to its app-code stack. Otherwise the request is
+awaiting (I/O, locks, the thread pool or other requests), and the time counts
+as await time. Only frames are read from the sampler thread; the event loop's
+task bookkeeping is not thread-safe and is never touched. CPU-bound code holds the GIL, so samples may be further apart
+than the interval. Weighting each sample by its elapsed time keeps the totals
+accurate. SQL statements executed in the request's context are timed
+through engine events. The result is kept in Redis (or, without Redis, in a
+small per-worker buffer) for ``PROFILE_TTL_SECONDS`` and served by
+``GET /admin/profiles/{request_id}``.
+
+With neither a token nor a sample rate configured, the middleware is not
+installed and no engine listener is registered, so disabled profiling costs
+nothing.
+"""
+import hmac
+import random
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, OrderedDict
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from pathlib import Path
+import orjson
+import structlog
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from app.core.config import settings
+import app.core.redis as redis_module
+
+logger = structlog.get_logger()
+
+APP_ROOT = str(Path(__file__).resolve().parents[1])
+# Profiles kept per worker when Redis is unavailable
+LOCAL_PROFILES = 100
+TOP_STACKS = 50
+TOP_STATEMENTS = 20
+MAX_STATEMENT_CHARS = 500
+
+_current: ContextVar["Profile | None"] = ContextVar("profile", default=None)
+_local: OrderedDict[str, bytes] = OrderedDict()
+
+
+def profiling_enabled() -> bool:
+    return bool(settings.profile_token) or settings.profile_sample_rate > 0
+
+def wants_profile(headers: list[tuple[bytes, bytes]]) -> bool:
+    token = settings.profile_token
+    if token:
+        for name, value in headers:
+            if name == b"x-profile":
+                return hmac.compare_digest(value, token.encode())
+    return settings.profile_sample_rate > 0 and random.random() < settings.profile_sample_rate
+
+
+class Profile:
+    def __init__(self, request_id: str, method: str, path: str):
+        self.request_id = request_id
+        self.method = method
+        self.path = path
+        self.started_at = datetime.now(timezone.utc)
+        self.sql: dict[str, list] = {}
+        self.samples = 0
+        self.running = 0.0
+        self.waiting = 0.0
+        self.stacks: Counter = Counter()
+
+    def record_sql(self, statement: str, seconds: float) -> None:
+        entry = self.sql.setdefault(statement, [0, 0.0])
+        entry[0] += 1
+        entry[1] += seconds
+
+    def to_dict(self, status_code: int | None, wall: float, interval: float) -> dict:
+        """The stored profile; times in milliseconds, stacks root-first and hottest first."""
+        statements = sorted(self.sql.items(), key=lambda kv: kv[1][1], reverse=True)
+        return {
+            "request_id": self.request_id,
+            "method": self.method,
+            "path": self.path,
+            "status_code": status_code,
+            "started_at": self.started_at.isoformat(),
+            "wall_ms": round(wall * 1000, 2),
+            "sampling": {
+                "interval_ms": interval * 1000,
+                "samples": self.samples,
+                "on_cpu_ms": round(self.running * 1000, 2),
+                "await_ms": round(self.waiting * 1000, 2),
+            },
+            "sql": {
+                "queries": sum(calls for calls, _ in self.sql.values()),
+                "total_ms": round(sum(seconds for _, seconds in self.sql.values()) * 1000, 2),
+                "statements": [
+                    {"statement": stmt[:MAX_STATEMENT_CHARS], "calls": calls, "total_ms": round(seconds * 1000, 2)}
+                    for stmt, (calls, seconds) in statements[:TOP_STATEMENTS]
+                ],
+            },
+            "stacks": [{"stack": stack, "on_cpu_ms": round(seconds * 1000, 2)} for stack, seconds in self.stacks.most_common(TOP_STACKS)],
+        }
+
+
+def _frame_name(frame) -> str:
+    filename = frame.f_code.co_filename
+    if filename.startswith(APP_ROOT):
+        filename = "app" + filename[len(APP_ROOT):]
+    return f"{filename}:{frame.f_code.co_name}"
+
+def collapse_stack(frame) -> str:
+    """Root-first ``file:function`` chain of the app frames under ``frame``, plus the leaf frame."""
+    names = []
+    leaf = frame
+    while frame is not None:
+        if frame.f_code.co_filename.startswith(APP_ROOT) and frame.f_code.co_filename != __file__:
+            names.append(_frame_name(frame))
+        frame = frame.f_back
+    if not leaf.f_code.co_filename.startswith(APP_ROOT):
+        # Where app code was when sampled: a library call, the driver, the serializer...
+        names.insert(0, _frame_name(leaf))
+    return ";".join(reversed(names))
+
+
+def runs_under(frame, root) -> bool:
+    """Whether ``root`` is ``frame`` or one of its callers."""
+    while frame is not None:
+        if frame is root:
+            return True
+        frame = frame.f_back
+    return False
+
+
+class Sampler(threading.Thread):
+    """Samples the calling (loop) thread while ``root`` is on its stack; see the module docstring."""
+
+    def __init__(self, profile: Profile, root, interval: float):
+        super().__init__(name="request-profiler", daemon=True)
+        self.profile = profile
+        self.root = root
+        self.interval = interval
+        self.loop_thread = threading.get_ident()
+        self._stop_event = threading.Event()
+
+    def run(self) -> None:
+        profile = self.profile
+        last = time.perf_counter()
+        while not self._stop_event.wait(self.interval):
+            frame = sys._current_frames().get(self.loop_thread)
+            now = time.perf_counter()
+            elapsed, last = now - last, now
+            profile.samples += 1
+            if runs_under(frame, self.root):
+                profile.running += elapsed
+                profile.stacks[collapse_stack(frame)] += elapsed
+            else:
+                profile.waiting += elapsed
+            # Do not keep the loop thread's frames alive until the next sample
+            frame = None
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        self.join()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current.get() is not None:
+        conn.info.setdefault("profile_started", []).append(time.perf_counter())
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    profile = _current.get()
+    started = conn.info.get("profile_started")
+    if profile is not None and started:
+        profile.record_sql(statement, time.perf_counter() - started.pop())
+
+def install_sql_hooks() -> None:
+    """Time SQL for profiled requests on every engine; only called when profiling is enabled."""
+    if not event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+
+def remove_sql_hooks() -> None:
+    if event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        event.remove(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.remove(Engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def profile_key(request_id: str) -> str:
+    return f"profile:{request_id}"
+
+async def store(request_id: str, document: dict) -> None:
+    data = orjson.dumps(document)
+    try:
+        await redis_module.redis_client.setex(profile_key(request_id), settings.profile_ttl_seconds, data)
+        return
+    except Exception:
+        pass
+    _local[request_id] = data
+    while len(_local) > LOCAL_PROFILES:
+        _local.popitem(last=False)
+
+async def load(request_id: str) -> dict | None:
+    data = _local.get(request_id)
+    if data is None:
+        try:
+            data = await redis_module.redis_client.get(profile_key(request_id))
+        except Exception:
+            return None
+    return orjson.loads(data) if data is not None else None
+
+
+class ProfilingMiddleware:
+    """Innermost middleware, so the route and its dependencies run in the task being sampled.
+
+    Work the handler hands to other tasks or threads is reported as await time.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not wants_profile(scope["headers"]):
+            await self.app(scope, receive, send)
+            return
+        request_id = scope.setdefault("state", {}).get("request_id") or str(uuid.uuid4())
+        profile = Profile(request_id, scope["method"], scope["path"])
+        status_code = None
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        interval = settings.profile_interval_ms / 1000
+        # Everything this request runs on the loop thread is called, directly or through awaits, from this frame
+        sampler = Sampler(profile, sys._getframe(), interval)
+        token = _current.set(profile)
+        started = time.perf_counter()
+        sampler.start()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            wall = time.perf_counter() - started
+            sampler.stop()
+            _current.reset(token)
+            await store(request_id, profile.to_dict(status_code, wall, interval))
+            logger.info("Profile stored", request_id=request_id, method=profile.method, path=profile.path,
+                        duration_ms=round(wall * 1000, 1))
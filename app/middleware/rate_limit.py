@@ -1,7 +1,15 @@
+from collections import deque
+import time
+import uuid
 from fastapi import Request
+from fastapi.responses import JSONResponse
 from starlette.middleware.base import BaseHTTPMiddleware
 import app.core.redis as redis_module
 
+# Requests per client address per window, across all endpoints
+IP_LIMIT = 10
+IP_WINDOW_SECONDS = 10
+
 async def sliding_window_allow(key: str, limit: int, window_seconds: int) -> bool:
     now = int(__import__('time').time())
     window_start = now - window_seconds
@@ -17,13 +25,52 @@ async def sliding_window_allow(key: str, limit: int, window_seconds: int) -> boo
     except Exception:
         return True
 
+async def weighted_window_allow(key: str, limit: int, window_seconds: int, weight: int) -> bool:
+    """Charge ``weight`` hits (counted individually, even within one second) if they fit in ``limit``.
+
+    A refused charge is taken back, so an oversized request does not use up the window.
+    """
+    now = int(time.time())
+    try:
+        client = redis_module.redis_client
+        pipe = client.pipeline()
+        pipe.zremrangebyscore(key, 0, now - window_seconds)
+        token = uuid.uuid4().hex
+        pipe.zadd(key, {f"{now}:{token}:{i}": now for i in range(weight)})
+        pipe.zcard(key)
+        pipe.expire(key, window_seconds)
+        _, _, count, _ = await pipe.execute()
+        if count <= limit:
+            return True
+        await client.zrem(key, *(f"{now}:{token}:{i}" for i in range(weight)))
+        return False
+    except Exception:
+        return True
+
+class SlidingWindow:
+    """In-memory sliding window for limits scoped to one connection (no Redis round trip)."""
+
+    def __init__(self, limit: int, window_seconds: float):
+        self.limit = limit
+        self.window_seconds = window_seconds
+        self.hits: deque[float] = deque()
+
+    def allow(self, now: float | None = None) -> bool:
+        now = time.monotonic() if now is None else now
+        while self.hits and self.hits[0] <= now - self.window_seconds:
+            self.hits.popleft()
+        if len(self.hits) >= self.limit:
+            return False
+        self.hits.append(now)
+        return True
+
 class RateLimitMiddleware(BaseHTTPMiddleware):
     async def dispatch(self, request: Request, call_next):
         ip = request.client.host if request.client else 'unknown'
-        global_key = f"rl:ip:{ip}:10in10"
-        if not await sliding_window_allow(global_key, 10, 10):
-            from fastapi import HTTPException
-            raise HTTPException(status_code=429, detail="Too many requests")
+        global_key = f"rl:ip:{ip}:{IP_LIMIT}in{IP_WINDOW_SECONDS}"
+        if not await sliding_window_allow(global_key, IP_LIMIT, IP_WINDOW_SECONDS):
+            # An HTTPException raised here would bypass the exception handlers and surface as a 500
+            return JSONResponse({"detail": "Too many requests"}, status_code=429)
 
         is_write = request.method in {"POST", "PUT", "PATCH", "DELETE"}
         if is_write and request.url.path.startswith('/items'):
@@ -31,7 +78,6 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
             if user_id is not None:
                 user_key = f"rl:user:{user_id}:3in60"
                 if not await sliding_window_allow(user_key, 3, 60):
-                    from fastapi import HTTPException
-                    raise HTTPException(status_code=429, detail="Write rate limit exceeded")
+                    return JSONResponse({"detail": "Write rate limit exceeded"}, status_code=429)
 
         return await call_next(request)
\ No newline at end of file
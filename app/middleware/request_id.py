@@ -1,16 +1,35 @@
 from fastapi import Request
 from starlette.middleware.base import BaseHTTPMiddleware
+import random
 import structlog
+import time
 import uuid
+from app.core.config import settings
 
 logger = structlog.get_logger()
 
+SAMPLED_METHODS = {"GET", "HEAD"}
+
+def should_sample(method: str, status_code: int, duration_ms: float) -> bool:
+    """Only fast successful polls are sampled; errors, writes (bids) and slow requests are always logged."""
+    return method in SAMPLED_METHODS and status_code < 400 and duration_ms < settings.log_slow_request_ms
+
 class RequestIDMiddleware(BaseHTTPMiddleware):
     async def dispatch(self, request: Request, call_next):
         request_id = str(uuid.uuid4())
         request.state.request_id = request_id
-        logger.info("Request started", method=request.method, url=str(request.url), request_id=request_id)
-        response = await call_next(request)
+        started = time.perf_counter()
+        try:
+            response = await call_next(request)
+        except Exception:
+            logger.exception("Request failed", method=request.method, path=request.url.path, request_id=request_id,
+                             duration_ms=round((time.perf_counter() - started) * 1000, 1))
+            raise
         response.headers["X-Request-ID"] = request_id
-        logger.info("Request completed", status_code=response.status_code, request_id=request_id)
-        return response
\ No newline at end of file
+        duration_ms = (time.perf_counter() - started) * 1000
+        sampled = should_sample(request.method, response.status_code, duration_ms)
+        if sampled and random.random() >= settings.log_sample_rate:
+            return response
+        logger.info("Request", method=request.method, path=request.url.path, status_code=response.status_code,
+                    duration_ms=round(duration_ms, 1), request_id=request_id, droppable=sampled)
+        return response
@@ -34,6 +34,8 @@ class Item(Base):
     status = Column(String, default="open")
     created_at = Column(DateTime, default=func.now())
     image_id = Column(Integer, ForeignKey("images.id"), nullable=True)
+    # Bumped on every bid, join, leave and status transition; exposed as the ETag
+    version = Column(Integer, nullable=False, default=0, server_default="0")
 
 
 class Image(Base):
@@ -78,4 +80,28 @@ class AuctionParticipant(Base):
     item_id = Column(Integer, ForeignKey("items.id"), index=True)
     user_id = Column(Integer, ForeignKey("users.id"), index=True)
     joined_at = Column(DateTime, default=func.now())
-    __table_args__ = (UniqueConstraint("item_id", "user_id", name="unique_participant"),)
\ No newline at end of file
+    __table_args__ = (UniqueConstraint("item_id", "user_id", name="unique_participant"),)
+
+class ItemSummary(Base):
+    """Read model for the lobby and room: one row per item, maintained in the writing transactions."""
+    __tablename__ = "item_summaries"
+    item_id = Column(Integer, ForeignKey("items.id"), primary_key=True)
+    status = Column(String, nullable=False, default="scheduled")
+    high_bid = Column(Float, nullable=True)
+    leader_user_id = Column(Integer, ForeignKey("users.id"), nullable=True)
+    bid_count = Column(Integer, nullable=False, default=0, server_default="0")
+    player_count = Column(Integer, nullable=False, default=0, server_default="0")
+    image_url = Column(String, nullable=True)
+    image_thumb_url = Column(String, nullable=True)
+    updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
+
+
+class UserExposure(Base):
+    """Per-user ledger over live auctions: what the user is committed to pay if every
+    leading bid wins (``committed``) and how much further auto-raises could take them
+    (``headroom``). Maintained by ``place_bid`` and settlement."""
+    __tablename__ = "user_exposures"
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    committed = Column(Float, nullable=False, default=0.0, server_default="0")
+    headroom = Column(Float, nullable=False, default=0.0, server_default="0")
+    updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
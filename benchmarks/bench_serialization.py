@@ -0,0 +1,134 @@
+"""Serialization cost per response for the lobby and item payloads.
+
+Compares FastAPI's default path (``jsonable_encoder`` + ``JSONResponse``) with
+the orjson response class and with cached, pre-serialized row fragments.
+
+    python -m benchmarks.bench_serialization [--rounds 200]
+"""
+import argparse
+import os
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+os.environ.setdefault("SECRET_KEY", "bench")
+os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite:///:memory:")
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from app.auctions.endpoints import lobby_row, render_lobby_row, item_payload
+from app.auctions.payloads import lobby_payloads, item_payloads, extend_object, join_array
+from app.core.responses import FastJSONResponse
+from app.models import Item, Image
+
+
+def make_items(n: int) -> list[Item]:
+    now = datetime.utcnow()
+    items = []
+    for i in range(1, n + 1):
+        start_at = now + timedelta(seconds=i)
+        items.append(Item(
+            id=i,
+            title=f"Item {i}",
+            description="Lorem ipsum dolor sit amet " * 4,
+            base_price=10.0 + i,
+            start_at=start_at,
+            end_at=start_at + timedelta(seconds=30),
+            min_start_price=100.0 + i % 150,
+            status="scheduled",
+            image_id=i,
+        ))
+    return items
+
+
+def row_args(it: Item) -> tuple:
+    current = {"amount": 150.0 + it.id, "user_id": it.id % 97}
+    return (it, "scheduled", current, it.id % 13,
+            f"https://images.unsplash.com/photo-{it.id}?w=1080",
+            f"https://images.unsplash.com/photo-{it.id}?w=200")
+
+
+def lobby_default(items: list[Item]) -> bytes:
+    rows = []
+    for it in items:
+        row = lobby_row(*row_args(it))
+        row["seconds_to_start"] = it.id
+        row["seconds_to_end"] = None
+        rows.append(row)
+    return JSONResponse(jsonable_encoder(rows)).body
+
+
+def lobby_orjson(items: list[Item]) -> bytes:
+    rows = []
+    for it in items:
+        row = lobby_row(*row_args(it))
+        row["seconds_to_start"] = it.id
+        row["seconds_to_end"] = None
+        rows.append(row)
+    return FastJSONResponse(rows).body
+
+
+def lobby_cached(items: list[Item]) -> bytes:
+    return FastJSONResponse(join_array([render_lobby_row(*row_args(it), it.id, None) for it in items])).body
+
+
+def item_default(items: list[Item]) -> bytes:
+    it = items[0]
+    image = Image(id=1, unsplash_id="abc", image_url="u", image_thumb_url="t", image_attribution="a", image_attribution_link="l")
+    payload = item_payload(it, image, "scheduled", {"amount": 120.0, "user_id": 3}, 5)
+    payload.update({"seconds_to_start": 4, "seconds_to_end": None, "joined": True})
+    return JSONResponse(jsonable_encoder(payload)).body
+
+
+def item_cached(items: list[Item]) -> bytes:
+    it = items[0]
+    image = Image(id=1, unsplash_id="abc", image_url="u", image_thumb_url="t", image_attribution="a", image_attribution_link="l")
+    current = {"amount": 120.0, "user_id": 3}
+    body = item_payloads.get_or_render(it.id, ("scheduled", (120.0, 3), 5, 1), lambda: item_payload(it, image, "scheduled", current, 5))
+    return FastJSONResponse(extend_object(body, {"seconds_to_start": 4, "seconds_to_end": None, "joined": True})).body
+
+
+def measure(fn, items: list[Item], rounds: int) -> tuple[float, int, int]:
+    fn(items)  # warm caches
+    start = time.perf_counter()
+    for _ in range(rounds):
+        fn(items)
+    per_call_us = (time.perf_counter() - start) / rounds * 1e6
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    fn(items)
+    after = tracemalloc.take_snapshot()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    stats = after.compare_to(before, "filename")
+    blocks = sum(max(0, s.count_diff) for s in stats)
+    return per_call_us, peak, blocks
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=200)
+    args = parser.parse_args()
+    cases = [
+        ("lobby", "jsonable_encoder", lobby_default),
+        ("lobby", "orjson", lobby_orjson),
+        ("lobby", "orjson+cache", lobby_cached),
+        ("item", "jsonable_encoder", item_default),
+        ("item", "orjson+cache", item_cached),
+    ]
+    print(f"{'payload':<8}{'size':>6}  {'path':<18}{'us/resp':>12}{'peak KiB':>12}{'blocks':>10}")
+    for size in (10, 1000):
+        items = make_items(size)
+        lobby_payloads.clear()
+        item_payloads.clear()
+        for payload, path, fn in cases:
+            if payload == "item" and size != 10:
+                continue
+            rounds = args.rounds if size == 10 else max(1, args.rounds // 20)
+            us, peak, blocks = measure(fn, items, rounds)
+            print(f"{payload:<8}{size:>6}  {path:<18}{us:>12.1f}{peak / 1024:>12.1f}{blocks:>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""pytest-benchmark suite for the pure functions on the request and bid paths.
+
+Synthetic ``Bid``/``Item`` populations (1 to 100k bids), no DB or Redis. Each
+case also records the peak bytes allocated by one call in ``extra_info``, so
+saved runs carry memory as well as time. Not collected by the default test run
+(``testpaths = tests``). Timings are machine-specific, so compare against a run
+saved on the same machine:
+
+    pytest benchmarks --benchmark-autosave   # on the unchanged tree
+    pytest benchmarks --benchmark-compare --benchmark-compare-fail=median:15%
+"""
+import os
+import random
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+os.environ.setdefault("SECRET_KEY", "bench")
+os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite:///:memory:")
+
+from app.auctions import summaries
+from app.auctions.endpoints import (
+    _aware, to_naive_utc, compute_status_and_timers, lobby_hidden, next_time_change, lobby_sort_row,
+)
+from app.auctions.payloads import join_array, lobby_payloads
+from app.auctions.tx_bid import compute_winner, check_bid_placed
+from app.models import Bid, Item, ItemSummary
+
+BID_COUNTS = (1, 100, 10_000, 100_000)
+LOBBY_SIZES = (10, 1000)
+NOW = datetime(2025, 1, 1, 12, 0, tzinfo=timezone.utc)
+
+
+@lru_cache(maxsize=None)
+def make_bids(n: int) -> tuple[Bid, ...]:
+    """``n`` bids on one item with rising amounts; every fourth bidder is an auto-raiser.
+
+    The leader always auto-raises with headroom, so a bid equal to the high bid is defended.
+    """
+    rng = random.Random(n)
+    bids = []
+    for i in range(n):
+        amount = 10.0 + i
+        auto = i % 4 == 0 or i == n - 1
+        bids.append(Bid(
+            id=i + 1, item_id=1, user_id=i + 1, amount=amount,
+            max_budget=amount + (1000 if i == n - 1 else rng.randint(1, 50)) if auto else None,
+            bid_increment=float(rng.randint(1, 5)) if auto else None,
+        ))
+    return tuple(bids)
+
+
+@lru_cache(maxsize=None)
+def make_lobby(n: int) -> tuple[tuple[Item, ItemSummary], ...]:
+    """``n`` items spread over scheduled, in-progress and recently/long closed, with summaries."""
+    naive = to_naive_utc(NOW)
+    rows = []
+    for i in range(1, n + 1):
+        start_at = naive + timedelta(seconds=(i % 3 - 1) * 60 - (i % 5) * 60)
+        item = Item(id=i, title=f"Item {i}", description="", base_price=10.0, min_start_price=100.0 + i % 150,
+                    start_at=start_at, end_at=start_at + timedelta(seconds=90), status="scheduled", version=i % 7)
+        summary = ItemSummary(item_id=i, status="scheduled", high_bid=150.0 + i, leader_user_id=i % 97,
+                              bid_count=i % 40, player_count=i % 13,
+                              image_url=f"https://images.unsplash.com/photo-{i}?w=1080",
+                              image_thumb_url=f"https://images.unsplash.com/photo-{i}?w=200")
+        rows.append((item, summary))
+    return tuple(rows)
+
+
+def peak_allocation(fn, *args) -> int:
+    """Peak bytes allocated while ``fn(*args)`` runs once."""
+    fn(*args)  # warm caches first, like the timed rounds
+    tracemalloc.start()
+    try:
+        fn(*args)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def run(benchmark, fn, *args):
+    benchmark.extra_info["peak_alloc_bytes"] = peak_allocation(fn, *args)
+    return benchmark(fn, *args)
+
+
+@pytest.mark.parametrize("n", BID_COUNTS)
+def test_compute_winner_new_high(benchmark, n):
+    bids = list(make_bids(n))
+    amount = bids[-1].max_budget + 1
+    winner, *_ = run(benchmark, compute_winner, bids, n + 1, amount, None, None)
+    assert winner == n + 1
+
+
+@pytest.mark.parametrize("n", BID_COUNTS)
+def test_compute_winner_defended(benchmark, n):
+    bids = list(make_bids(n))
+    winner, *_ = run(benchmark, compute_winner, bids, n + 1, bids[-1].amount, None, None)
+    assert winner == bids[-1].user_id
+
+
+@pytest.mark.parametrize("n", BID_COUNTS)
+def test_check_bid_placed(benchmark, n):
+    bids = list(make_bids(n))
+    run(benchmark, check_bid_placed, bids, n + 1)
+
+
+def test_current_bid(benchmark):
+    summary = ItemSummary(item_id=1, high_bid=120.0, leader_user_id=3)
+    assert run(benchmark, summaries.current_bid, summary) == {"amount": 120.0, "user_id": 3}
+
+
+@pytest.mark.parametrize("offset", (-60, 30, 600), ids=("scheduled", "in_progress", "closed"))
+def test_compute_status_and_timers(benchmark, offset):
+    start_at = to_naive_utc(NOW) - timedelta(seconds=offset) + timedelta(seconds=60)
+    item = Item(id=1, start_at=start_at, end_at=start_at + timedelta(seconds=90), status="scheduled")
+    run(benchmark, compute_status_and_timers, item, NOW)
+
+
+def test_aware(benchmark):
+    assert run(benchmark, _aware, datetime(2025, 1, 1)).tzinfo is timezone.utc
+
+
+def test_to_naive_utc(benchmark):
+    assert run(benchmark, to_naive_utc, NOW).tzinfo is None
+
+
+def build_lobby(loaded, now: datetime) -> bytes:
+    """The per-row part of ``list_items`` after transitions: status, visibility, freshness, rows, sort, top 10."""
+    rows = []
+    valid_until = None
+    for it, summary in loaded:
+        st, secs_s, secs_e = compute_status_and_timers(it, now)
+        if lobby_hidden(it, st, now):
+            continue
+        change_at = next_time_change(it, st, now)
+        if change_at and (valid_until is None or change_at < valid_until):
+            valid_until = change_at
+        rows.append(lobby_sort_row(it, summary, st, secs_s, secs_e))
+    rows.sort(key=lambda r: (r[0], r[1]))
+    return join_array([r[3] for r in rows[:10]])
+
+
+@pytest.mark.parametrize("n", LOBBY_SIZES)
+def test_lobby_rows_cached(benchmark, n):
+    lobby_payloads.clear()
+    body = run(benchmark, build_lobby, make_lobby(n), NOW)
+    assert body.startswith(b"[{")
+
+
+@pytest.mark.parametrize("n", LOBBY_SIZES)
+def test_lobby_rows_cold(benchmark, n):
+    def cold(loaded, now):
+        lobby_payloads.clear()
+        return build_lobby(loaded, now)
+    run(benchmark, cold, make_lobby(n), NOW)
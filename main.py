@@ -3,17 +3,51 @@ from contextlib import asynccontextmanager
 from fastapi.middleware.cors import CORSMiddleware
 from app.middleware.request_id import RequestIDMiddleware
 from app.middleware.rate_limit import RateLimitMiddleware
-from app.core.db import get_db
+from app.middleware.admission import AdmissionMiddleware
+from app.middleware.profiling import ProfilingMiddleware, install_sql_hooks, profiling_enabled
+from app.core import db as app_db
+from app.core import redis as app_redis
+from app.core.config import settings
+from app.core.http import get_http_client, close_http_client
+from app.core.health import router as health_router
+from app.core.pubsub import listener
+from app.core.log import configure_logging, shutdown_logging
 from app.auth.endpoints import router as auth_router
-from app.auctions.endpoints import router as auctions_router
+from app.admin.endpoints import router as admin_router
+from app.auctions.endpoints import router as auctions_router, prime_lobby_cache
+from app.auctions.ws import router as auctions_ws_router
+from app.auctions import presence
+from app.auctions.settlement import Settler
+import structlog
 
-# async def init_db():
-#     return
+configure_logging(settings.log_queue_size)
+logger = structlog.get_logger()
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    app.state.db = get_db()
+    # Everything that connects is built here, not at import, and warmed before /ready turns green
+    app.state.ready = False
+    app_db.init_engine()
+    app_redis.init_redis()
+    get_http_client()
+    await app_db.warm_up(settings.db_warm_connections)
+    if not await app_redis.warm_up():
+        logger.warning("Redis unavailable at startup")
+    async with app_db.AsyncSessionLocal() as db:
+        await presence.rebuild(db)
+        await prime_lobby_cache(db)
+    listener.start()
+    settler = Settler(app_db.AsyncSessionLocal, settings.settle_interval_seconds)
+    settler.start()
+    app.state.ready = True
     yield
+    app.state.ready = False
+    await settler.stop()
+    await listener.stop()
+    await close_http_client()
+    await app_redis.close_redis()
+    await app_db.dispose_engine()
+    shutdown_logging()
 
 app = FastAPI(lifespan=lifespan)
 
@@ -24,8 +58,17 @@ app.add_middleware(
     allow_methods=['*'],
     allow_headers=['*']
 )
+if profiling_enabled():
+    # Innermost, so the handler runs in the sampled task
+    install_sql_hooks()
+    app.add_middleware(ProfilingMiddleware)
 app.add_middleware(RateLimitMiddleware)
+# Outside the rate limiter so shed requests never reach Redis; inside request IDs so they are still logged
+app.add_middleware(AdmissionMiddleware)
 app.add_middleware(RequestIDMiddleware)
 
+app.include_router(health_router)
 app.include_router(auth_router)
-app.include_router(auctions_router)
\ No newline at end of file
+app.include_router(admin_router)
+app.include_router(auctions_router)
+app.include_router(auctions_ws_router)
\ No newline at end of file
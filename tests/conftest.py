@@ -1,9 +1,12 @@
 import asyncio
+from datetime import datetime, timedelta, timezone
 import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from sqlalchemy import update
 from sqlalchemy.orm import sessionmaker
 from app.core.db import Base
+from app.models import Item, Role, User
 from app.core import db as app_db
 from app.core import redis as app_redis
 from main import app
@@ -20,6 +23,81 @@ class FakeRedis:
         self.store[key] = value
     async def exists(self, key):
         return 1 if key in self.store else 0
+    async def get(self, key):
+        return self.store.get(key)
+    async def mget(self, *keys):
+        return [self.store.get(k) for k in keys]
+    async def set(self, key, value, ex=None, px=None, nx=False):
+        if nx and key in self.store:
+            return None
+        self.store[key] = value
+        return True
+    async def incr(self, key):
+        self.store[key] = int(self.store.get(key) or 0) + 1
+        return self.store[key]
+    async def delete(self, *keys):
+        return sum(1 for k in keys if self.store.pop(k, None) is not None)
+    async def decr(self, key):
+        self.store[key] = int(self.store.get(key) or 0) - 1
+        return self.store[key]
+    async def sadd(self, key, *members):
+        members = {str(m) for m in members}
+        current = self.store.setdefault(key, set())
+        added = len(members - current)
+        current |= members
+        return added
+    async def srem(self, key, *members):
+        current = self.store.get(key, set())
+        removed = len({str(m) for m in members} & current)
+        current -= {str(m) for m in members}
+        return removed
+    async def sismember(self, key, member):
+        return 1 if str(member) in self.store.get(key, set()) else 0
+    async def zadd(self, key, mapping, gt=False):
+        current = self.store.setdefault(key, {})
+        added = 0
+        for member, score in mapping.items():
+            if member not in current:
+                added += 1
+            elif gt and score <= current[member]:
+                continue
+            current[member] = score
+        return added
+    async def zremrangebyscore(self, key, min_score, max_score):
+        current = self.store.get(key, {})
+        stale = [m for m, score in current.items() if min_score <= score <= max_score]
+        for m in stale:
+            del current[m]
+        return len(stale)
+    async def zcard(self, key):
+        return len(self.store.get(key, {}))
+    async def zrem(self, key, *members):
+        current = self.store.get(key, {})
+        return sum(1 for m in members if current.pop(m, None) is not None)
+    async def zscore(self, key, member):
+        return self.store.get(key, {}).get(member)
+    async def zrevrange(self, key, start, end, withscores=False):
+        ranked = sorted(self.store.get(key, {}).items(), key=lambda e: (e[1], e[0]), reverse=True)[start:end + 1]
+        return ranked if withscores else [m for m, _ in ranked]
+    async def expire(self, key, seconds):
+        return 1 if key in self.store else 0
+    async def publish(self, channel, message):
+        return 0
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+class FakePipeline:
+    """Queues calls and replays them on the FakeRedis; unknown commands fail at execute like a real error."""
+    def __init__(self, redis):
+        self.redis = redis
+        self.calls = []
+    def __getattr__(self, name):
+        def queue(*args, **kwargs):
+            self.calls.append((name, args, kwargs))
+            return self
+        return queue
+    async def execute(self):
+        return [await getattr(self.redis, name)(*args, **kwargs) for name, args, kwargs in self.calls]
 
 async def override_get_db():
     async with AsyncSessionLocal() as session:
@@ -32,6 +110,7 @@ def setup_db():
             await conn.run_sync(Base.metadata.create_all)
     asyncio.get_event_loop().run_until_complete(init_models())
     app.dependency_overrides[app_db.get_db] = override_get_db
+    app.dependency_overrides[app_db.get_sessionmaker] = lambda: AsyncSessionLocal
     app_redis.redis_client = FakeRedis()
     yield
 
@@ -39,3 +118,62 @@ def setup_db():
 def client():
     return TestClient(app)
 
+@pytest.fixture
+def sessions():
+    """Session factory on the test database, for setting up and inspecting rows directly."""
+    return AsyncSessionLocal
+
+@pytest.fixture
+def start_item_now():
+    """Move items' start into the past so the next read transitions them to in_progress."""
+    def start(*item_ids: int, min_start_price: float = 5.0) -> None:
+        async def run():
+            async with AsyncSessionLocal() as db:
+                await db.execute(update(Item).where(Item.id.in_(item_ids)).values(
+                    start_at=datetime.utcnow() - timedelta(seconds=1), min_start_price=min_start_price))
+                await db.commit()
+        asyncio.run(run())
+    return start
+
+@pytest.fixture
+def end_item_now():
+    """Move items' end into the past; they close on the next read or close call."""
+    def end(*item_ids: int) -> None:
+        async def run():
+            async with AsyncSessionLocal() as db:
+                await db.execute(update(Item).where(Item.id.in_(item_ids)).values(end_at=datetime.utcnow() - timedelta(seconds=1)))
+                await db.commit()
+        asyncio.run(run())
+    return end
+
+@pytest.fixture
+def grant_role():
+    """Server-side role change, as tools.set_role does; self-registration only creates viewers."""
+    def grant(email: str, role: str) -> None:
+        async def run():
+            async with AsyncSessionLocal() as db:
+                await db.execute(update(User).where(User.email == email).values(role=Role(role)))
+                await db.commit()
+        asyncio.run(run())
+    return grant
+
+
+class FrozenClock:
+    def __init__(self, now: datetime):
+        self.now = now
+    def advance(self, seconds: float) -> None:
+        self.now += timedelta(seconds=seconds)
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Freezes the auction endpoints' clock; ``clock.advance(s)`` moves it."""
+    from app.auctions import endpoints
+    frozen = FrozenClock(datetime.now(timezone.utc))
+
+    class FrozenDatetime(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return frozen.now if tz else frozen.now.replace(tzinfo=None)
+
+    monkeypatch.setattr(endpoints, "datetime", FrozenDatetime)
+    return frozen
@@ -0,0 +1,98 @@
+"""Admin tests: export role check, CSV/NDJSON streaming, keyset paging and time filters; stored request profiles."""
+import asyncio
+import csv
+import io
+import orjson
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from app.core.config import settings
+from app.middleware.profiling import ProfilingMiddleware, install_sql_hooks, remove_sql_hooks
+from app.middleware.request_id import RequestIDMiddleware
+
+
+def tokens(client, email: str, role: str, grant_role=None) -> dict:
+    client.post('/auth/register', json={"email": email, "password": "pass"})
+    if role != "viewer":
+        grant_role(email, role)
+    r = client.post('/auth/login', data={"username": email, "password": "pass"})
+    return {"Authorization": f"Bearer {r.json()['access_token']}"}
+
+
+def test_export_streams_all_rows_in_pages(client, monkeypatch, grant_role):
+    from app.admin import export
+    admin = tokens(client, "admin@example.com", "admin", grant_role)
+    viewer = tokens(client, "viewer@example.com", "viewer")
+    for i in range(5):
+        client.post('/items', json={"title": f"Export {i}", "description": "d", "base_price": 1.0})
+
+    assert client.get('/admin/export/items', headers=viewer).status_code == 403
+    monkeypatch.setattr(export, "EXPORT_BATCH_ROWS", 2)
+    r = client.get('/admin/export/items', headers=admin)
+    assert r.status_code == 200 and r.headers["content-type"].startswith("application/x-ndjson")
+    rows = [orjson.loads(line) for line in r.content.splitlines()]
+    ids = [row["id"] for row in rows]
+    assert ids == sorted(set(ids)) and len(ids) >= 5
+    assert {"Export 0", "Export 4"} <= {row["title"] for row in rows}
+
+    r = client.get('/admin/export/items', params={"format": "csv"}, headers=admin)
+    table = list(csv.reader(io.StringIO(r.text)))
+    assert table[0] == export.columns("items") and [int(row[0]) for row in table[1:]] == ids
+
+    r = client.get('/admin/export/bids', params={"since": "2100-01-01T00:00:00Z"}, headers=admin)
+    assert r.status_code == 200 and r.content == b""
+
+
+@pytest.fixture
+def sql_hooks():
+    install_sql_hooks()
+    yield
+    remove_sql_hooks()
+
+def test_profiled_request_is_stored_by_request_id(client, monkeypatch, grant_role, sql_hooks, sessions):
+    monkeypatch.setattr(settings, "profile_token", "secret")
+    probe = FastAPI()
+
+    def burn() -> int:
+        return sum(i * i for i in range(300_000))
+
+    @probe.get('/slow')
+    async def slow():
+        async with sessions() as db:
+            await db.execute(text("SELECT 1"))
+        burn()
+        await asyncio.sleep(0.05)
+        return {"ok": True}
+
+    @probe.get('/idle')
+    async def idle():
+        # Another task burns the loop while this request awaits: that is not the request's CPU
+        async def elsewhere():
+            burn()
+        other = asyncio.create_task(elsewhere())
+        await asyncio.sleep(0.05)
+        await other
+        return {"ok": True}
+
+    probe.add_middleware(ProfilingMiddleware)
+    probe.add_middleware(RequestIDMiddleware)
+    with TestClient(probe) as probe_client:
+        profiled = probe_client.get('/slow', headers={"X-Profile": "secret"}).headers["X-Request-ID"]
+        plain = probe_client.get('/slow', headers={"X-Profile": "wrong"}).headers["X-Request-ID"]
+        idle = probe_client.get('/idle', headers={"X-Profile": "secret"}).headers["X-Request-ID"]
+
+    admin = tokens(client, "profiler@example.com", "admin", grant_role)
+    viewer = tokens(client, "notprofiler@example.com", "viewer")
+    assert client.get(f'/admin/profiles/{profiled}', headers=viewer).status_code == 403
+    assert client.get(f'/admin/profiles/{plain}', headers=admin).status_code == 404
+    doc = client.get(f'/admin/profiles/{profiled}', headers=admin).json()
+    assert doc["request_id"] == profiled and doc["path"] == "/slow" and doc["status_code"] == 200
+    assert doc["sql"]["queries"] >= 1 and "SELECT 1" in [s["statement"] for s in doc["sql"]["statements"]]
+    assert doc["sampling"]["on_cpu_ms"] > 0 and doc["sampling"]["await_ms"] >= 40
+    assert doc["sampling"]["on_cpu_ms"] + doc["sampling"]["await_ms"] <= doc["wall_ms"]
+    assert any(s["stack"].endswith("test_admin.py:<genexpr>") for s in doc["stacks"])
+
+    doc = client.get(f'/admin/profiles/{idle}', headers=admin).json()
+    assert doc["sampling"]["await_ms"] >= 40
+    assert not any(s["stack"].endswith("test_admin.py:<genexpr>") for s in doc["stacks"])
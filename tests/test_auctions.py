@@ -1,10 +1,36 @@
 """Auction tests: basic bid placement and poison interaction smoke checks."""
 
+import asyncio
 from datetime import datetime, timedelta, timezone
 
+import orjson
+import pytest
+from fastapi import HTTPException, Response
 from fastapi.testclient import TestClient
+from sqlalchemy import delete, event, select, update
+from sqlalchemy.exc import DBAPIError, OperationalError
+from starlette.websockets import WebSocketDisconnect
 import types
 
+from main import app
+from app.auctions import endpoints, exposures, idempotency, presence, summaries, tx_bid
+from app.auctions import ws as ws_module
+from app.auctions.endpoints import ItemOut, LobbyChangesOut, LobbyItemOut
+from app.auctions.feed import LobbyFeed, MAX_PENDING, lobby_feed
+from app.auctions.images import ImageCache, CachedImage, image_cache
+from app.auctions.ladder import ladder_key
+from app.auctions.notifier import ItemNotifier, wait_for
+from app.auctions.payloads import PayloadCache, extend_object, join_array
+from app.auctions.settlement import settle_ended
+from app.auctions.tx_bid import BidGate
+from app.auctions.versions import resync_lobby_feed
+from app.auth import revocations
+from app.core import db as app_db
+from app.core import redis as app_redis
+from app.core.config import settings
+from app.middleware.rate_limit import SlidingWindow
+from app.models import AuctionParticipant, Image, Item, ItemSummary, User, UserExposure
+
 
 def auth_tokens(client: TestClient, email: str):
     client.post('/auth/register', json={"email": email, "password": "pass", "role": "viewer"})
@@ -95,3 +121,704 @@ def test_close_auction_awards_inventory(client: TestClient):
     data = inv.json()
     assert isinstance(data, list) and len(data) >= 1
 
+
+def assert_matches_model(model, data) -> None:
+    """The handlers write pre-rendered JSON, so the declared response model is never applied:
+    check that a real payload has exactly the model's fields with the model's types."""
+    assert model.model_validate(data).model_dump(mode="json") == data
+
+def test_item_and_lobby_payloads_match_schemas(client: TestClient, start_item_now):
+    t = auth_tokens(client, "schema@example.com")
+    headers = {"Authorization": f"Bearer {t['access_token']}"}
+    scheduled, bid_on = create_item(client), create_item(client)
+    for item_id in (scheduled, bid_on):
+        assert client.post(f'/items/{item_id}/join', headers=headers).status_code == 200
+    start_item_now(bid_on)
+    assert client.get(f'/items/{bid_on}', headers=headers).status_code == 200
+    assert client.post(f'/items/{bid_on}/bid', json={"amount": 50}, headers=headers).status_code == 200
+
+    for item_id in (scheduled, bid_on):
+        r = client.get(f'/items/{item_id}', headers=headers)
+        assert r.status_code == 200 and r.headers["content-type"] == "application/json"
+        assert_matches_model(ItemOut, r.json())
+    assert r.json()["current_bid"] is not None and r.json()["joined"] and r.json()["status"] == "in_progress"
+
+    r = client.get('/items', headers=headers)
+    assert r.status_code == 200
+    for row in r.json():
+        assert_matches_model(LobbyItemOut, row)
+    assert any(row["current_bid"] for row in r.json())
+
+    asyncio.run(resync_lobby_feed())
+    snap = client.get('/items/changes', headers=headers).json()
+    assert snap["snapshot"] is True and snap["rows"]
+    assert_matches_model(LobbyChangesOut, snap)
+    assert client.post(f'/items/{scheduled}/leave', headers=headers).status_code == 200
+    delta = client.get('/items/changes', params={"cursor": snap["cursor"]}, headers=headers).json()
+    assert delta["snapshot"] is False and [row["id"] for row in delta["rows"]] == [scheduled]
+    assert_matches_model(LobbyChangesOut, delta)
+
+def test_active_item_route_is_not_shadowed_by_item_id(client: TestClient):
+    item_id = create_item(client)
+    r = client.get('/items/active')
+    assert r.status_code == 200 and r.json() is not None and r.json()["id"] <= item_id
+
+def test_payload_cache_reuses_bytes_and_splices_timers():
+    cache = PayloadCache(maxsize=2)
+    first = cache.get_or_render(1, ("scheduled", None), lambda: {"id": 1, "status": "scheduled"})
+    again = cache.get_or_render(1, ("scheduled", None), lambda: {"id": 1, "status": "changed"})
+    assert again is first and cache.hits == 1
+    cache.put(2, "a", {"id": 2})
+    cache.put(3, "a", {"id": 3})
+    assert cache.get(1, ("scheduled", None)) is None
+    body = extend_object(first, {"seconds_to_start": 5, "joined": False})
+    assert orjson.loads(body) == {"id": 1, "status": "scheduled", "seconds_to_start": 5, "joined": False}
+    assert extend_object(b"{}", {"a": 1}) == b'{"a":1}'
+    assert orjson.loads(join_array([first, body])) == [orjson.loads(first), orjson.loads(body)]
+
+def test_conditional_get_returns_304_until_item_changes(client: TestClient, clock):
+    t1 = auth_tokens(client, "etag1@example.com")
+    t2 = auth_tokens(client, "etag2@example.com")
+    h1 = {"Authorization": f"Bearer {t1['access_token']}"}
+    h2 = {"Authorization": f"Bearer {t2['access_token']}"}
+    item_id = create_item(client)
+
+    r = client.get(f'/items/{item_id}', headers=h1)
+    etag = r.headers["ETag"]
+    r = client.get(f'/items/{item_id}', headers={**h1, "If-None-Match": etag})
+    assert r.status_code == 304 and r.headers["ETag"] == etag
+
+    assert client.post(f'/items/{item_id}/join', headers=h2).status_code == 200
+    r = client.get(f'/items/{item_id}', headers={**h1, "If-None-Match": etag})
+    assert r.status_code == 200 and r.headers["ETag"] != etag
+    assert r.json()["players"] == 1
+
+def test_lobby_conditional_get(client: TestClient, clock):
+    t = auth_tokens(client, "etag3@example.com")
+    headers = {"Authorization": f"Bearer {t['access_token']}"}
+    create_item(client)
+    client.get('/items', headers=headers)  # settle any transitions/seeding
+    r = client.get('/items', headers=headers)
+    etag = r.headers["ETag"]
+    r = client.get('/items', headers={**headers, "If-None-Match": etag})
+    assert r.status_code == 304
+    create_item(client)
+    r = client.get('/items', headers={**headers, "If-None-Match": etag})
+    assert r.status_code == 200
+
+def test_conditional_gets_keep_countdowns_moving(client: TestClient, clock):
+    t = auth_tokens(client, "etag-tick@example.com")
+    headers = {"Authorization": f"Bearer {t['access_token']}"}
+    item_id = create_item(client)
+
+    r = client.get(f'/items/{item_id}', headers=headers)
+    etag, before = r.headers["ETag"], r.json()["seconds_to_start"]
+    assert client.get(f'/items/{item_id}', headers={**headers, "If-None-Match": etag}).status_code == 304
+    clock.advance(1)
+    r = client.get(f'/items/{item_id}', headers={**headers, "If-None-Match": etag})
+    assert r.status_code == 200 and r.json()["seconds_to_start"] == before - 1
+
+    client.get('/items', headers=headers)  # settle any transitions/seeding
+    r = client.get('/items', headers=headers)
+    etag, before = r.headers["ETag"], {row["id"]: row["seconds_to_start"] for row in r.json() if row["status"] == "scheduled"}
+    assert before and client.get('/items', headers={**headers, "If-None-Match": etag}).status_code == 304
+    clock.advance(1)
+    r = client.get('/items', headers={**headers, "If-None-Match": etag})
+    assert r.status_code == 200
+    after = {row["id"]: row["seconds_to_start"] for row in r.json() if row["id"] in before}
+    assert after and all(after[i] == before[i] - 1 for i in after)
+
+def test_lobby_from_replica_is_not_tagged(client: TestClient):
+    t = auth_tokens(client, "etag-replica@example.com")
+    headers = {"Authorization": f"Bearer {t['access_token']}"}
+    create_item(client)
+    client.get('/items', headers=headers)  # settle any transitions/seeding
+    # A second session, standing in for the replica
+    client.app.dependency_overrides[app_db.get_read_db] = client.app.dependency_overrides[app_db.get_db]
+    try:
+        r = client.get('/items', headers=headers)
+    finally:
+        del client.app.dependency_overrides[app_db.get_read_db]
+    assert r.status_code == 200
+    assert "ETag" not in r.headers
+
+def test_long_poll_returns_changed_item_or_304(client: TestClient):
+    t = auth_tokens(client, "wait@example.com")
+    headers = {"Authorization": f"Bearer {t['access_token']}"}
+    item_id = create_item(client)
+    version = int(client.get(f'/items/{item_id}', headers=headers).headers["ETag"].split(".")[1])
+
+    r = client.get(f'/items/{item_id}/wait', params={"since": version, "timeout": 0.2}, headers=headers)
+    assert r.status_code == 304
+
+    assert client.post(f'/items/{item_id}/join', headers=headers).status_code == 200
+    r = client.get(f'/items/{item_id}/wait', params={"since": version, "timeout": 5}, headers=headers)
+    assert r.status_code == 200 and r.json()["joined"] is True
+
+def test_item_notifier_wakes_registered_waiters():
+    async def scenario():
+        notifier = ItemNotifier()
+        with notifier.watch(7) as event:
+            asyncio.get_running_loop().call_later(0.01, notifier.notify, 7)
+            assert await wait_for(event, 1.0)
+        with notifier.watch(7) as event:
+            assert not await wait_for(event, 0.01)
+        assert notifier.waiting(7) == 0
+
+    asyncio.run(scenario())
+
+def test_websocket_room_requires_join_and_answers_bids(client: TestClient):
+    t = auth_tokens(client, "ws@example.com")
+    headers = {"Authorization": f"Bearer {t['access_token']}"}
+    item_id = create_item(client)
+
+    with client.websocket_connect(f"/ws/items/{item_id}?token={t['access_token']}") as ws:
+        with pytest.raises(WebSocketDisconnect) as exc:
+            ws.receive_text()
+        assert exc.value.code == 4403
+
+    assert client.post(f'/items/{item_id}/join', headers=headers).status_code == 200
+    with client.websocket_connect(f"/ws/items/{item_id}?token={t['access_token']}") as ws:
+        state = ws.receive_json()
+        assert state["type"] == "state" and state["status"] == "scheduled"
+        ws.send_json({"type": "bid", "amount": 500})
+        reply = ws.receive_json()
+        # Item is still scheduled, so the bid transaction rejects it
+        assert reply == {"type": "error", "status": 400, "detail": "Bidding not allowed at this time"}
+        ws.send_json({"type": "hello"})
+        assert ws.receive_json()["status"] == 400
+
+def test_websocket_bid_rechecks_join_and_reports_db_errors(client: TestClient, monkeypatch):
+    t = auth_tokens(client, "ws-leave@example.com")
+    headers = {"Authorization": f"Bearer {t['access_token']}"}
+    item_id = create_item(client)
+    assert client.post(f'/items/{item_id}/join', headers=headers).status_code == 200
+
+    async def broken_place_bid(*args, **kwargs):
+        raise OperationalError("UPDATE items", {}, Exception("connection lost"))
+
+    monkeypatch.setattr(ws_module, "place_bid", broken_place_bid)
+    with client.websocket_connect(f"/ws/items/{item_id}?token={t['access_token']}") as ws:
+        ws.receive_json()
+        ws.send_json({"type": "bid", "amount": 500})
+        assert ws.receive_json() == {"type": "error", "status": 500, "detail": "Bid could not be placed"}
+        assert client.post(f'/items/{item_id}/leave', headers=headers).status_code == 200
+        ws.send_json({"type": "bid", "amount": 500})
+        reply = ws.receive_json()
+        if reply["type"] == "state":
+            reply = ws.receive_json()
+        assert reply == {"type": "error", "status": 403, "detail": "Join the auction before bidding"}
+
+def test_sliding_window_limits_per_connection():
+    window = SlidingWindow(2, 10)
+    assert window.allow(0) and window.allow(1)
+    assert not window.allow(2)
+    assert window.allow(10.5)
+
+def user_id_of(email: str) -> int:
+    async def run():
+        async with app.dependency_overrides[app_db.get_sessionmaker]()() as db:
+            return (await db.execute(select(User.id).where(User.email == email))).scalar()
+    return asyncio.run(run())
+
+def test_presence_registry_tracks_join_leave_and_resyncs(client: TestClient):
+    t1 = auth_tokens(client, "p1@example.com")
+    t2 = auth_tokens(client, "p2@example.com")
+    h1 = {"Authorization": f"Bearer {t1['access_token']}"}
+    h2 = {"Authorization": f"Bearer {t2['access_token']}"}
+    p1, p2 = user_id_of("p1@example.com"), user_id_of("p2@example.com")
+    item_id = create_item(client)
+
+    client.post(f'/items/{item_id}/join', headers=h1)
+    client.post(f'/items/{item_id}/join', headers=h1)
+    client.post(f'/items/{item_id}/join', headers=h2)
+    store = app_redis.redis_client.store
+    assert store[presence.members_key(item_id)] == {str(p1), str(p2)}
+    client.post(f'/items/{item_id}/leave', headers=h2)
+    assert store[presence.members_key(item_id)] == {str(p1)}
+
+    # A lost registry entry is rebuilt from the participants table on the next read
+    store.pop(presence.synced_key(item_id), None)
+    store.pop(presence.members_key(item_id))
+    r = client.get(f'/items/{item_id}', headers=h1)
+    assert r.json()["players"] == 1 and r.json()["joined"] is True
+    assert store[presence.members_key(item_id)] == {str(p1)} and presence.synced_key(item_id) in store
+
+def test_presence_resync_racing_a_leave_is_not_trusted(client: TestClient, sessions):
+    t = auth_tokens(client, "race-leave@example.com")
+    headers = {"Authorization": f"Bearer {t['access_token']}"}
+    user_id = user_id_of("race-leave@example.com")
+    item_id = create_item(client)
+    assert client.post(f'/items/{item_id}/join', headers=headers).status_code == 200
+
+    async def leave():
+        async with sessions() as db:
+            await db.execute(delete(AuctionParticipant).where(AuctionParticipant.item_id == item_id, AuctionParticipant.user_id == user_id))
+            await db.commit()
+        await presence.remove(item_id, user_id)
+
+    async def resync_racing_leave():
+        async with sessions() as db:
+            execute = db.execute
+
+            async def read_then_leave(*args, **kwargs):
+                result = await execute(*args, **kwargs)
+                await leave()
+                return result
+
+            db.execute = read_then_leave
+            # The read still sees the participant, and the set is written back with them in it
+            assert await presence.sync_item(db, item_id) == [user_id]
+        async with sessions() as db:
+            return await presence.is_joined(db, item_id, user_id)
+
+    assert asyncio.run(resync_racing_leave()) is False
+    assert not app_redis.redis_client.store.get(presence.members_key(item_id))
+
+def test_presence_write_lost_to_redis_outage_is_resynced(client: TestClient, monkeypatch):
+    t = auth_tokens(client, "outage-leave@example.com")
+    headers = {"Authorization": f"Bearer {t['access_token']}"}
+    item_id = create_item(client)
+    assert client.post(f'/items/{item_id}/join', headers=headers).status_code == 200
+
+    class DownRedis:
+        def __getattr__(self, name):
+            raise ConnectionError("redis down")
+
+    fake = app_redis.redis_client
+    monkeypatch.setattr(revocations.cache, "synced", True)
+    monkeypatch.setattr(app_redis, "redis_client", DownRedis())
+    assert client.post(f'/items/{item_id}/leave', headers=headers).status_code == 200
+    monkeypatch.setattr(app_redis, "redis_client", fake)
+    # The registry still lists the user, but this worker knows its write was lost
+    assert str(user_id_of("outage-leave@example.com")) in fake.store[presence.members_key(item_id)]
+    assert client.post(f'/items/{item_id}/bid', json={"amount": 500}, headers=headers).status_code == 403
+    assert item_id not in presence._stale
+
+def test_batch_bids_report_per_item_outcomes(client: TestClient):
+    t = auth_tokens(client, "batch@example.com")
+    headers = {"Authorization": f"Bearer {t['access_token']}"}
+    joined_item = create_item(client)
+    other_item = create_item(client)
+    assert client.post(f'/items/{joined_item}/join', headers=headers).status_code == 200
+
+    r = client.post('/items/bids', json=[
+        {"item_id": joined_item, "amount": 300},
+        {"item_id": other_item, "amount": 300},
+        {"item_id": joined_item, "amount": 310},
+        {"item_id": 999999, "amount": 300},
+    ], headers=headers)
+    assert r.status_code == 200
+    outcomes = r.json()
+    assert [o["item_id"] for o in outcomes] == [joined_item, other_item, joined_item, 999999]
+    # Still scheduled, so the transaction itself rejects the bid
+    assert outcomes[0]["status_code"] == 400 and not outcomes[0]["ok"]
+    assert outcomes[1]["status_code"] == 403
+    assert outcomes[2]["status_code"] == 409
+    assert outcomes[3]["status_code"] == 403
+
+    assert client.post('/items/bids', json=[], headers=headers).status_code == 400
+
+def test_optimistic_bid_retries_lost_compare_and_swap(monkeypatch, sessions):
+    monkeypatch.setattr(tx_bid, "CAS_BACKOFF_SECONDS", 0)
+
+    async def scenario():
+        async with sessions() as db:
+            now = datetime.utcnow()
+            item = Item(title="cas", description="", base_price=0.0, min_start_price=5.0, status="in_progress",
+                        start_at=now - timedelta(minutes=1), end_at=now + timedelta(minutes=5))
+            user = User(email="cas@example.com", pw_hash="", balance=1000.0)
+            db.add_all([item, user])
+            await db.commit()
+
+            real_execute = db.execute
+            raced = []
+
+            async def racing_execute(stmt, *args, **kwargs):
+                # Another writer bumps the version between our read and our first swap
+                if getattr(stmt, "is_update", False) and not raced:
+                    raced.append(True)
+                    await real_execute(update(Item).where(Item.id == item.id).values(version=Item.version + 1))
+                return await real_execute(stmt, *args, **kwargs)
+
+            conflicts = tx_bid.cas_stats["conflicts"]
+            monkeypatch.setattr(db, "execute", racing_execute)
+            result = await tx_bid.place_bid(db, item.id, user.id, 10.0, None, None, mode="optimistic")
+            await db.commit()
+            await db.refresh(item)
+            return result, item.version, tx_bid.cas_stats["conflicts"] - conflicts, user.id
+
+    result, version, conflicts, user_id = asyncio.run(scenario())
+    assert result == {"item_id": result["item_id"], "winner_user_id": user_id, "amount": 10.0}
+    assert conflicts == 1
+    # One bump from the racing writer, one from our successful swap
+    assert version == 2
+
+def test_bid_gate_caps_inflight_bids_per_item():
+    gate = BidGate()
+    with gate.admit(1, limit=2), gate.admit(1, limit=2):
+        with pytest.raises(HTTPException) as exc:
+            with gate.admit(1, limit=2):
+                pass
+        # Other items are unaffected
+        with gate.admit(2, limit=2):
+            assert gate.inflight(2) == 1
+    assert exc.value.status_code == 503
+    assert exc.value.headers["Retry-After"] == "1"
+    assert exc.value.detail["code"] == "item_overloaded"
+    assert gate.inflight(1) == 0
+
+def test_lock_not_available_becomes_retryable_409(monkeypatch):
+    class LockNotAvailable(Exception):
+        pgcode = "55P03"
+
+    async def busy(db, item_id, nowait=False):
+        raise DBAPIError("SELECT ... FOR UPDATE NOWAIT", {}, LockNotAvailable())
+
+    async def no_timeout(db, timeout_ms):
+        return None
+
+    monkeypatch.setattr(tx_bid, "fetch_item_for_update", busy)
+    monkeypatch.setattr(tx_bid, "set_lock_timeout", no_timeout)
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(tx_bid.place_bid(None, 1, 1, 10.0, None, None, mode="pessimistic"))
+    assert exc.value.status_code == 409
+    assert exc.value.detail["code"] == "item_busy"
+    assert exc.value.headers == {"Retry-After": "1"}
+
+def summary_of(sessions, item_id: int) -> tuple:
+    async def run():
+        async with sessions() as db:
+            s = await db.get(ItemSummary, item_id)
+            return s.status, s.high_bid, s.leader_user_id, s.bid_count, s.player_count
+    return asyncio.run(run())
+
+def test_item_summary_maintained_on_join_leave_and_bid(client: TestClient, sessions, start_item_now):
+    t1 = auth_tokens(client, "summary1@example.com")
+    t2 = auth_tokens(client, "summary2@example.com")
+    h1 = {"Authorization": f"Bearer {t1['access_token']}"}
+    h2 = {"Authorization": f"Bearer {t2['access_token']}"}
+    item_id = create_item(client)
+    assert client.post(f'/items/{item_id}/join', headers=h1).status_code == 200
+    assert client.post(f'/items/{item_id}/join', headers=h2).status_code == 200
+    assert client.post(f'/items/{item_id}/leave', headers=h2).status_code == 200
+
+    start_item_now(item_id)
+    r = client.get(f'/items/{item_id}', headers=h1)
+    assert r.status_code == 200 and r.json()["status"] == "in_progress"
+    r = client.post(f'/items/{item_id}/bid', json={"amount": 50}, headers=h1)
+    assert r.status_code == 200
+    leader = r.json()["winner_user_id"]
+
+    assert summary_of(sessions, item_id) == ("in_progress", 50.0, leader, 1, 1)
+    body = client.get(f'/items/{item_id}', headers=h1).json()
+    assert body["current_bid"] == {"amount": 50.0, "user_id": leader}
+    assert body["players"] == 1
+
+def test_item_summary_rebuild_repairs_drift(client: TestClient, sessions):
+    headers = {"Authorization": f"Bearer {auth_tokens(client, 'summary3@example.com')['access_token']}"}
+    item_id = create_item(client)
+    assert client.post(f'/items/{item_id}/join', headers=headers).status_code == 200
+    expected = summary_of(sessions, item_id)
+
+    async def drift_and_rebuild():
+        async with sessions() as db:
+            await db.execute(update(ItemSummary).where(ItemSummary.item_id == item_id).values(high_bid=99.0, bid_count=3, player_count=9))
+            await summaries.rebuild(db, [item_id])
+            await db.commit()
+
+    asyncio.run(drift_and_rebuild())
+    assert summary_of(sessions, item_id) == expected == ("scheduled", None, None, 0, 1)
+
+def test_item_summary_fallback_upserts_a_missing_row(client: TestClient, sessions):
+    headers = {"Authorization": f"Bearer {auth_tokens(client, 'summary4@example.com')['access_token']}"}
+    item_id = create_item(client)
+    assert client.post(f'/items/{item_id}/join', headers=headers).status_code == 200
+
+    async def fallback_twice():
+        # The per-item fallback upserts, whether or not another transaction already wrote the row
+        async with sessions() as db:
+            await db.execute(delete(ItemSummary).where(ItemSummary.item_id == item_id))
+            await summaries.add_players(db, item_id, 1)
+            await summaries.rebuild(db, [item_id])
+            assert await summaries.rebuild(db) >= 1
+            await db.commit()
+
+    asyncio.run(fallback_twice())
+    assert summary_of(sessions, item_id) == ("scheduled", None, None, 0, 1)
+
+def ledger_of(sessions, email: str, rebuild: bool = False) -> tuple:
+    async def run():
+        async with sessions() as db:
+            user_id = (await db.execute(select(User.id).where(User.email == email))).scalar()
+            if rebuild:
+                await exposures.rebuild(db, [user_id])
+                await db.commit()
+            row = await db.get(UserExposure, user_id, populate_existing=True)
+            return row.committed, row.headroom
+    return asyncio.run(run())
+
+def live_items_joined_by(client: TestClient, start_item_now, *emails: str) -> tuple:
+    """Two started items that every user has joined, and each user's auth headers."""
+    headers = [{"Authorization": f"Bearer {auth_tokens(client, email)['access_token']}"} for email in emails]
+    items = (create_item(client), create_item(client))
+    for item_id in items:
+        for h in headers:
+            assert client.post(f'/items/{item_id}/join', headers=h).status_code == 200
+    start_item_now(*items)
+    for item_id in items:
+        assert client.get(f'/items/{item_id}', headers=headers[0]).status_code == 200
+    return items, headers
+
+def test_exposure_ledger_limits_commitments_across_live_items(client: TestClient, sessions, start_item_now):
+    (first, second), (h1, h2) = live_items_joined_by(client, start_item_now, "expose1@example.com", "expose2@example.com")
+
+    # 300 leading plus 100 of auto-raise headroom on the first item
+    assert client.post(f'/items/{first}/bid', json={"amount": 300, "max_budget": 400, "bid_increment": 5}, headers=h1).status_code == 200
+    assert ledger_of(sessions, "expose1@example.com") == (300.0, 100.0)
+    r = client.post(f'/items/{second}/bid', json={"amount": 150}, headers=h1)
+    assert r.status_code == 400 and "available balance" in r.json()["detail"]
+
+    # Outbid past the cap: the first user's exposure is released
+    assert client.post(f'/items/{first}/bid', json={"amount": 450}, headers=h2).status_code == 200
+    assert ledger_of(sessions, "expose1@example.com") == (0.0, 0.0)
+    assert ledger_of(sessions, "expose2@example.com") == (450.0, 0.0)
+    assert client.post(f'/items/{second}/bid', json={"amount": 150}, headers=h1).status_code == 200
+    assert ledger_of(sessions, "expose1@example.com") == ledger_of(sessions, "expose1@example.com", rebuild=True) == (150.0, 0.0)
+
+def test_exposure_released_when_item_closes(client: TestClient, sessions, start_item_now, end_item_now):
+    (first, _), (h1,) = live_items_joined_by(client, start_item_now, "exposeclose@example.com")
+    assert client.post(f'/items/{first}/bid', json={"amount": 300}, headers=h1).status_code == 200
+    assert ledger_of(sessions, "exposeclose@example.com") == (300.0, 0.0)
+
+    end_item_now(first)
+    assert client.post(f'/items/{first}/close').json()["status"] == "closed"
+    assert ledger_of(sessions, "exposeclose@example.com") == (0.0, 0.0)
+
+def test_optimistic_bid_reserves_exposure_without_a_locking_read(client: TestClient, monkeypatch, sessions, start_item_now):
+    (first, second), (h1,) = live_items_joined_by(client, start_item_now, "exposecas@example.com")
+    monkeypatch.setattr(settings, "bid_concurrency_mode", "optimistic")
+
+    async def no_locking_read(*args, **kwargs):
+        raise AssertionError("optimistic bids must not lock the ledger with SELECT ... FOR UPDATE")
+
+    monkeypatch.setattr(exposures, "check_available", no_locking_read)
+    assert client.post(f'/items/{first}/bid', json={"amount": 300, "max_budget": 400, "bid_increment": 5}, headers=h1).status_code == 200
+    assert ledger_of(sessions, "exposecas@example.com") == (300.0, 100.0)
+
+    # The conditional UPDATE matches no row, and the whole bid rolls back with it
+    r = client.post(f'/items/{second}/bid', json={"amount": 150}, headers=h1)
+    assert r.status_code == 400 and "available balance" in r.json()["detail"]
+    assert ledger_of(sessions, "exposecas@example.com") == (300.0, 100.0)
+    assert summary_of(sessions, second)[1:4] == (None, None, 0)
+    assert client.post(f'/items/{second}/bid', json={"amount": 100}, headers=h1).status_code == 200
+    assert ledger_of(sessions, "exposecas@example.com") == ledger_of(sessions, "exposecas@example.com", rebuild=True) == (400.0, 100.0)
+
+def test_settler_closes_ended_items_nobody_polls(client: TestClient, sessions, start_item_now, end_item_now):
+    (first, _), (h1,) = live_items_joined_by(client, start_item_now, "exposesettle@example.com")
+    assert client.post(f'/items/{first}/bid', json={"amount": 300}, headers=h1).status_code == 200
+    end_item_now(first)
+
+    async def settle():
+        async with sessions() as db:
+            return await settle_ended(db, datetime.now(timezone.utc))
+
+    assert first in asyncio.run(settle())
+    assert first not in asyncio.run(settle())
+    assert summary_of(sessions, first)[0] == "closed"
+    assert ledger_of(sessions, "exposesettle@example.com") == (0.0, 0.0)
+
+def test_lobby_changes_feed_sends_only_changed_rows(client: TestClient, monkeypatch):
+    t = auth_tokens(client, "feed@example.com")
+    headers = {"Authorization": f"Bearer {t['access_token']}"}
+    create_item(client)
+    # Without a subscription the feed cannot vouch for other workers' changes
+    monkeypatch.setattr(lobby_feed, "live", False)
+    r = client.get('/items/changes', params={"cursor": 0}, headers=headers)
+    assert r.status_code == 200 and r.json()["snapshot"] is True
+
+    asyncio.run(resync_lobby_feed())  # what the listener does on (re)subscribe
+    snap = client.get('/items/changes', headers=headers).json()
+    assert snap["snapshot"] is True and snap["rows"] and "seconds_to_start" not in snap["rows"][0]
+    cursor = snap["cursor"]
+    r = client.get('/items/changes', params={"cursor": cursor}, headers=headers).json()
+    assert r == {"cursor": cursor, "snapshot": False, "rows": [], "removed": []}
+
+    item_id = create_item(client)
+    assert client.post(f'/items/{item_id}/join', headers=headers).status_code == 200
+    r = client.get('/items/changes', params={"cursor": cursor}, headers=headers).json()
+    assert r["snapshot"] is False and r["cursor"] == cursor + 2
+    assert [row["id"] for row in r["rows"]] == [item_id] and r["rows"][0]["players"] == 1
+
+    # Cursors older than the buffer get a snapshot
+    lobby_feed.reset(r["cursor"])
+    assert client.get('/items/changes', params={"cursor": cursor}, headers=headers).json()["snapshot"] is True
+
+def test_lobby_feed_requires_contiguous_versions():
+    feed = LobbyFeed(capacity=8)
+    feed.reset(10)
+    feed.record(12, [2])
+    assert feed.head == 10 and feed.since(10) == set()
+    feed.on_message("11 1,3")
+    assert feed.head == 12 and feed.since(10) == {1, 2, 3} and feed.since(11) == {2}
+    for v in range(14, 15 + MAX_PENDING):
+        feed.record(v, [v])
+    # Version 13 never arrived: the gap is skipped and cursors before it need a snapshot
+    assert feed.since(12) is None and feed.base >= 13 and feed.head == 14 + MAX_PENDING
+    assert feed.head - feed.base <= 8
+
+def test_bulk_item_creation_dedupes_images(client: TestClient, monkeypatch, grant_role, sessions):
+    auth_tokens(client, "catalog@example.com")
+    grant_role("catalog@example.com", "editor")
+    editor = {"Authorization": f"Bearer {client.post('/auth/login', data={'username': 'catalog@example.com', 'password': 'pass'}).json()['access_token']}"}
+    viewer = {"Authorization": f"Bearer {auth_tokens(client, 'notcatalog@example.com')['access_token']}"}
+    lookups = []
+
+    async def fake_fetch(query):
+        lookups.append(query)
+        photo = "shared" if query in ("lamp", "lantern") else f"photo-{query}"
+        return {"unsplash_id": f"bulk-{photo}", "image_url": f"https://img/{photo}", "image_thumb_url": f"https://img/{photo}/t"}
+
+    monkeypatch.setattr(endpoints, "fetch_unsplash_image", fake_fetch)
+    start = datetime.now(timezone.utc) + timedelta(hours=1)
+    body = [{"title": f"Drop {i}", "query": q, "start_at": (start + timedelta(minutes=i)).isoformat(),
+             "end_at": (start + timedelta(minutes=i + 5)).isoformat()} for i, q in enumerate(["lamp", "lantern", "lamp", "vase"])]
+    assert client.post('/items/bulk', json=body, headers=viewer).status_code == 403
+    assert client.post('/items/bulk', json=[{**body[0], "end_at": body[0]["start_at"]}], headers=editor).status_code == 422
+
+    r = client.post('/items/bulk', json=body, headers=editor)
+    assert r.status_code == 200
+    ids = r.json()["ids"]
+    assert len(ids) == 4 and sorted(lookups) == ["lamp", "lantern", "vase"]
+
+    async def load():
+        async with sessions() as db:
+            res = await db.execute(select(Item, ItemSummary, Image).join(ItemSummary, ItemSummary.item_id == Item.id)
+                                   .join(Image, Image.id == Item.image_id).where(Item.id.in_(ids)).order_by(Item.id))
+            return res.all()
+
+    rows = asyncio.run(load())
+    assert [it.title for it, _, _ in rows] == ["Drop 0", "Drop 1", "Drop 2", "Drop 3"]
+    assert len({img.id for _, _, img in rows}) == 2 and rows[0][2].id == rows[1][2].id == rows[2][2].id
+    assert all(it.status == "scheduled" and s.image_url == img.image_url for it, s, img in rows)
+    assert client.get(f'/items/{ids[3]}', headers=viewer).json()["image"]["image_url"] == "https://img/photo-vase"
+
+    # A photo another request inserted after our lookup is skipped rather than failing the batch
+    async def insert_race():
+        async with sessions() as db:
+            photos = [{"unsplash_id": "bulk-photo-vase", "image_url": "https://img/other"},
+                      {"unsplash_id": "bulk-photo-race", "image_url": "https://img/race"}]
+            await db.execute(endpoints.insert_new_images(db), photos)
+            await db.commit()
+            res = await db.execute(select(Image.image_url).where(Image.unsplash_id.in_([p["unsplash_id"] for p in photos])).order_by(Image.id))
+            return res.scalars().all()
+
+    assert asyncio.run(insert_race()) == ["https://img/photo-vase", "https://img/race"]
+
+def test_idempotency_key_replays_first_outcome(client: TestClient):
+    t = auth_tokens(client, "idem@example.com")
+    headers = {"Authorization": f"Bearer {t['access_token']}"}
+    item_id = create_item(client)
+
+    first = client.post(f'/items/{item_id}/join', headers={**headers, "Idempotency-Key": "join-1"})
+    again = client.post(f'/items/{item_id}/join', headers={**headers, "Idempotency-Key": "join-1"})
+    assert first.status_code == again.status_code == 200
+    assert "Idempotent-Replayed" not in first.headers
+    assert again.headers["Idempotent-Replayed"] == "true" and again.json() == first.json()
+
+    # Still scheduled: the 400 is final, so it is stored and replayed too
+    bid = {"amount": 300}
+    r1 = client.post(f'/items/{item_id}/bid', json=bid, headers={**headers, "Idempotency-Key": "bid-1"})
+    r2 = client.post(f'/items/{item_id}/bid', json=bid, headers={**headers, "Idempotency-Key": "bid-1"})
+    assert r1.status_code == r2.status_code == 400
+    assert r2.json() == r1.json() and r2.headers["Idempotent-Replayed"] == "true"
+    # Same key, different request
+    r3 = client.post(f'/items/{item_id}/bid', json={"amount": 301}, headers={**headers, "Idempotency-Key": "bid-1"})
+    assert r3.status_code == 422
+    assert client.post(f'/items/{item_id}/bid', json=bid, headers={**headers, "Idempotency-Key": "k" * 256}).status_code == 400
+
+def test_idempotency_coalesces_concurrent_duplicates():
+    calls = []
+
+    async def handler():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return {"ok": len(calls)}
+
+    async def scenario():
+        responses = [Response() for _ in range(3)]
+        results = await asyncio.gather(*(idempotency.run(r, "u@example.com", "dup", "fp", handler) for r in responses))
+        return results, responses
+
+    results, responses = asyncio.run(scenario())
+    assert calls == [1]
+    assert results == [{"ok": 1}] * 3
+    assert [r.headers.get("Idempotent-Replayed") for r in responses] == [None, "true", "true"]
+
+def test_image_cache_serves_item_images_without_queries(client: TestClient, monkeypatch, grant_role, sessions):
+    cache = ImageCache(maxsize=2)
+    for i in (1, 2, 3):
+        cache.put(CachedImage(i, f"u{i}", f"https://img/{i}", None, None, None))
+    assert cache.get(1) is None and cache.get_by_unsplash_id("u1") is None
+    assert cache.get_by_unsplash_id("u3").id == 3
+    assert cache.snapshot()["size"] == 2
+
+    async def fake_fetch(query):
+        return {"unsplash_id": "cached-photo", "image_url": "https://img/cached", "image_thumb_url": "https://img/cached/t"}
+
+    monkeypatch.setattr(endpoints, "fetch_unsplash_image", fake_fetch)
+    auth_tokens(client, "imgcache@example.com")
+    grant_role("imgcache@example.com", "editor")
+    headers = {"Authorization": f"Bearer {client.post('/auth/login', data={'username': 'imgcache@example.com', 'password': 'pass'}).json()['access_token']}"}
+    start = datetime.now(timezone.utc) + timedelta(hours=1)
+    body = [{"title": "Cached", "query": "cached", "start_at": start.isoformat(), "end_at": (start + timedelta(minutes=5)).isoformat()}]
+    item_id = client.post('/items/bulk', json=body, headers=headers).json()["ids"][0]
+
+    engine = sessions.kw["bind"].sync_engine
+    statements = []
+    record = lambda conn, cursor, statement, *args: statements.append(statement)
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        hits = image_cache.hits
+        for _ in range(2):
+            r = client.get(f'/items/{item_id}', headers=headers)
+            assert r.json()["image"]["image_url"] == "https://img/cached"
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+    assert statements and not [s for s in statements if "FROM images" in s]
+    assert image_cache.hits >= hits + 2
+
+def bid_on_ladder(client: TestClient, start_item_now, prefix: str) -> tuple:
+    """A started item where a proxy bid defends once and is then outbid. Returns the item id,
+    the first bidder's headers and the expected ladder."""
+    h1 = {"Authorization": f"Bearer {auth_tokens(client, f'{prefix}1@example.com')['access_token']}"}
+    h2 = {"Authorization": f"Bearer {auth_tokens(client, f'{prefix}2@example.com')['access_token']}"}
+    item_id = create_item(client)
+    for h in (h1, h2):
+        assert client.post(f'/items/{item_id}/join', headers=h).status_code == 200
+    start_item_now(item_id)
+    assert client.get(f'/items/{item_id}', headers=h1).status_code == 200
+    first = client.post(f'/items/{item_id}/bid', json={"amount": 200, "max_budget": 300, "bid_increment": 10}, headers=h1).json()
+    # The proxy bid defends: only the first bidder's amount moves
+    raised = client.post(f'/items/{item_id}/bid', json={"amount": 250}, headers=h2).json()
+    assert raised["winner_user_id"] == first["winner_user_id"] and raised["amount"] == 260
+    outbid = client.post(f'/items/{item_id}/bid', json={"amount": 350}, headers=h2).json()
+    expected = [{"rank": 1, "user_id": outbid["winner_user_id"], "amount": 350.0},
+                {"rank": 2, "user_id": first["winner_user_id"], "amount": 260.0}]
+    return item_id, h1, expected
+
+def test_bid_ladder_is_empty_before_bids_and_404_for_unknown_items(client: TestClient):
+    headers = {"Authorization": f"Bearer {auth_tokens(client, 'ladder0@example.com')['access_token']}"}
+    item_id = create_item(client)
+    assert client.get(f'/items/{item_id}/ladder', headers=headers).json() == {"item_id": item_id, "bids": []}
+    assert client.get('/items/999999/ladder', headers=headers).status_code == 404
+
+def test_bid_ladder_tracks_auto_raises(client: TestClient, start_item_now):
+    item_id, headers, expected = bid_on_ladder(client, start_item_now, "ladder")
+    assert client.get(f'/items/{item_id}/ladder', headers=headers).json()["bids"] == expected
+    assert client.get(f'/items/{item_id}/ladder?n=1', headers=headers).json()["bids"] == expected[:1]
+
+def test_bid_ladder_rebuilds_from_bids_when_lost(client: TestClient, start_item_now):
+    item_id, headers, expected = bid_on_ladder(client, start_item_now, "ladderlost")
+    app_redis.redis_client.store.pop(ladder_key(item_id))
+    assert client.get(f'/items/{item_id}/ladder', headers=headers).json()["bids"] == expected
@@ -14,4 +14,32 @@ def test_register_login_refresh_logout(client):
     assert new_tokens["access_token"] != tokens["access_token"]
     r = client.post('/auth/logout', headers={"Authorization": f"Bearer {new_tokens['access_token']}"})
     assert r.status_code == 200
+    # Elevated roles are never self-service
+    for role in ("editor", "admin"):
+        r = client.post('/auth/register', json={"email": f"self-{role}@example.com", "password": "pass", "role": role})
+        assert r.status_code == 403
+    assert client.post('/auth/login', data={"username": "self-admin@example.com", "password": "pass"}).status_code != 200
 
+
+def test_revoked_tokens_checked_locally_and_fail_closed(client, monkeypatch):
+    """A synced worker answers from its local copy; unsynced and without Redis it refuses the token."""
+    import app.core.redis as redis_module
+    from app.auth import revocations
+    client.post('/auth/register', json={"email": "rev@example.com", "password": "pass", "role": "viewer"})
+    tokens = client.post('/auth/login', data={"username": "rev@example.com", "password": "pass"}).json()
+    headers = {"Authorization": f"Bearer {tokens['access_token']}"}
+    assert client.post('/auth/logout', headers=headers).status_code == 200
+    assert client.post('/auth/logout', headers=headers).status_code == 401
+
+    class DownRedis:
+        def __getattr__(self, name):
+            raise ConnectionError("redis down")
+
+    fresh = client.post('/auth/login', data={"username": "rev@example.com", "password": "pass"}).json()
+    fresh_headers = {"Authorization": f"Bearer {fresh['access_token']}"}
+    monkeypatch.setattr(redis_module, "redis_client", DownRedis())
+    monkeypatch.setattr(revocations.cache, "synced", False)
+    assert client.get('/auth/inventory', headers=fresh_headers).status_code == 503
+    monkeypatch.setattr(revocations.cache, "synced", True)
+    assert client.get('/auth/inventory', headers=fresh_headers).status_code == 200
+    assert client.get('/auth/inventory', headers=headers).status_code == 401
@@ -0,0 +1,64 @@
+"""Load generator tests: endpoint grouping, report shape and ETag revalidation by virtual users."""
+import asyncio
+import random
+import httpx
+import pytest
+from tools.loadgen import LoadStats, UserProfile, VirtualUser, run_load
+from app.middleware import rate_limit
+from tools.loadgen import runner
+from tools.loadgen.runner import shared_ip_capacity
+from tools.loadgen.stats import endpoint_name
+
+
+def test_endpoint_name_groups_item_routes():
+    assert endpoint_name("GET", "/items/42") == "GET /items/{id}"
+    assert endpoint_name("POST", "/items/7/bid") == "POST /items/{id}/bid"
+    assert endpoint_name("GET", "/items?status=scheduled") == "GET /items"
+
+def test_load_stats_report():
+    stats = LoadStats()
+    for ms in (1.0, 2.0, 3.0, 4.0):
+        stats.record("GET", "/items/1", 200, ms)
+    stats.record("GET", "/items/2", 500, 10.0)
+    stats.record("GET", "/items/3", None, 5.0)
+    stats.stop()
+    row = stats.report()["endpoints"]["GET /items/{id}"]
+    assert row["requests"] == 6
+    assert row["max_ms"] == 10.0
+    assert row["error_rate"] == 2 / 6
+    assert row["statuses"] == {"200": 4, "500": 1, "exception": 1}
+
+def test_virtual_user_revalidates_with_etag():
+    seen = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path == "/auth/login":
+            return httpx.Response(200, json={"access_token": "t", "refresh_token": "r", "token_type": "bearer"})
+        if request.url.path == "/auth/register":
+            return httpx.Response(200, json={})
+        seen.append(request.headers.get("if-none-match"))
+        if request.headers.get("if-none-match") == 'W/"l1.all"':
+            return httpx.Response(304, headers={"ETag": 'W/"l1.all"'})
+        return httpx.Response(200, json=[{"id": 1, "status": "closed"}], headers={"ETag": 'W/"l1.all"'})
+
+    async def scenario():
+        stats = LoadStats()
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler), base_url="http://test") as client:
+            user = VirtualUser(client, "u@example.com", stats, UserProfile(), random.Random(0))
+            assert await user.login()
+            first = await user.get_json("/items")
+            second = await user.get_json("/items")
+        return stats, first, second
+
+    stats, first, second = asyncio.run(scenario())
+    assert first == second == [{"id": 1, "status": "closed"}]
+    assert seen == [None, 'W/"l1.all"']
+    assert stats.report()["endpoints"]["GET /items"]["statuses"] == {"200": 1, "304": 1}
+
+def test_url_mode_refuses_more_users_than_one_address_may_send():
+    assert (runner.IP_LIMIT, runner.IP_WINDOW_SECONDS) == (rate_limit.IP_LIMIT, rate_limit.IP_WINDOW_SECONDS)
+    assert shared_ip_capacity(UserProfile(poll_interval=1.0)) == 1
+    assert shared_ip_capacity(UserProfile(poll_interval=5.0)) == 5
+    # Refused before any connection is made
+    with pytest.raises(ValueError, match="per-IP limit"):
+        asyncio.run(run_load(2, 1.0, url="http://127.0.0.1:9", profile=UserProfile(poll_interval=1.0)))
@@ -5,3 +5,78 @@ def test_request_id_header(client):
     r = client.get('/auth/login')
     assert 'X-Request-ID' in r.headers
 
+
+def test_log_queue_drops_sampled_lines_first():
+    """Past the high-water mark sampled lines are dropped; must-log lines still fit, and nothing blocks."""
+    import io
+    from app.core.log import LogWriter, stats
+    from app.middleware.request_id import should_sample
+    writer = LogWriter(capacity=10, stream=io.BytesIO())
+    writer.start = lambda: None  # keep the queue undrained
+    dropped = stats["dropped_sampled"]
+    assert all(writer.put(b"poll", droppable=True) for _ in range(8))
+    assert not writer.put(b"poll", droppable=True)
+    assert writer.put(b"bid") and writer.put(b"error")
+    assert not writer.put(b"error")
+    assert stats["dropped_sampled"] == dropped + 1
+    assert should_sample("GET", 200, 3.0)
+    assert not should_sample("GET", 500, 3.0) and not should_sample("POST", 200, 3.0) and not should_sample("GET", 200, 10_000)
+
+def test_admission_reserves_capacity_for_bids_and_sheds_polls_first():
+    """Polls cannot take reserved slots and are shed at their deadline; freed slots go to bids first."""
+    import asyncio
+    from app.middleware.admission import AdmissionController, classify
+    assert classify("POST", "/items/7/bid") == "critical" and classify("POST", "/items/bids") == "critical"
+    assert classify("GET", "/items") == "poll" and classify("GET", "/items/7") == "poll"
+    assert classify("GET", "/items/7/wait") is None and classify("POST", "/auth/login") == "default"
+
+    async def scenario():
+        ctl = AdmissionController(capacity=2, reserved=1, limits={"critical": 2, "default": 1, "poll": 1},
+                                  deadlines={"critical": 1.0, "default": 1.0, "poll": 0.05})
+        assert await ctl.acquire("poll")
+        assert not await ctl.acquire("poll")          # queued past its deadline: shed
+        assert await ctl.acquire("critical")          # reserved slot
+        waiting_bid = asyncio.ensure_future(ctl.acquire("critical"))
+        waiting_poll = asyncio.ensure_future(ctl.acquire("poll"))
+        await asyncio.sleep(0)
+        assert ctl.snapshot()["queue_depth"] == {"critical": 1, "default": 0, "poll": 1}
+        ctl.release("poll")
+        assert await waiting_bid and not await waiting_poll
+        return ctl.snapshot()
+
+    stats = asyncio.run(scenario())
+    assert stats["shed"]["poll"] == 2 and stats["admitted"]["critical"] == 2 and stats["in_flight"]["critical"] == 2
+
+def test_ip_limiter_counts_seconds_and_answers_real_429(client, monkeypatch):
+    """One window member per second: a burst within a second passes; a refused request gets a JSON 429, not a 500."""
+    import asyncio
+    from app.middleware import rate_limit
+
+    async def burst():
+        return [await rate_limit.sliding_window_allow("rl:test:burst", 3, 10) for _ in range(20)]
+    assert all(asyncio.run(burst()))
+    # Weighted charges count every unit, even within one second
+    assert asyncio.run(rate_limit.weighted_window_allow("rl:test:weighted", 5, 60, 5))
+    assert not asyncio.run(rate_limit.weighted_window_allow("rl:test:weighted", 5, 60, 1))
+
+    async def refuse(key, limit, window_seconds):
+        return False
+    monkeypatch.setattr(rate_limit, "sliding_window_allow", refuse)
+    r = client.get('/auth/login')
+    assert r.status_code == 429 and r.json() == {"detail": "Too many requests"}
+
+def test_refused_weighted_charge_is_taken_back():
+    """A batch that does not fit leaves the budget untouched; an oversized batch size is a config error."""
+    import asyncio
+    import pytest
+    from pydantic import ValidationError
+    from app.core.config import Settings
+    from app.middleware.rate_limit import weighted_window_allow
+
+    async def scenario():
+        assert await weighted_window_allow("rl:test:refund", 5, 60, 3)
+        assert not await weighted_window_allow("rl:test:refund", 5, 60, 3)
+        return await weighted_window_allow("rl:test:refund", 5, 60, 2)
+    assert asyncio.run(scenario())
+    with pytest.raises(ValidationError):
+        Settings(secret_key="x", database_url="sqlite://", batch_bid_max_items=31, batch_bid_limit=30)
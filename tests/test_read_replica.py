@@ -0,0 +1,74 @@
+"""Read-replica routing: read-your-writes pinning, plus a live check against two Postgres instances.
+
+The Postgres test runs only when TEST_PRIMARY_DATABASE_URL and TEST_REPLICA_DATABASE_URL point at two
+separate local servers (asyncpg URLs), e.g. two `postgres` containers on ports 5432 and 5433.
+"""
+import asyncio
+import os
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+from starlette.requests import Request
+from app.core import db as app_db
+
+PRIMARY_URL = os.getenv("TEST_PRIMARY_DATABASE_URL")
+REPLICA_URL = os.getenv("TEST_REPLICA_DATABASE_URL")
+
+
+def make_request(method: str, token: str | None = "Bearer abc") -> Request:
+    headers = [(b"authorization", token.encode())] if token else []
+    return Request({"type": "http", "method": method, "path": "/items", "headers": headers})
+
+async def read_session(request: Request, primary):
+    gen = app_db.get_read_db(request, primary)
+    session = await gen.__anext__()
+    await gen.aclose()
+    return session
+
+def test_read_db_is_primary_without_replica():
+    primary = object()
+    assert app_db._read_engine is None
+    assert asyncio.run(read_session(make_request("GET"), primary)) is primary
+
+def test_writes_pin_client_to_primary(monkeypatch):
+    monkeypatch.setattr(app_db, "_read_engine", object())
+    primary = object()
+
+    async def scenario():
+        before = await read_session(make_request("GET"), primary)
+        await app_db.mark_write(make_request("POST"))
+        after = await read_session(make_request("GET"), primary)
+        other = await read_session(make_request("GET", "Bearer other"), primary)
+        return before, after, other
+
+    before, after, other = asyncio.run(scenario())
+    assert before is not primary
+    assert after is primary
+    assert other is not primary
+
+@pytest.mark.skipif(not (PRIMARY_URL and REPLICA_URL), reason="needs two local Postgres instances")
+def test_routing_against_two_postgres_instances(monkeypatch):
+    async def scenario():
+        primary_engine = create_async_engine(PRIMARY_URL)
+        replica_engine = create_async_engine(REPLICA_URL)
+        monkeypatch.setattr(app_db, "_read_engine", replica_engine)
+        app_db.ReadSessionLocal.configure(bind=replica_engine)
+        try:
+            async with primary_engine.connect() as conn:
+                primary_port = (await conn.execute(text("SHOW port"))).scalar()
+            request = make_request("GET", "Bearer pg-routing")
+            async with app_db.AsyncSessionLocal(bind=primary_engine) as primary:
+                session = await read_session(request, primary)
+                replica_port = (await session.execute(text("SHOW port"))).scalar()
+                await session.close()
+                await app_db.mark_write(make_request("POST", "Bearer pg-routing"))
+                pinned = await read_session(request, primary)
+                pinned_port = (await pinned.execute(text("SHOW port"))).scalar()
+            return primary_port, replica_port, pinned_port
+        finally:
+            await primary_engine.dispose()
+            await replica_engine.dispose()
+
+    primary_port, replica_port, pinned_port = asyncio.run(scenario())
+    assert replica_port != primary_port
+    assert pinned_port == primary_port
@@ -0,0 +1,35 @@
+"""Simulator tests: trace round-trips and in-memory replay through the bid resolution code."""
+
+from tools.simulate import Simulator, TraceRecord, generate_trace, read_trace, write_trace
+
+
+def test_trace_round_trip_csv_and_ndjson(tmp_path):
+    records = list(generate_trace(items=3, users=50, bids_per_item=5, seed=7))
+    assert len(records) == 15
+    assert [r.ts for r in records] == sorted(r.ts for r in records)
+    for name in ("trace.csv", "trace.ndjson"):
+        path = str(tmp_path / name)
+        assert write_trace(records, path) == 15
+        assert list(read_trace(path)) == records
+
+def test_replay_applies_poison_auto_raise():
+    sim = Simulator(min_start_price=5)
+    assert sim.feed(TraceRecord(0.0, 1, 1, 10, 25, 2)) == "actor_leads"
+    # Challenger at 15 is beaten by the defender's auto-raise to min(25, 15 + 2)
+    assert sim.feed(TraceRecord(1.0, 2, 1, 15, None, None)) == "defender_auto_raise"
+    assert sim.feed(TraceRecord(2.0, 1, 1, 30, None, None)) == "rejected_duplicate"
+    assert sim.feed(TraceRecord(3.0, 3, 2, 1, None, None)) == "rejected_below_min"
+    report = sim.report()
+    assert report["bids"] == 4
+    assert report["final_price"]["max"] == 17
+    assert report["items_won_by_auto_raise"] == 1
+
+def test_speedup_increases_modelled_lock_waits():
+    records = list(generate_trace(items=5, users=200, bids_per_item=40, seed=3))
+    waits = []
+    for speedup in (1, 100):
+        sim = Simulator(tx_ms=5, speedup=speedup)
+        for rec in records:
+            sim.feed(rec)
+        waits.append(sim.report()["lock_wait_ms"]["mean"])
+    assert waits[1] > waits[0]
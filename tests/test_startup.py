@@ -0,0 +1,43 @@
+"""Cold-start tests: importing the app stays cheap and connects to nothing; /ready gates traffic."""
+import json
+import os
+import subprocess
+import sys
+
+# Seconds allowed for `import main` in a fresh interpreter; raise it on slow CI runners
+IMPORT_BUDGET_SECONDS = float(os.getenv("IMPORT_BUDGET_SECONDS", "3.0"))
+
+_PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import main
+elapsed = time.perf_counter() - started
+import app.core.db as db, app.core.redis as r, app.core.http as http
+print(json.dumps({
+    "elapsed": elapsed,
+    "engine": db._engine is not None,
+    "redis": "redis_client" in vars(r),
+    "http": http._client is not None,
+    "modules": [m for m in ("asyncpg", "redis", "httpx") if m in sys.modules],
+}))
+"""
+
+def test_import_is_lazy_and_within_budget():
+    env = dict(os.environ, DATABASE_URL="postgresql+asyncpg://u:p@localhost:5432/db", SECRET_KEY="x")
+    out = subprocess.run([sys.executable, "-c", _PROBE], env=env, capture_output=True, text=True, check=True,
+                         cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    probe = json.loads(out.stdout.strip().splitlines()[-1])
+    assert not probe["engine"] and not probe["redis"] and not probe["http"]
+    assert probe["modules"] == []
+    assert probe["elapsed"] < IMPORT_BUDGET_SECONDS, f"import main took {probe['elapsed']:.2f}s"
+
+def test_ready_reports_starting_until_warm(client):
+    from main import app
+    app.state.ready = False
+    r = client.get("/ready")
+    assert r.status_code == 503
+    app.state.ready = True
+    try:
+        assert client.get("/ready").json() == {"status": "ready"}
+    finally:
+        app.state.ready = False
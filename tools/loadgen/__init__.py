@@ -0,0 +1,15 @@
+"""In-process load generator reproducing the frontend's traffic mix.
+
+Virtual users poll the lobby and the room every second like the React pages
+do, join during the scheduled window and bid during the live window. Run it
+against the app through ASGI (default) or against a running server with
+``--url``::
+
+    python -m tools.loadgen --users 500 --duration 60
+    python -m tools.loadgen --users 5 --poll-interval 5 --duration 120 --url http://localhost:8000 --json
+"""
+from tools.loadgen.stats import EndpointStats, LoadStats
+from tools.loadgen.user import VirtualUser, UserProfile
+from tools.loadgen.runner import run_load
+
+__all__ = ["EndpointStats", "LoadStats", "VirtualUser", "UserProfile", "run_load"]
@@ -0,0 +1,48 @@
+import argparse
+import asyncio
+import sys
+import orjson
+from tools.loadgen import run_load, UserProfile
+
+
+def print_report(report: dict) -> None:
+    print(f"{report['requests']} requests in {report['seconds']:.1f}s ({report['rps']:.1f} req/s)")
+    print(f"{'endpoint':<28}{'reqs':>8}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'max ms':>9}{'err %':>8}  statuses")
+    for name, row in report["endpoints"].items():
+        statuses = " ".join(f"{k}:{v}" for k, v in sorted(row["statuses"].items()))
+        print(f"{name:<28}{row['requests']:>8}{row['rps']:>9.1f}{row['p50_ms']:>9.1f}{row['p95_ms']:>9.1f}"
+              f"{row['p99_ms']:>9.1f}{row['max_ms']:>9.1f}{row['error_rate'] * 100:>8.2f}  {statuses}")
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m tools.loadgen", description="Lobby polling plus bidding load generator")
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--duration", type=float, default=60.0, help="seconds")
+    parser.add_argument("--ramp", type=float, default=5.0, help="seconds over which users start")
+    parser.add_argument("--url", default=None, help="target a running server instead of the in-process ASGI app")
+    parser.add_argument("--poll-interval", type=float, default=1.0)
+    parser.add_argument("--join-probability", type=float, default=0.5)
+    parser.add_argument("--bid-probability", type=float, default=0.8)
+    parser.add_argument("--no-etags", action="store_true", help="do not revalidate with If-None-Match")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args(argv)
+
+    profile = UserProfile(
+        poll_interval=args.poll_interval,
+        join_probability=args.join_probability,
+        bid_probability=args.bid_probability,
+        use_etags=not args.no_etags,
+    )
+    try:
+        report = asyncio.run(run_load(args.users, args.duration, url=args.url, ramp=args.ramp, profile=profile, seed=args.seed))
+    except ValueError as exc:
+        parser.error(str(exc))
+    if args.json:
+        sys.stdout.write(orjson.dumps(report, option=orjson.OPT_INDENT_2).decode() + "\n")
+    else:
+        print_report(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+import asyncio
+import contextlib
+import random
+import time
+import uuid
+import httpx
+from tools.loadgen.stats import LoadStats
+from tools.loadgen.user import VirtualUser, UserProfile
+
+# The server's per-IP limit (app.middleware.rate_limit), copied so --url runs need no app settings
+IP_LIMIT = 10
+IP_WINDOW_SECONDS = 10
+
+
+def _asgi_client(app, index: int) -> httpx.AsyncClient:
+    # One client address per virtual user, as real browsers have, so per-IP limits apply per user
+    transport = httpx.ASGITransport(app=app, client=(f"10.{(index >> 16) & 255}.{(index >> 8) & 255}.{index & 255}", 40000))
+    return httpx.AsyncClient(transport=transport, base_url="http://loadgen")
+
+
+def shared_ip_capacity(profile: UserProfile) -> int:
+    """Users one client address can sustain under the server's per-IP limit, counting only
+    each user's once-per-``poll_interval`` polls (joins and bids come on top)."""
+    return int(profile.poll_interval * IP_LIMIT / IP_WINDOW_SECONDS)
+
+
+async def run_load(users: int, duration: float, url: str | None = None, app=None, ramp: float = 5.0,
+                   profile: UserProfile | None = None, seed: int | None = None) -> dict:
+    """Run ``users`` virtual users for ``duration`` seconds and return the per-endpoint report.
+
+    With ``url`` the users talk HTTP to a running server; otherwise they call ``app``
+    (``main.app`` by default) in-process through ASGI, with its lifespan started.
+    Over HTTP every user shares this machine's address, and the server does not trust
+    ``X-Forwarded-For``, so more users than ``shared_ip_capacity`` would only measure
+    the per-IP rate limiter; that raises ``ValueError`` instead.
+    """
+    profile = profile or UserProfile()
+    if url and users > shared_ip_capacity(profile):
+        raise ValueError(
+            f"{users} users polling every {profile.poll_interval:g}s from one address exceed the server's "
+            f"per-IP limit of {IP_LIMIT} requests per {IP_WINDOW_SECONDS}s; use at most "
+            f"{shared_ip_capacity(profile)} users per host with --url, or run in-process without --url")
+    rng = random.Random(seed)
+    stats = LoadStats()
+    run_tag = uuid.uuid4().hex[:8]
+
+    async with contextlib.AsyncExitStack() as stack:
+        if url:
+            # One client and one source address for everyone, so the per-IP limit is shared
+            limits = httpx.Limits(max_connections=users, max_keepalive_connections=users)
+            shared = await stack.enter_async_context(httpx.AsyncClient(base_url=url, limits=limits, timeout=30.0))
+            clients = [shared] * users
+        else:
+            if app is None:
+                from main import app
+            await stack.enter_async_context(app.router.lifespan_context(app))
+            clients = [await stack.enter_async_context(_asgi_client(app, i)) for i in range(users)]
+
+        stop_at = time.monotonic() + duration
+
+        async def start(index: int) -> None:
+            await asyncio.sleep(ramp * index / max(1, users))
+            user = VirtualUser(clients[index], f"loadgen-{run_tag}-{index}@example.com", stats, profile, random.Random(rng.random()))
+            await user.run(stop_at)
+
+        await asyncio.gather(*(start(i) for i in range(users)))
+        stats.stop()
+    return stats.report()
@@ -0,0 +1,67 @@
+import re
+import time
+from collections import Counter
+from tools.stats import Reservoir
+
+_ITEM_PATH = re.compile(r"/items/\d+")
+
+
+def endpoint_name(method: str, path: str) -> str:
+    """Group concrete URLs by route, e.g. ``GET /items/42`` -> ``GET /items/{id}``."""
+    return f"{method} {_ITEM_PATH.sub('/items/{id}', path.split('?', 1)[0])}"
+
+
+class EndpointStats:
+    def __init__(self):
+        self.latency_ms = Reservoir(size=20_000)
+        self.statuses: Counter = Counter()
+        self.errors = 0
+
+    def record(self, status: int | None, elapsed_ms: float) -> None:
+        self.latency_ms.add(elapsed_ms)
+        self.statuses["exception" if status is None else status] += 1
+        if status is None or status >= 500:
+            self.errors += 1
+
+
+class LoadStats:
+    def __init__(self):
+        self.endpoints: dict[str, EndpointStats] = {}
+        self.started = time.perf_counter()
+        self.finished: float | None = None
+
+    def record(self, method: str, path: str, status: int | None, elapsed_ms: float) -> None:
+        name = endpoint_name(method, path)
+        stats = self.endpoints.get(name)
+        if stats is None:
+            stats = self.endpoints[name] = EndpointStats()
+        stats.record(status, elapsed_ms)
+
+    def stop(self) -> None:
+        self.finished = time.perf_counter()
+
+    def report(self) -> dict:
+        elapsed = (self.finished or time.perf_counter()) - self.started
+        endpoints = {}
+        total = 0
+        for name in sorted(self.endpoints):
+            stats = self.endpoints[name]
+            count = stats.latency_ms.count
+            total += count
+            summary = stats.latency_ms.summary()
+            endpoints[name] = {
+                "requests": count,
+                "rps": count / elapsed if elapsed else 0.0,
+                "p50_ms": summary.get("p50", 0.0),
+                "p95_ms": summary.get("p95", 0.0),
+                "p99_ms": summary.get("p99", 0.0),
+                "max_ms": summary.get("max", 0.0),
+                "error_rate": stats.errors / count if count else 0.0,
+                "statuses": {str(k): v for k, v in stats.statuses.items()},
+            }
+        return {
+            "seconds": elapsed,
+            "requests": total,
+            "rps": total / elapsed if elapsed else 0.0,
+            "endpoints": endpoints,
+        }
@@ -0,0 +1,127 @@
+import asyncio
+import random
+import time
+import httpx
+from tools.loadgen.stats import LoadStats
+
+
+class UserProfile:
+    """Behaviour knobs for a virtual user; defaults follow the React pages."""
+
+    def __init__(self, poll_interval: float = 1.0, join_probability: float = 0.5, bid_probability: float = 0.8,
+                 poison_probability: float = 0.3, use_etags: bool = True):
+        self.poll_interval = poll_interval
+        self.join_probability = join_probability
+        self.bid_probability = bid_probability
+        self.poison_probability = poison_probability
+        self.use_etags = use_etags
+
+
+class VirtualUser:
+    """Lobby -> room -> lobby loop: poll ``GET /items`` every second, open a scheduled item,
+    join it, poll ``GET /items/{id}`` every second, bid once while it is live, then go back."""
+
+    def __init__(self, client: httpx.AsyncClient, email: str, stats: LoadStats, profile: UserProfile, rng: random.Random):
+        self.client = client
+        self.email = email
+        self.stats = stats
+        self.profile = profile
+        self.rng = rng
+        self.headers: dict[str, str] = {}
+        self.etags: dict[str, str] = {}
+        self.bodies: dict[str, object] = {}
+
+    async def request(self, method: str, path: str, **kwargs) -> httpx.Response | None:
+        started = time.perf_counter()
+        try:
+            response = await self.client.request(method, path, **kwargs)
+        except httpx.HTTPError:
+            self.stats.record(method, path, None, (time.perf_counter() - started) * 1000)
+            return None
+        self.stats.record(method, path, response.status_code, (time.perf_counter() - started) * 1000)
+        return response
+
+    async def get_json(self, path: str):
+        """GET with browser-style revalidation: replay the cached body on 304."""
+        headers = dict(self.headers)
+        if self.profile.use_etags and path in self.etags:
+            headers["If-None-Match"] = self.etags[path]
+        response = await self.request("GET", path, headers=headers)
+        if response is None:
+            return None
+        if response.status_code == 304:
+            return self.bodies.get(path)
+        if response.status_code != 200:
+            return None
+        body = response.json()
+        etag = response.headers.get("etag")
+        if etag:
+            self.etags[path] = etag
+            self.bodies[path] = body
+        return body
+
+    async def login(self) -> bool:
+        await self.request("POST", "/auth/register", json={"email": self.email, "password": "loadgen", "role": "viewer"})
+        response = await self.request("POST", "/auth/login", data={"username": self.email, "password": "loadgen"})
+        if response is None or response.status_code != 200:
+            return False
+        self.headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+        return True
+
+    async def run(self, stop_at: float) -> None:
+        if not await self.login():
+            return
+        while time.monotonic() < stop_at:
+            item_id = await self.lobby(stop_at)
+            if item_id is not None:
+                await self.room(item_id, stop_at)
+
+    async def tick(self, started: float) -> None:
+        await asyncio.sleep(max(0.0, self.profile.poll_interval - (time.monotonic() - started)))
+
+    async def lobby(self, stop_at: float) -> int | None:
+        while time.monotonic() < stop_at:
+            started = time.monotonic()
+            rows = await self.get_json("/items") or []
+            scheduled = [r for r in rows if r.get("status") == "scheduled" and (r.get("seconds_to_start") or 0) >= 2]
+            if scheduled and self.rng.random() < self.profile.join_probability:
+                return self.rng.choice(scheduled)["id"]
+            await self.tick(started)
+        return None
+
+    async def room(self, item_id: int, stop_at: float) -> None:
+        path = f"/items/{item_id}"
+        joined = bid_done = False
+        wants_bid = self.rng.random() < self.profile.bid_probability
+        while time.monotonic() < stop_at:
+            started = time.monotonic()
+            item = await self.get_json(path)
+            if item is None:
+                return
+            status = item.get("status")
+            if status == "scheduled" and not joined:
+                response = await self.request("POST", f"{path}/join", headers=self.headers)
+                joined = response is not None and response.status_code == 200
+                if not joined:
+                    return
+                item = await self.get_json(path) or item
+            elif status == "in_progress" and wants_bid and not bid_done:
+                seconds_left = item.get("seconds_to_end") or 0
+                # Spread bids over the live window: on average one attempt per window
+                if seconds_left > 0 and self.rng.random() < 1.0 / max(1, seconds_left):
+                    await self.bid(path, item)
+                    bid_done = True
+                    await self.get_json(path)
+            elif status == "closed":
+                return
+            await self.tick(started)
+
+    async def bid(self, path: str, item: dict) -> None:
+        current = (item.get("current_bid") or {}).get("amount") or 0.0
+        floor = max(float(current), float(item.get("min_start_price") or 0.0))
+        amount = round(floor + self.rng.uniform(1, 25), 2)
+        body = {"amount": amount}
+        if self.rng.random() < self.profile.poison_probability:
+            body["max_budget"] = round(amount * self.rng.uniform(1.1, 1.6), 2)
+            body["bid_increment"] = float(self.rng.randint(1, 10))
+        await self.request("POST", f"{path}/bid", json=body, headers=self.headers)
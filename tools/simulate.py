@@ -0,0 +1,390 @@
+"""Offline auction simulator and bid-trace replay for capacity planning.
+
+Generate a synthetic trace, or replay a recorded one, through the same bid
+resolution code the API uses (``check_bid_placed``, ``compute_winner`` and
+``apply_bid_mutation``) and report resolution cost, final prices, an estimate
+of row-lock contention and the distribution of outcomes.
+
+    python -m tools.simulate generate --items 8640 --bids-per-item 40 -o day.csv
+    python -m tools.simulate run day.csv --speedup 10
+    python -m tools.simulate run day.csv --database-url postgresql+asyncpg://... --concurrency 32
+
+Traces are CSV (``ts,user_id,item_id,amount,max_budget,bid_increment``) or
+NDJSON with the same keys, chosen by file extension. They are streamed, and
+item state is evicted once an item has been idle for ``--idle-evict`` seconds
+of trace time, so a full day of traffic runs in bounded memory.
+"""
+import argparse
+import asyncio
+import csv
+import heapq
+import math
+import os
+import random
+import sys
+import time
+from collections import Counter
+from typing import Iterable, Iterator, NamedTuple
+
+import orjson
+from fastapi import HTTPException
+
+# The app settings are only needed for import; the replay takes its own --database-url
+os.environ.setdefault("SECRET_KEY", "simulate")
+os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite:///:memory:")
+
+from app.auctions.tx_bid import check_bid_placed, compute_winner, apply_bid_mutation
+from app.models import Bid
+from tools.stats import Reservoir
+
+FIELDS = ("ts", "user_id", "item_id", "amount", "max_budget", "bid_increment")
+
+
+class TraceRecord(NamedTuple):
+    ts: float
+    user_id: int
+    item_id: int
+    amount: float
+    max_budget: float | None
+    bid_increment: float | None
+
+
+def _opt_float(value) -> float | None:
+    if value is None or value == "":
+        return None
+    return float(value)
+
+
+def read_trace(path: str) -> Iterator[TraceRecord]:
+    """Stream records from a CSV or NDJSON trace ("-" reads CSV from stdin)."""
+    ndjson = path.endswith((".ndjson", ".jsonl"))
+    stream = sys.stdin if path == "-" else open(path, newline="" if not ndjson else None)
+    try:
+        if ndjson:
+            for line in stream:
+                if line.strip():
+                    row = orjson.loads(line)
+                    yield TraceRecord(float(row["ts"]), int(row["user_id"]), int(row["item_id"]), float(row["amount"]),
+                                      _opt_float(row.get("max_budget")), _opt_float(row.get("bid_increment")))
+        else:
+            for row in csv.DictReader(stream):
+                yield TraceRecord(float(row["ts"]), int(row["user_id"]), int(row["item_id"]), float(row["amount"]),
+                                  _opt_float(row.get("max_budget")), _opt_float(row.get("bid_increment")))
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+
+
+def write_trace(records: Iterable[TraceRecord], path: str) -> int:
+    ndjson = path.endswith((".ndjson", ".jsonl"))
+    stream = sys.stdout if path == "-" else open(path, "w", newline="" if not ndjson else None)
+    count = 0
+    try:
+        if ndjson:
+            for rec in records:
+                stream.write(orjson.dumps(rec._asdict()).decode() + "\n")
+                count += 1
+        else:
+            writer = csv.writer(stream)
+            writer.writerow(FIELDS)
+            for rec in records:
+                writer.writerow(["" if v is None else v for v in rec])
+                count += 1
+    finally:
+        if stream is not sys.stdout:
+            stream.close()
+    return count
+
+
+def generate_trace(items: int, users: int, bids_per_item: int, poison_ratio: float = 0.3,
+                   item_spacing: float = 10.0, live_seconds: float = 30.0, seed: int | None = None) -> Iterator[TraceRecord]:
+    """Synthetic trace shaped like the lobby: a new item every ``item_spacing`` seconds,
+    each live for ``live_seconds``, with bids following the visible price upwards."""
+    rng = random.Random(seed)
+
+    def item_bids(item_id: int) -> Iterator[TraceRecord]:
+        start = item_id * item_spacing
+        floor = float(rng.randint(100, 250))
+        bidders = rng.sample(range(1, users + 1), min(users, bids_per_item))
+        offsets = sorted(rng.random() * live_seconds for _ in bidders)
+        price = floor
+        for user_id, offset in zip(bidders, offsets):
+            # Bidders react to the visible price; some undershoot it and get rejected
+            amount = round(price * rng.uniform(0.95, 1.2), 2)
+            price = max(price, amount)
+            max_budget = bid_increment = None
+            if rng.random() < poison_ratio:
+                max_budget = round(amount * rng.uniform(1.1, 2.0), 2)
+                bid_increment = float(rng.randint(1, 10))
+            yield TraceRecord(round(start + offset, 3), user_id, item_id, amount, max_budget, bid_increment)
+
+    # Lazily materialise each item's bids; merge keeps the output in timestamp order
+    return heapq.merge(*(item_bids(i) for i in range(1, items + 1)), key=lambda r: r.ts)
+
+
+class _Collector:
+    """Stands in for the session: apply_bid_mutation only calls ``add``."""
+
+    def __init__(self):
+        self.added: list[Bid] = []
+
+    def add(self, obj: Bid) -> None:
+        self.added.append(obj)
+
+
+class _ItemState:
+    __slots__ = ("bids", "last_ts", "lock_free_at")
+
+    def __init__(self):
+        self.bids: list[Bid] = []
+        self.last_ts = 0.0
+        self.lock_free_at = 0.0
+
+
+class Simulator:
+    """In-memory replay. Lock contention is modelled as a FIFO queue per item whose
+    row lock is held for ``tx_ms`` by every bid transaction."""
+
+    def __init__(self, min_start_price: float = 0.0, tx_ms: float = 5.0, speedup: float = 1.0, idle_evict: float = 300.0):
+        self.min_start_price = min_start_price
+        self.tx_seconds = tx_ms / 1000.0
+        self.speedup = speedup
+        self.idle_evict = idle_evict
+        self.items: dict[int, _ItemState] = {}
+        self.outcomes: Counter = Counter()
+        self.resolve_ns = Reservoir()
+        self.scanned = Reservoir()
+        self.lock_waits = Reservoir()
+        self.final_prices = Reservoir()
+        self.auto_raise_wins = 0
+        self.first_ts: float | None = None
+        self.last_ts = 0.0
+        self._since_evict = 0
+
+    def feed(self, rec: TraceRecord) -> str:
+        ts = rec.ts / self.speedup
+        if self.first_ts is None:
+            self.first_ts = ts
+        self.last_ts = ts
+        state = self.items.get(rec.item_id)
+        if state is None:
+            state = self.items[rec.item_id] = _ItemState()
+        state.last_ts = ts
+
+        # Row-lock queue: the transaction starts once the previous holder commits
+        start = max(ts, state.lock_free_at)
+        self.lock_waits.add(start - ts)
+        state.lock_free_at = start + self.tx_seconds
+
+        outcome = self._resolve(state, rec)
+        self.outcomes[outcome] += 1
+
+        self._since_evict += 1
+        if self._since_evict >= 10_000:
+            self._since_evict = 0
+            self._evict(ts - self.idle_evict)
+        return outcome
+
+    def _resolve(self, state: _ItemState, rec: TraceRecord) -> str:
+        bids = state.bids
+        leader = max(bids, key=lambda b: b.amount, default=None)
+        collector = _Collector()
+        t0 = time.perf_counter_ns()
+        try:
+            check_bid_placed(bids, rec.user_id)
+            if not bids and rec.amount < self.min_start_price:
+                return "rejected_below_min"
+            winner_user_id, winner_amount, max_budget, bid_increment = compute_winner(
+                bids, rec.user_id, rec.amount, rec.max_budget, rec.bid_increment)
+            apply_bid_mutation(collector, bids, rec.item_id, winner_user_id, rec.user_id, winner_amount, max_budget, bid_increment)
+        except HTTPException as exc:
+            return "rejected_duplicate" if exc.status_code == 409 else "rejected_not_higher"
+        finally:
+            self.resolve_ns.add(time.perf_counter_ns() - t0)
+            self.scanned.add(len(bids))
+        bids.extend(collector.added)
+        if winner_user_id == rec.user_id:
+            return "actor_leads"
+        if leader is not None and winner_user_id == leader.user_id:
+            return "defender_auto_raise"
+        return "contender_auto_raise"
+
+    def _evict(self, before_ts: float) -> None:
+        for item_id in [i for i, s in self.items.items() if s.last_ts < before_ts]:
+            self._finalise(self.items.pop(item_id))
+
+    def _finalise(self, state: _ItemState) -> None:
+        if not state.bids:
+            return
+        winner = max(state.bids, key=lambda b: b.amount)
+        self.final_prices.add(winner.amount)
+        if winner.max_budget is not None:
+            self.auto_raise_wins += 1
+
+    def report(self) -> dict:
+        for state in self.items.values():
+            self._finalise(state)
+        self.items.clear()
+        total = sum(self.outcomes.values())
+        span = max(self.last_ts - (self.first_ts or 0.0), 1e-9)
+        return {
+            "bids": total,
+            "trace_seconds": span,
+            "bids_per_second": total / span,
+            "outcomes": dict(self.outcomes),
+            "resolution_us": self.resolve_ns.summary(scale=1e-3),
+            "bids_scanned": self.scanned.summary(),
+            "lock_wait_ms": self.lock_waits.summary(scale=1e3),
+            "lock_wait_fraction": self.lock_waits.positive / total if total else 0.0,
+            "max_queue_depth": math.ceil(self.lock_waits.max / self.tx_seconds) if self.tx_seconds else 0,
+            "final_price": self.final_prices.summary(),
+            "items_won_by_auto_raise": self.auto_raise_wins,
+        }
+
+
+async def replay_postgres(records: Iterable[TraceRecord], database_url: str, concurrency: int, pace: bool, speedup: float) -> dict:
+    """Replay through place_bid against a scratch database (tables are created if missing).
+    Trace user and item ids are mapped onto rows created on first use."""
+    from datetime import datetime, timedelta
+    from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+    from sqlalchemy.orm import sessionmaker
+    from app.core.db import Base
+    from app.auctions.tx_bid import place_bid
+    from app.models import Item, User
+
+    engine = create_async_engine(database_url, pool_size=concurrency, max_overflow=0)
+    sessions = sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    run_tag = int(time.time())
+    user_ids: dict[int, int] = {}
+    item_ids: dict[int, int] = {}
+    create_lock = asyncio.Lock()
+
+    async def ensure_rows(rec: TraceRecord) -> tuple[int, int]:
+        async with create_lock:
+            if rec.user_id not in user_ids or rec.item_id not in item_ids:
+                async with sessions() as db:
+                    if rec.user_id not in user_ids:
+                        user = User(email=f"sim-{run_tag}-{rec.user_id}@sim.local", pw_hash="", balance=1e12)
+                        db.add(user)
+                        await db.flush()
+                        user_ids[rec.user_id] = user.id
+                    if rec.item_id not in item_ids:
+                        now = datetime.utcnow()
+                        item = Item(title=f"sim {run_tag}/{rec.item_id}", description="", base_price=0.0,
+                                    start_at=now - timedelta(days=1), end_at=now + timedelta(days=1),
+                                    min_start_price=0.0, status="in_progress")
+                        db.add(item)
+                        await db.flush()
+                        item_ids[rec.item_id] = item.id
+                    await db.commit()
+        return user_ids[rec.user_id], item_ids[rec.item_id]
+
+    outcomes: Counter = Counter()
+    latencies = Reservoir()
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(rec: TraceRecord) -> None:
+        try:
+            user_id, item_id = await ensure_rows(rec)
+            t0 = time.perf_counter()
+            async with sessions() as db:
+                try:
+                    result = await place_bid(db, item_id, user_id, rec.amount, rec.max_budget, rec.bid_increment)
+                    await db.commit()
+                    outcomes["actor_leads" if result["winner_user_id"] == user_id else "auto_raise"] += 1
+                except HTTPException as exc:
+                    await db.rollback()
+                    outcomes[f"rejected_{exc.status_code}"] += 1
+            latencies.add((time.perf_counter() - t0) * 1000)
+        finally:
+            semaphore.release()
+
+    started = time.perf_counter()
+    first_ts = None
+    tasks = []
+    for rec in records:
+        if pace:
+            first_ts = rec.ts if first_ts is None else first_ts
+            delay = (rec.ts - first_ts) / speedup - (time.perf_counter() - started)
+            if delay > 0:
+                await asyncio.sleep(delay)
+        await semaphore.acquire()
+        tasks.append(asyncio.create_task(one(rec)))
+        if len(tasks) >= 10_000:
+            await asyncio.gather(*tasks)
+            tasks.clear()
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - started
+    await engine.dispose()
+    total = sum(outcomes.values())
+    return {
+        "bids": total,
+        "wall_seconds": elapsed,
+        "bids_per_second": total / elapsed if elapsed else 0.0,
+        "outcomes": dict(outcomes),
+        "transaction_ms": latencies.summary(),
+    }
+
+
+def _print_report(report: dict, as_json: bool) -> None:
+    if as_json:
+        sys.stdout.write(orjson.dumps(report, option=orjson.OPT_INDENT_2).decode() + "\n")
+        return
+    for key, value in report.items():
+        if isinstance(value, dict):
+            print(f"{key}:")
+            for k, v in value.items():
+                print(f"  {k:<24}{v:.3f}" if isinstance(v, float) else f"  {k:<24}{v}")
+        else:
+            print(f"{key:<26}{value:.3f}" if isinstance(value, float) else f"{key:<26}{value}")
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m tools.simulate", description=__doc__.splitlines()[0])
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    gen = sub.add_parser("generate", help="write a synthetic bid trace")
+    gen.add_argument("--items", type=int, default=100)
+    gen.add_argument("--users", type=int, default=1000)
+    gen.add_argument("--bids-per-item", type=int, default=20)
+    gen.add_argument("--poison-ratio", type=float, default=0.3)
+    gen.add_argument("--item-spacing", type=float, default=10.0, help="seconds between item starts")
+    gen.add_argument("--seed", type=int, default=None)
+    gen.add_argument("-o", "--output", default="-")
+
+    run = sub.add_parser("run", help="replay a trace and report")
+    run.add_argument("trace", help="CSV or NDJSON trace file, '-' for CSV on stdin")
+    run.add_argument("--speedup", type=float, default=1.0, help="compress trace time to model N x traffic")
+    run.add_argument("--tx-ms", type=float, default=5.0, help="row-lock hold time per bid transaction (in-memory model)")
+    run.add_argument("--min-start-price", type=float, default=0.0)
+    run.add_argument("--idle-evict", type=float, default=300.0, help="drop item state after this many idle trace seconds")
+    run.add_argument("--database-url", default=None, help="replay through place_bid against this database instead")
+    run.add_argument("--concurrency", type=int, default=16, help="parallel transactions in database mode")
+    run.add_argument("--pace", action="store_true", help="database mode: honour trace timestamps (divided by --speedup)")
+    run.add_argument("--json", action="store_true")
+
+    args = parser.parse_args(argv)
+    if args.command == "generate":
+        records = generate_trace(args.items, args.users, args.bids_per_item, args.poison_ratio, args.item_spacing, seed=args.seed)
+        count = write_trace(records, args.output)
+        print(f"wrote {count} bids", file=sys.stderr)
+        return
+
+    records = read_trace(args.trace)
+    if args.database_url:
+        report = asyncio.run(replay_postgres(records, args.database_url, args.concurrency, args.pace, args.speedup))
+    else:
+        sim = Simulator(args.min_start_price, args.tx_ms, args.speedup, args.idle_evict)
+        started = time.perf_counter()
+        for rec in records:
+            sim.feed(rec)
+        report = sim.report()
+        report["wall_seconds"] = time.perf_counter() - started
+    _print_report(report, args.json)
+
+
+if __name__ == "__main__":
+    main()
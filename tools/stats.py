@@ -0,0 +1,50 @@
+import math
+import random
+
+
+def _percentile(sorted_values: list[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    k = min(len(sorted_values) - 1, max(0, math.ceil(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[k]
+
+
+class Reservoir:
+    """Exact count, mean and max plus a fixed-size uniform sample for percentiles,
+    so statistics over long runs use constant memory."""
+
+    def __init__(self, size: int = 100_000, seed: int = 0):
+        self.size = size
+        self.sample: list[float] = []
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.positive = 0
+        self._rng = random.Random(seed)
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        self.total += value
+        if value > 0:
+            self.positive += 1
+        if self.count == 1 or value > self.max:
+            self.max = value
+        if len(self.sample) < self.size:
+            self.sample.append(value)
+        else:
+            j = self._rng.randrange(self.count)
+            if j < self.size:
+                self.sample[j] = value
+
+    def summary(self, scale: float = 1.0) -> dict:
+        if not self.count:
+            return {"count": 0}
+        values = sorted(self.sample)
+        return {
+            "count": self.count,
+            "mean": self.total / self.count * scale,
+            "p50": _percentile(values, 50) * scale,
+            "p95": _percentile(values, 95) * scale,
+            "p99": _percentile(values, 99) * scale,
+            "max": self.max * scale,
+        }